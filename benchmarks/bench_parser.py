@@ -0,0 +1,157 @@
+"""Micro-benchmark: original BeautifulSoup scraping code vs core.parser backends.
+
+Usage:
+    python -m benchmarks.bench_parser [--corpus DIR] [--pages N] [--repeat R]
+
+With --corpus, every *.html file in DIR is used (pages containing "post__content" are
+treated as post pages, everything else as listing pages). Without it, a synthetic
+corpus from benchmarks.corpus is generated. --save-corpus DIR writes that synthetic
+corpus to disk so the same pages can be re-used later.
+"""
+import argparse
+import glob
+import os
+import statistics
+import time
+from urllib.parse import urljoin
+
+from config.config import Config
+from core import parser
+from benchmarks import corpus
+
+
+def legacy_parse_post(html):
+    """The per-post parsing code WebScraper used before core.parser."""
+    from bs4 import BeautifulSoup
+    post_soup = BeautifulSoup(html, 'html.parser')
+    title_elem = post_soup.find('h1', class_='post-title')
+    title = title_elem.text.strip() if title_elem else "Unknown Title"
+    content_elem = post_soup.find('div', class_='post__content')
+    content = content_elem.text.strip() if content_elem else ""
+    has_disqus_container = bool(post_soup.find('div', id='disqus_thread'))
+    has_disqus_button = bool(post_soup.find('button', id='show-comments-button'))
+    has_disqus_script = bool(post_soup.find(lambda tag: tag.name == 'script' and tag.string and 'disqus' in tag.string))
+    return title, content, has_disqus_container, has_disqus_button, has_disqus_script
+
+
+def legacy_parse_listing(html, page_url):
+    """The listing code before core.parser: two separate parses for post links and pagination."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    post_links = []
+    for article in soup.find_all('article', class_='article') or soup.find_all('div', class_='article'):
+        title_link = None
+        title_elem = article.find(['h2', 'h3'], class_='article__title')
+        if title_elem:
+            title_link = title_elem.find('a', href=True)
+        if not title_link:
+            title_link = article.find('a', href=True)
+        if title_link:
+            post_url = title_link['href']
+            post_links.append(post_url if post_url.startswith('http') else urljoin(Config.SITE_URL, post_url))
+
+    soup = BeautifulSoup(html, 'html.parser')
+    page_links = []
+    pagination = soup.find('div', class_='pagination')
+    if pagination:
+        page_links = [urljoin(page_url, a['href']) for a in pagination.find_all('a', href=True) if '/blog/page' in a['href']]
+    return post_links, page_links
+
+
+def load_corpus(directory):
+    posts, listings = [], []
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, encoding="utf-8", errors="replace") as f:
+            html = f.read()
+        (posts if "post__content" in html else listings).append(html)
+    return posts, listings
+
+
+def synthetic_corpus(pages):
+    posts = [corpus.post_html(i, inline_assets=i % 5 == 0) for i in range(pages)]
+    listings = [corpus.listing_html(page, total_posts=pages * 10) for page in range(1, max(2, pages // 10) + 1)]
+    return posts, listings
+
+
+def check_equivalence(candidates, posts, listings):
+    """Raise AssertionError unless every candidate parses the corpus exactly like the legacy code.
+
+    Candidates whose backend isn't installed are left out of the returned list.
+    """
+    (_, reference_post, reference_listing), others = candidates[0], candidates[1:]
+    expected_posts = [tuple(reference_post(html)) for html in posts]
+    expected_listings = [tuple(reference_listing(html, Config.BLOG_BASE_URL)) for html in listings]
+    checked = [candidates[0]]
+    for name, parse_post, parse_listing in others:
+        try:
+            for i, html in enumerate(posts):
+                got = tuple(parse_post(html))
+                if got != expected_posts[i]:
+                    raise AssertionError(f"{name} parses post page {i} differently:\n  legacy {expected_posts[i]!r}\n  got    {got!r}")
+            for i, html in enumerate(listings):
+                got = tuple(parse_listing(html, Config.BLOG_BASE_URL))
+                if got != expected_listings[i]:
+                    raise AssertionError(f"{name} parses listing page {i} differently:\n  legacy {expected_listings[i]!r}\n  got    {got!r}")
+        except ImportError as e:
+            print(f"{name:28s} skipped ({e})")
+            continue
+        checked.append((name, parse_post, parse_listing))
+    return checked
+
+
+def time_it(fn, pages, repeat):
+    """Best-of-`repeat` milliseconds per page."""
+    runs = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for html in pages:
+            fn(html)
+        runs.append((time.perf_counter() - started) * 1000 / max(1, len(pages)))
+    return min(runs), statistics.median(runs)
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--corpus", help="Directory of saved .html pages")
+    arg_parser.add_argument("--save-corpus", help="Write the synthetic corpus to this directory and exit")
+    arg_parser.add_argument("--pages", type=int, default=100, help="Synthetic post pages to generate")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    args = arg_parser.parse_args()
+
+    posts, listings = load_corpus(args.corpus) if args.corpus else synthetic_corpus(args.pages)
+    if args.save_corpus:
+        os.makedirs(args.save_corpus, exist_ok=True)
+        for kind, pages in (("post", posts), ("listing", listings)):
+            for i, html in enumerate(pages):
+                with open(os.path.join(args.save_corpus, f"{kind}-{i:05d}.html"), "w", encoding="utf-8") as f:
+                    f.write(html)
+        print(f"Wrote {len(posts) + len(listings)} pages to {args.save_corpus}")
+        return
+
+    print(f"Corpus: {len(posts)} post pages, {len(listings)} listing pages (best / median ms per page)")
+    candidates = [("legacy bs4 html.parser", legacy_parse_post, legacy_parse_listing)]
+    for backend in ("stream", "html.parser", "lxml"):
+        backend_config = type(f"Config[{backend}]", (Config,), {"HTML_PARSER_BACKEND": backend})
+        candidates.append((f"core.parser[{backend}]",
+                           lambda html, c=backend_config: parser.parse_post(html, c),
+                           lambda html, url, c=backend_config: parser.parse_listing(html, url, c)))
+
+    try:
+        candidates = check_equivalence(candidates, posts, listings)
+    except ImportError as e:
+        print(f"Legacy parser unavailable ({e}); timing without the equivalence check")
+    else:
+        print(f"All {len(candidates)} parsers agree with the legacy code on every page")
+
+    for name, parse_post, parse_listing in candidates:
+        try:
+            post_best, post_median = time_it(parse_post, posts, args.repeat)
+            listing_best, listing_median = time_it(lambda html: parse_listing(html, Config.BLOG_BASE_URL), listings, args.repeat)
+        except ImportError as e:
+            print(f"{name:28s} skipped ({e})")
+            continue
+        print(f"{name:28s} post {post_best:7.3f} / {post_median:7.3f}   listing {listing_best:7.3f} / {listing_median:7.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Synthetic pages shaped like the blog the scraper targets (article__title, pagination, post__content, disqus_thread)."""
+import random
+
+WORDS = ("agent model product latency design memory browser pipeline context prompt review "
+         "feedback metric user team system scale cache queue signal insight").split()
+
+
+def _sentence(rng, n=14):
+    return " ".join(rng.choice(WORDS) for _ in range(n)).capitalize() + "."
+
+
+def post_slug(i):
+    return f"synthetic-post-{i:05d}"
+
+
+def post_html(i, paragraphs=12, with_disqus=True, seed=None, inline_assets=False):
+    """A post page with navigation chrome, a post__content body and (optionally) a Disqus embed.
+
+    With `inline_assets`, the body also embeds a <script>, a <style> and a <template>, whose text is not post text.
+    """
+    rng = random.Random(seed if seed is not None else i)
+    body = "\n".join(f"<p>{' '.join(_sentence(rng) for _ in range(4))}</p>" for _ in range(paragraphs))
+    code = "<pre><code>def example():\n    return 42\n</code></pre>"
+    if inline_assets:
+        code += ("<script>if (a<b && c>d) { document.write('</p>'); }</script>"
+                 "<style>.post__content p > code { color: red; }</style>"
+                 "<template><p>Template text</p></template>")
+    disqus = ""
+    if with_disqus:
+        # Same shape as the real blog: a button that lazily injects the Disqus iframe into #disqus_thread
+        disqus = f"""<button id="show-comments-button" onclick="loadDisqus()">Comments</button>
+<div id="disqus_thread"></div>
+<script>
+var disqus_config = function () {{ this.page.identifier = '{post_slug(i)}'; }};
+function loadDisqus() {{
+    var frame = document.createElement('iframe');
+    frame.src = '/disqus/embed/comments/?t_i={post_slug(i)}';
+    frame.width = '100%'; frame.height = '700';
+    document.getElementById('disqus_thread').appendChild(frame);
+}}
+</script>"""
+    nav = "".join(f"<li><a href=\"/tags/{w}/\">{w}</a></li>" for w in WORDS)
+    return f"""<!DOCTYPE html>
+<html><head><title>Synthetic post {i}</title><script src="/js/site.js"></script></head>
+<body>
+<nav><ul>{nav}</ul></nav>
+<main>
+<h1 class="post-title">Synthetic post number {i}</h1>
+<div class="post__meta"><span>5 min read</span></div>
+<div class="post__content">
+{body}
+{code}
+<div class="callout"><p>{_sentence(rng)}</p></div>
+</div>
+{disqus}
+</main>
+<footer><p>&copy; Example</p></footer>
+</body></html>"""
+
+
+def listing_html(page, total_posts, per_page=10, base_path="/blog/"):
+    """A blog index/pagination page linking `per_page` posts, newest first, plus pagination links."""
+    start = (page - 1) * per_page
+    ids = range(total_posts - 1 - start, max(-1, total_posts - 1 - start - per_page), -1)
+    articles = "\n".join(
+        f"""<article class="article"><h2 class="article__title"><a href="/blog/{post_slug(i)}">Synthetic post number {i}</a></h2>
+<p class="article__excerpt">Excerpt for post {i}</p><a href="/tags/agent/">agent</a></article>"""
+        for i in ids)
+    pages = max(1, -(-total_posts // per_page))
+    pagination = " ".join(f"<a href=\"{base_path}page/{n}/\">{n}</a>" for n in range(2, pages + 1))
+    return f"""<!DOCTYPE html>
+<html><head><title>Blog</title></head>
+<body><main>
+{articles}
+<div class="pagination">{pagination}</div>
+</main></body></html>"""
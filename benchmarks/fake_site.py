@@ -0,0 +1,206 @@
+"""Local stand-in for the blog and its Disqus embed, served from a background thread.
+
+Routes:
+    /                               home page (used by WebScraper.test_connection)
+    /blog/, /blog/page/N/           listing pages, newest post first
+    /blog/<slug>                    post pages (post-title, post__content, show-comments-button, disqus_thread)
+    /tags/                          tag page linking a sample of posts
+    /sitemap.xml, /index.xml        sitemap and RSS feed (can be disabled to exercise the HTML crawl)
+    /disqus/embed/comments/?t_i=    Disqus-like comment iframe with the guest form and a disqus-threadData payload
+                                    (a recorded payload from `recordings_dir`/<slug>.json when there is one)
+    /disqus/api/posts               receives comments submitted from the iframe
+"""
+import html
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks import corpus
+
+EMBED_TEMPLATE = """<!DOCTYPE html>
+<html><head><title>Disqus Comments</title></head>
+<body>
+<script type="text/json" id="disqus-threadData">{thread_data}</script>
+<div id="posts"><ul class="post-list">{posts}</ul></div>
+<form id="reply" onsubmit="return false;">
+  <div role="textbox" contenteditable="true" id="editor" style="min-height:40px;border:1px solid #ccc"></div>
+  <input type="text" placeholder="Name" id="name-placeholder">
+  <div id="guest" style="display:none">
+    <input type="text" name="display_name">
+    <label><input type="checkbox" name="author-guest"> I'd rather post as a guest</label>
+    <input type="email" name="email" style="display:none">
+  </div>
+  <button type="button" class="proceed__button btn submit" id="submit">&rarr;</button>
+</form>
+<script>
+document.getElementById('name-placeholder').addEventListener('click', function () {{
+  setTimeout(function () {{ document.getElementById('guest').style.display = 'block'; }}, {expand_delay_ms});
+}});
+document.querySelector("input[name='author-guest']").addEventListener('change', function () {{
+  document.querySelector("input[name='email']").style.display = 'block';
+}});
+document.getElementById('submit').addEventListener('click', function () {{
+  var editor = document.getElementById('editor');
+  var message = editor.innerText;
+  fetch('/disqus/api/posts', {{method: 'POST', headers: {{'Content-Type': 'application/json'}},
+    body: JSON.stringify({{thread: '{slug}', message: message,
+                          author: document.querySelector("input[name='display_name']").value}})}})
+  .then(function () {{
+    var li = document.createElement('li');
+    li.innerHTML = '<div class="post-message"></div>';
+    li.firstChild.innerText = message;
+    document.querySelector('.post-list').appendChild(li);
+    editor.innerText = '';
+  }});
+}});
+</script>
+</body></html>"""
+
+
+class FakeBlog:
+    """State shared by the request handlers: the synthetic posts and the comments posted to them."""
+
+    def __init__(self, num_posts=50, per_page=10, latency=0.0, feeds=True, expand_delay_ms=50, recordings_dir=None):
+        self.num_posts = num_posts
+        self.per_page = per_page
+        self.latency = latency
+        self.feeds = feeds
+        self.expand_delay_ms = expand_delay_ms
+        self.comments = {}  # slug -> [{"author": ..., "message": ...}]
+        self.closed_threads = set()
+        self.recorded_threads = self.load_recordings(recordings_dir) if recordings_dir else {}  # slug -> payload
+        self.requests = 0
+        self.lock = threading.Lock()
+        now = datetime.now(timezone.utc)
+        self.published = {i: now - timedelta(days=self.num_posts - i) for i in range(num_posts)}
+
+    def slug_index(self, slug):
+        if slug.startswith("synthetic-post-"):
+            try:
+                i = int(slug.rsplit("-", 1)[1])
+            except ValueError:
+                return None
+            if 0 <= i < self.num_posts:
+                return i
+        return None
+
+    def sitemap(self, base_url):
+        urls = "".join(
+            f"<url><loc>{base_url}/blog/{corpus.post_slug(i)}</loc>"
+            f"<lastmod>{self.published[i].strftime('%Y-%m-%dT%H:%M:%SZ')}</lastmod></url>"
+            for i in range(self.num_posts))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>')
+
+    def rss(self, base_url):
+        items = "".join(
+            f"<item><title>Synthetic post number {i}</title><link>{base_url}/blog/{corpus.post_slug(i)}</link>"
+            f"<pubDate>{self.published[i].strftime('%a, %d %b %Y %H:%M:%S +0000')}</pubDate></item>"
+            for i in reversed(range(self.num_posts)))
+        return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+    @staticmethod
+    def load_recordings(directory):
+        """Read recorded #disqus-threadData payloads saved as <slug>.json."""
+        recordings = {}
+        for name in os.listdir(directory):
+            if name.endswith(".json"):
+                with open(os.path.join(directory, name)) as f:
+                    recordings[name[:-len(".json")]] = json.load(f)
+        return recordings
+
+    def seed_threads(self, commented=0, closed=0, author="AI Assistant"):
+        """Pre-populate the newest posts: `commented` threads with a comment by `author`, then `closed` closed threads."""
+        newest = [corpus.post_slug(i) for i in reversed(range(self.num_posts))]
+        for slug in newest[:commented]:
+            self.comments.setdefault(slug, []).append({"author": author, "message": "An earlier comment."})
+        self.closed_threads.update(newest[commented:commented + closed])
+
+    def thread_data(self, slug):
+        """Payload in the shape Disqus embeds as #disqus-threadData."""
+        if slug in self.recorded_threads:
+            return self.recorded_threads[slug]
+        posts = [{"author": {"name": c["author"], "isAnonymous": True}, "raw_message": c["message"]}
+                 for c in self.comments.get(slug, [])]
+        return {"code": 0, "response": {
+            "thread": {"identifiers": [slug], "isClosed": slug in self.closed_threads, "posts": len(posts)},
+            "posts": posts}}
+
+    def embed(self, slug):
+        posts = "".join(f'<li><div class="post-message">{html.escape(c["message"])}</div></li>'
+                        for c in self.comments.get(slug, []))
+        thread_data = json.dumps(self.thread_data(slug)).replace("</", "<\\/")  # Safe inside <script>
+        return EMBED_TEMPLATE.format(thread_data=thread_data,
+                                     posts=posts, slug=slug, expand_delay_ms=self.expand_delay_ms)
+
+
+class FakeBlogHandler(BaseHTTPRequestHandler):
+    """Serves a FakeBlog (attached to the server as `server.blog`)."""
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output readable
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        blog = self.server.blog
+        with blog.lock:
+            blog.requests += 1
+        if blog.latency:
+            time.sleep(blog.latency)
+        base_url = f"http://{self.headers.get('Host')}"
+        url = urlparse(self.path)
+        path = url.path
+
+        if path == "/":
+            return self._send(200, "<html><body><a href='/blog/'>Blog</a></body></html>")
+        if path == "/blog/":
+            return self._send(200, corpus.listing_html(1, blog.num_posts, blog.per_page))
+        if path.startswith("/blog/page/"):
+            page = int(path.strip("/").split("/")[-1])
+            return self._send(200, corpus.listing_html(page, blog.num_posts, blog.per_page))
+        if path.startswith("/blog/"):
+            i = blog.slug_index(path[len("/blog/"):].strip("/"))
+            if i is None:
+                return self._send(404, "Not found")
+            return self._send(200, corpus.post_html(i))
+        if path == "/tags/":
+            return self._send(200, corpus.listing_html(1, blog.num_posts, per_page=5, base_path="/tags/"))
+        if path == "/sitemap.xml" and blog.feeds:
+            return self._send(200, blog.sitemap(base_url), "application/xml")
+        if path == "/index.xml" and blog.feeds:
+            return self._send(200, blog.rss(base_url), "application/rss+xml")
+        if path == "/disqus/embed/comments/":
+            slug = parse_qs(url.query).get("t_i", [""])[0]
+            with blog.lock:
+                return self._send(200, blog.embed(slug))
+        return self._send(404, "Not found")
+
+    def do_POST(self):
+        blog = self.server.blog
+        if urlparse(self.path).path != "/disqus/api/posts":
+            return self._send(404, "Not found")
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with blog.lock:
+            blog.comments.setdefault(payload.get("thread", ""), []).append(
+                {"author": payload.get("author") or "Guest", "message": payload.get("message", "")})
+        return self._send(200, json.dumps({"code": 0}), "application/json")
+
+
+def start_fake_blog(port=0, **blog_options):
+    """Start the fake blog on 127.0.0.1 in a daemon thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeBlogHandler)
+    server.daemon_threads = True
+    server.blog = FakeBlog(**blog_options)
+    threading.Thread(target=server.serve_forever, name="fake-blog", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
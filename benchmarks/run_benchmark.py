@@ -0,0 +1,358 @@
+"""Offline end-to-end benchmark: the agent's stages against a local fake blog, fake Disqus embed and stub LLM.
+
+Usage:
+    python -m benchmarks.run_benchmark [--site-posts N] [--posts N] [--llm-latency S] [--with-browser] [--json PATH]
+                                       [--generation-concurrency N] [--posting-concurrency N] [--post-latency S]
+
+The agent's own traffic stays on the machine: WebScraper talks to benchmarks.fake_site,
+CommentGenerator talks to benchmarks.stub_llm, and (with --with-browser) DisqusPoster drives
+headless Chrome against the fake Disqus iframe. The exception is tiktoken, when installed,
+which downloads its encoding tables on first use unless they are already cached (without
+network access token counts fall back to an estimate). Each stage reports throughput and
+latency percentiles so runs can be compared before and after a change.
+
+The last stage runs CommentAgent.run_pipeline, the path `python main.py` takes, on a fresh agent.
+Without --with-browser its posting step submits the comment straight to the fake Disqus API
+after --post-latency seconds instead of driving Chrome. Fetch, generation and posting latencies
+of that run are read back from the metrics spans, so changes to the pipeline itself (stage
+order, concurrency, queue sizes) show up in the numbers.
+"""
+import argparse
+import json
+import math
+import os
+import tempfile
+import time
+
+from config.config import Config
+from benchmarks.fake_site import start_fake_blog
+from benchmarks.stub_llm import start_stub_llm
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of `values` (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct * len(ordered) / 100))  # Smallest value with at least pct% of values at or below it
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageResult:
+    """Latencies and wall-clock time of one benchmark stage."""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.items = 0
+        self.wall = 0.0
+        self.extra = {}
+
+    def as_dict(self):
+        return {
+            "stage": self.name,
+            "items": self.items,
+            "wall_seconds": round(self.wall, 4),
+            "throughput_per_second": round(self.items / self.wall, 3) if self.wall else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) * 1000, 2),
+            "p90_ms": round(percentile(self.latencies, 90) * 1000, 2),
+            "p99_ms": round(percentile(self.latencies, 99) * 1000, 2),
+            "max_ms": round(max(self.latencies, default=0.0) * 1000, 2),
+            **self.extra,
+        }
+
+
+def configure(site_url, llm_url, workdir, args):
+    """Point Config at the local servers. Must run before any core module is imported."""
+    Config.SITE_URL = site_url
+    Config.BLOG_BASE_URL = f"{site_url}/blog/"
+    Config.SITEMAP_URL = f"{site_url}/sitemap.xml"
+    Config.FEED_URLS = [f"{site_url}/index.xml"]
+    Config.DISCOVERY_MODE = args.discovery
+    Config.DISQUS_PRECHECK_ENABLED = not args.no_precheck
+    Config.DISQUS_EMBED_URL = f"{site_url}/disqus/embed/comments/?t_i={{identifier}}"
+    Config.OPENAI_BASE_URL = llm_url
+    Config.OPENAI_API_KEY = "stub-key"
+    Config.GENERATION_RETRY_BASE_DELAY = 0.05
+    Config.GENERATION_BATCH_CONCURRENCY = args.llm_concurrency
+    Config.GENERATION_CACHE_ENABLED = False  # Measure real generation, not cache hits
+    Config.HTTP_CACHE_FILE = os.path.join(workdir, "http_cache.sqlite3")
+    Config.GENERATION_CACHE_FILE = os.path.join(workdir, "generation_cache.sqlite3")
+    Config.MEMORY_DB_FILE = os.path.join(workdir, "agent_memory.sqlite3")
+    Config.MEMORY_FILE = os.path.join(workdir, "agent_memory.json")
+    Config.FETCH_WORKERS = args.workers
+    Config.REQUESTS_PER_SECOND_PER_HOST = args.rate
+    Config.REQUEST_BURST_PER_HOST = args.workers
+    Config.MAX_POSTS_TO_PROCESS = args.posts
+    Config.MANUAL_CAPTCHA_TIMEOUT = 0
+    Config.CAPTCHA_APPEAR_TIMEOUT = 0  # The fake blog has no reCAPTCHA
+    Config.OPERATOR_QUEUE_FILE = os.path.join(workdir, "operator_queue.json")
+    Config.SELECTOR_CACHE_FILE = os.path.join(workdir, "selector_cache.json")
+    Config.DELAY_BETWEEN_COMMENTS = 0
+    if not args.pacing:
+        Config.COMMENT_DELAY_JITTER = (0, 0)
+    Config.GENERATION_CONCURRENCY = args.generation_concurrency
+    Config.POSTING_CONCURRENCY = args.posting_concurrency
+    Config.BROWSER_POOL_SIZE = args.posting_concurrency
+    Config.SELENIUM_HEADLESS = True
+    Config.DEBUG = args.debug
+    Config.METRICS_JSONL_FILE = os.path.join(workdir, "metrics.jsonl")
+
+
+def precheck_skips():
+    """Posts the Disqus pre-check has kept away from the browser so far."""
+    from core.metrics import metrics
+    return sum(value for (name, labels), value in metrics.counters.items()
+               if name == "disqus_precheck" and dict(labels).get("status") in ("closed", "already_commented"))
+
+
+def bench_discovery(name, agent, blog):
+    """Run discovery with a fresh WebScraper. The caller closes the returned scraper once it is done with the posts."""
+    from core.scraper import WebScraper
+    result = StageResult(name)
+    scraper = WebScraper()
+    original_get_page = scraper.get_page
+
+    def timed_get_page(url):
+        started = time.perf_counter()
+        try:
+            return original_get_page(url)
+        finally:
+            result.latencies.append(time.perf_counter() - started)
+    scraper.get_page = timed_get_page
+
+    requests_before = blog.requests
+    skips_before = precheck_skips()
+    started = time.perf_counter()
+    posts = list(scraper.iter_blog_posts(agent))
+    result.wall = time.perf_counter() - started
+    result.items = len(posts)
+    result.extra["http_requests"] = blog.requests - requests_before
+    result.extra["get_page_calls"] = len(result.latencies)
+    result.extra["precheck_skipped"] = precheck_skips() - skips_before
+    if scraper.cache:
+        result.extra["cache"] = dict(scraper.cache.stats)
+    return result, posts, scraper
+
+
+def bench_dedup_lookup(index_size, lookups=2000, seed=7):
+    """Near-duplicate lookups against a SimHash index of `index_size` random fingerprints."""
+    import random
+    from core.dedup import SimHashIndex
+    rng = random.Random(seed)
+    result = StageResult(f"dedup lookup ({index_size} posts)")
+    index = SimHashIndex()
+    fingerprints = [rng.getrandbits(64) for _ in range(index_size)]
+    for i, fingerprint in enumerate(fingerprints):
+        index.add(f"post-{i}", fingerprint)
+    hits = 0
+    started = time.perf_counter()
+    for _ in range(lookups):
+        probe = rng.choice(fingerprints) ^ (1 << rng.randrange(64))  # One bit away from an indexed post
+        lookup_started = time.perf_counter()
+        hits += index.find(probe) is not None
+        result.latencies.append(time.perf_counter() - lookup_started)
+    result.wall = time.perf_counter() - started
+    result.items = lookups
+    result.extra["hits"] = hits
+    return result
+
+
+def bench_generation_sequential(posts):
+    from core.comment_generator import CommentGenerator
+    result = StageResult("generation (sequential)")
+    generator = CommentGenerator()
+    started = time.perf_counter()
+    for post in posts:
+        outcome = generator.generate_result(post)
+        result.latencies.append(outcome.latency or 0.0)
+        result.items += 1 if outcome.ok else 0
+    result.wall = time.perf_counter() - started
+    return result
+
+
+def bench_generation_concurrent(posts):
+    from core.comment_generator import CommentGenerator
+    result = StageResult(f"generation (async x{Config.GENERATION_BATCH_CONCURRENCY})")
+    generator = CommentGenerator()
+    started = time.perf_counter()
+    outcomes = generator.generate_comments(posts)
+    result.wall = time.perf_counter() - started
+    result.latencies = [outcome.latency or 0.0 for outcome in outcomes]
+    result.items = sum(1 for outcome in outcomes if outcome.ok)
+    result.extra["retries"] = sum(outcome.attempts - 1 for outcome in outcomes)
+    result.extra["prompt_tokens"] = sum(outcome.prompt_tokens or 0 for outcome in outcomes)
+    return result, outcomes
+
+
+def bench_posting(posts, outcomes, blog):
+    from core.browser_pool import BrowserPool
+    from core.disqus_poster import DisqusPoster
+    result = StageResult("posting (headless browser)")
+    pool = BrowserPool(size=1, headless=True)
+    comments = {outcome.url: outcome.comment for outcome in outcomes if outcome.ok}
+    started = time.perf_counter()
+    try:
+        for post in posts:
+            if post.url not in comments:
+                continue
+            post_started = time.perf_counter()
+            with pool.lease() as driver:
+                posted = DisqusPoster().post(driver, post.url, comments[post.url])
+            result.latencies.append(time.perf_counter() - post_started)
+            result.items += 1 if posted else 0
+    finally:
+        pool.close()
+    result.wall = time.perf_counter() - started
+    result.extra["comments_received"] = sum(len(c) for c in blog.comments.values())
+    result.extra["browser_pool"] = dict(pool.stats)
+    return result
+
+
+def http_post_comment(blog_url, post_latency):
+    """Stand-in for CommentAgent.post_comment_selenium: submit the comment straight to the fake Disqus API.
+
+    `post_latency` seconds of sleep stand in for the browser session, so generation and posting overlap
+    the way they do in a real run.
+    """
+    import urllib.request
+    from core.metrics import metrics
+
+    def post_comment(url, comment_text):
+        slug = url.rstrip("/").rsplit("/", 1)[-1]
+        with metrics.span("post_comment", url=url, site=Config.SITE_NAME) as span:
+            time.sleep(post_latency)
+            request = urllib.request.Request(
+                f"{blog_url}/disqus/api/posts", method="POST", headers={"Content-Type": "application/json"},
+                data=json.dumps({"thread": slug, "message": comment_text, "author": Config.COMMENT_NAME}).encode())
+            with urllib.request.urlopen(request, timeout=10) as response:
+                span["posted"] = response.status == 200
+            span["outcome"] = "posted"
+            return "posted" if span["posted"] else None
+    return post_comment
+
+
+def bench_pipeline(blog, site_url, args):
+    """CommentAgent.run_pipeline end to end, as run_agent runs it, with per-stage latencies from the metrics spans."""
+    from core.agent import CommentAgent
+    from core.metrics import metrics
+    posting = "headless browser" if args.with_browser else "HTTP posting"
+    total = StageResult(f"pipeline end to end ({posting})")
+    stages = {"get_page": StageResult("  pipeline: fetch pages"),
+              "generate_comment": StageResult("  pipeline: generate"),
+              "post_comment": StageResult("  pipeline: post")}
+
+    agent = CommentAgent()
+    if not args.with_browser:
+        agent.post_comment_selenium = http_post_comment(site_url, args.post_latency)
+    comments_before = sum(len(c) for c in blog.comments.values())
+    requests_before = blog.requests
+    started_at = time.time()
+    started = time.perf_counter()
+    try:
+        total.items = agent.run_pipeline()
+    finally:
+        total.wall = time.perf_counter() - started
+        agent.close()
+
+    first_post = None
+    for event in list(metrics.events):
+        stage = stages.get(event.get("name"))
+        if event["type"] != "span" or stage is None or event["ts"] < started_at:
+            continue
+        stage.latencies.append(event["duration"])
+        stage.items += 1
+        if event["name"] == "post_comment":
+            total.latencies.append(event["ts"] - started_at)  # Time from the start of the run until each comment was done
+            first_post = min(first_post or event["ts"], event["ts"])
+    for stage in stages.values():
+        stage.wall = total.wall
+    total.extra["http_requests"] = blog.requests - requests_before
+    total.extra["comments_received"] = sum(len(c) for c in blog.comments.values()) - comments_before
+    total.extra["first_comment_seconds"] = round(first_post - started_at, 3) if first_post else None
+    total.extra["latencies"] = "time from the start of the run until each comment was posted"
+    return [total, *stages.values()]
+
+
+def print_report(results):
+    print(f"\n{'stage':32s} {'items':>6s} {'wall s':>8s} {'items/s':>8s} {'p50 ms':>9s} {'p90 ms':>9s} {'p99 ms':>9s} {'max ms':>9s}")
+    for r in results:
+        d = r.as_dict()
+        print(f"{d['stage']:32s} {d['items']:6d} {d['wall_seconds']:8.2f} {d['throughput_per_second']:8.2f} "
+              f"{d['p50_ms']:9.1f} {d['p90_ms']:9.1f} {d['p99_ms']:9.1f} {d['max_ms']:9.1f}")
+        for key, value in r.extra.items():
+            print(f"    {key}: {value}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--site-posts", type=int, default=100, help="Posts on the fake blog")
+    arg_parser.add_argument("--posts", type=int, default=20, help="MAX_POSTS_TO_PROCESS for the run")
+    arg_parser.add_argument("--discovery", default="auto", choices=["auto", "sitemap", "feed", "html"])
+    arg_parser.add_argument("--page-latency", type=float, default=0.02, help="Seconds the fake blog waits per request")
+    arg_parser.add_argument("--llm-latency", type=float, default=0.5, help="Seconds the stub LLM waits per request")
+    arg_parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Share of LLM requests answered with 429")
+    arg_parser.add_argument("--llm-concurrency", type=int, default=4)
+    arg_parser.add_argument("--workers", type=int, default=4, help="FETCH_WORKERS")
+    arg_parser.add_argument("--rate", type=float, default=50.0, help="REQUESTS_PER_SECOND_PER_HOST")
+    arg_parser.add_argument("--commented-threads", type=int, default=0,
+                            help="Newest threads that already have a comment by COMMENT_NAME")
+    arg_parser.add_argument("--closed-threads", type=int, default=0, help="Newest threads (after those) that are closed")
+    arg_parser.add_argument("--embed-recordings", help="Directory of recorded disqus-threadData payloads (<slug>.json)")
+    arg_parser.add_argument("--no-precheck", action="store_true", help="Disable the HTTP-only Disqus pre-check")
+    arg_parser.add_argument("--dedup-index-size", type=int, default=20000, help="Posts in the dedup lookup benchmark")
+    arg_parser.add_argument("--with-browser", action="store_true", help="Also post through headless Chrome (needs chromedriver)")
+    arg_parser.add_argument("--generation-concurrency", type=int, default=Config.GENERATION_CONCURRENCY,
+                            help="GENERATION_CONCURRENCY for the pipeline run")
+    arg_parser.add_argument("--posting-concurrency", type=int, default=Config.POSTING_CONCURRENCY,
+                            help="POSTING_CONCURRENCY (and BROWSER_POOL_SIZE) for the pipeline run")
+    arg_parser.add_argument("--post-latency", type=float, default=0.5,
+                            help="Seconds each stand-in post takes when the pipeline runs without --with-browser")
+    arg_parser.add_argument("--pacing", action="store_true", help="Keep the random COMMENT_DELAY_JITTER between comments")
+    arg_parser.add_argument("--json", help="Write the results to this file as JSON")
+    arg_parser.add_argument("--debug", action="store_true", help="Keep the agent's verbose logging")
+    args = arg_parser.parse_args()
+
+    blog_server, site_url = start_fake_blog(num_posts=args.site_posts, latency=args.page_latency,
+                                            feeds=args.discovery != "html", recordings_dir=args.embed_recordings)
+    blog_server.blog.seed_threads(args.commented_threads, args.closed_threads, author=Config.COMMENT_NAME)
+    llm_server, llm_url = start_stub_llm(latency=args.llm_latency, error_rate=args.llm_error_rate)
+    workdir = tempfile.mkdtemp(prefix="blog-commenter-bench-")
+    configure(site_url, llm_url, workdir, args)
+    print(f"Fake blog at {site_url} ({args.site_posts} posts), stub LLM at {llm_url}, state in {workdir}")
+
+    from core.agent import CommentAgent
+    agent = CommentAgent()  # Discovery consults its memory; OpenAI and Selenium are only loaded on first use
+    blog = blog_server.blog
+
+    results = []
+    cold, posts, cold_scraper = bench_discovery("discovery (cold cache)", agent, blog)
+    try:  # The discovered posts keep their bodies in cold_scraper's spill file until generation is done
+        results.append(cold)
+        warm, _, warm_scraper = bench_discovery("discovery (warm cache)", agent, blog)
+        warm_scraper.close()
+        results.append(warm)
+        results.append(bench_dedup_lookup(args.dedup_index_size))
+        results.append(bench_generation_sequential(posts))
+        concurrent, outcomes = bench_generation_concurrent(posts)
+        results.append(concurrent)
+        if args.with_browser:
+            results.append(bench_posting(posts, outcomes, blog))
+    finally:
+        cold_scraper.close()
+    results.extend(bench_pipeline(blog, site_url, args))
+
+    print_report(results)
+    from core.metrics import metrics
+    print(f"\n{metrics.summary()}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([r.as_dict() for r in results], f, indent=4)
+        print(f"\nWrote {args.json}")
+
+    blog_server.shutdown()
+    llm_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
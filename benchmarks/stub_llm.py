@@ -0,0 +1,78 @@
+"""OpenAI-compatible stub serving POST /v1/chat/completions with configurable latency and failure rate."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_COMMENT = ("Great breakdown of the trade-offs here - the point about measuring before optimizing really "
+                "resonated. How do you decide which stage of the pipeline to tackle first?")
+
+
+class StubLLM:
+    """Behaviour of the stub: per-request latency (seconds, with jitter) and the share of requests answered with 429."""
+
+    def __init__(self, latency=0.5, jitter=0.1, error_rate=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.rate_limited = 0
+        self.lock = threading.Lock()
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    """Answers chat completions for a StubLLM (attached to the server as `server.llm`)."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        llm = self.server.llm
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "not found"}})
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+
+        with llm.lock:
+            llm.requests += 1
+            rate_limited = llm.rng.random() < llm.error_rate
+            delay = max(0.0, llm.latency + llm.rng.uniform(-llm.jitter, llm.jitter))
+            if rate_limited:
+                llm.rate_limited += 1
+        if rate_limited:
+            return self._send_json(429, {"error": {"message": "Rate limit reached", "type": "rate_limit_error"}},
+                                   {"Retry-After": "0"})
+        time.sleep(delay)
+
+        prompt_tokens = sum(len(m.get("content", "").split()) for m in request.get("messages", []))
+        completion_tokens = len(STUB_COMMENT.split())
+        self._send_json(200, {
+            "id": f"chatcmpl-stub-{llm.requests}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub"),
+            "choices": [{"index": 0, "finish_reason": "stop",
+                         "message": {"role": "assistant", "content": STUB_COMMENT}}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        })
+
+
+def start_stub_llm(port=0, **llm_options):
+    """Start the stub on 127.0.0.1 in a daemon thread. Returns (server, base_url) where base_url ends in /v1."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubLLMHandler)
+    server.daemon_threads = True
+    server.llm = StubLLM(**llm_options)
+    threading.Thread(target=server.serve_forever, name="stub-llm", daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
@@ -1,38 +1,206 @@
+import json
 import os
 
 class Config:
     """Configuration class for the Blog Commenter Agent."""
 
     # Website configuration
+    SITE_NAME = "default"  # Label used in logs and metrics; also names the per-site memory directory
     SITE_URL = "https://example.com"  # Your website URL (no trailing slash)
     BLOG_BASE_URL = f"{SITE_URL}/blog/"  # Blog section URL
 
+    # Post discovery - "auto" tries the sitemap, then feeds, then crawls the HTML listing pages
+    DISCOVERY_MODE = "auto"  # "auto", "sitemap", "feed" or "html"
+    SITEMAP_URL = f"{SITE_URL}/sitemap.xml"  # May be a sitemap index
+    FEED_URLS = [f"{SITE_URL}/index.xml", f"{SITE_URL}/feed.xml", f"{SITE_URL}/rss.xml", f"{SITE_URL}/atom.xml"]
+
     # Disqus configuration
     DISQUS_SHORTNAME = "your-disqus-shortname"  # Your Disqus forum shortname
+    DISQUS_PRECHECK_ENABLED = True  # Fetch the thread over HTTP first; skip closed or already commented threads
+    DISQUS_EMBED_URL = "https://disqus.com/embed/comments/?base=default&f={shortname}&t_i={identifier}&t_u={url}&s_o=default"
+    DISQUS_PRECHECK_TIMEOUT = 10  # Seconds
 
     # OpenAI API configuration
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # Get API key from environment variable
+    OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")  # Optional OpenAI-compatible endpoint (e.g. a local stub server)
+    OPENAI_MODEL = "gpt-4o"
+    OPENAI_TEMPERATURE = 0.7
+    OPENAI_MAX_TOKENS = 150
+    GENERATION_MAX_RETRIES = 4  # Retries on 429 / 5xx / connection errors
+    GENERATION_RETRY_BASE_DELAY = 1.0  # Seconds; doubled on every retry
+    GENERATION_BATCH_CONCURRENCY = 4  # Max concurrent requests in CommentGenerator.generate_comments
+    PROMPT_CONTENT_TOKEN_BUDGET = 1200  # Tokens of post content sent to the model (most relevant paragraphs first)
+    CONTENT_CACHE_MAX_ENTRIES = 256  # Condensed post texts kept in memory, keyed by content hash
 
     # Scraping and commenting configuration
     USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36"
-    DELAY_BETWEEN_REQUESTS = 2  # Delay in seconds between HTTP requests
+    FETCH_WORKERS = 4  # Number of concurrent page fetches during discovery
+    REQUESTS_PER_SECOND_PER_HOST = 0.5  # Sustained request rate allowed per host (token bucket refill rate)
+    REQUEST_BURST_PER_HOST = 2  # Requests a host may receive back-to-back before the rate limit kicks in
+    HTTP_CONNECT_TIMEOUT = 5  # Seconds to establish a connection
+    HTTP_READ_TIMEOUT = 20  # Max seconds between bytes of a response
+    HTTP_MAX_RETRIES = 3  # Retries on connection errors, 429 and 5xx (GET/HEAD only)
+    HTTP_RETRY_BACKOFF = 0.5  # Seconds; doubled on every retry unless the server sends Retry-After
+    HTTP_MAX_BODY_BYTES = 5 * 1024 * 1024  # Larger responses are abandoned mid-download
     DELAY_BETWEEN_COMMENTS = 15  # Delay in seconds between posting comments
+    COMMENT_DELAY_JITTER = (0.5, 1.5)  # Random extra seconds added to every DELAY_BETWEEN_COMMENTS
     MAX_POSTS_TO_PROCESS = 1  # Limit number of posts to process in one run
 
+    # Pipeline configuration - discovery, generation and posting overlap through bounded queues
+    GENERATION_CONCURRENCY = 2  # Comments generated in parallel
+    POSTING_CONCURRENCY = 3  # Comments posted in parallel, i.e. sessions that can wait for the operator at once (keep <= BROWSER_POOL_SIZE)
+    PIPELINE_QUEUE_SIZE = 4  # Max items waiting between two stages
+
     # Comment user configuration
     COMMENT_NAME = "AI Assistant"
     COMMENT_EMAIL = "ai-assistant@example.com"  # Your actual email for Disqus
 
-    # Memory configuration - make sure the 'memory' directory exists in the project root
-    MEMORY_FILE = "memory/agent_memory.json"  # File to store memory of commented posts
+    # Memory configuration
+    MEMORY_BACKEND = "sqlite"  # "sqlite" (indexed, transactional) or "json" (legacy single file)
+    MEMORY_DB_FILE = "memory/agent_memory.sqlite3"  # SQLite memory of commented posts
+    MEMORY_FILE = "memory/agent_memory.json"  # Legacy JSON memory; imported into SQLite once on first run
+    DEDUP_ENABLED = True  # Collapse URL variants and near-duplicate content (SimHash index stored in MEMORY_DB_FILE)
+    POST_BODY_SPILL_DIR = None  # Where discovered post bodies wait for generation (None: the system temp dir)
+    DEDUP_MAX_DISTANCE = 3  # Max differing SimHash bits (out of 64) for two posts to count as the same article
+
+    # HTML parsing - "stream" (single-pass stdlib extractor), "lxml" or "html.parser" (BeautifulSoup backends)
+    HTML_PARSER_BACKEND = "stream"
+
+    # HTTP response cache - stores page bodies and ETag/Last-Modified validators between runs
+    HTTP_CACHE_ENABLED = True
+    HTTP_CACHE_FILE = "memory/http_cache.sqlite3"
+    HTTP_CACHE_MAX_BYTES = 50 * 1024 * 1024  # Least recently used pages are evicted above this size
+    HTTP_CACHE_TTL = 15 * 60  # Seconds a cached page is served without revalidating it
+
+    # Generated comment cache - a comment that failed to post is reused on the next run instead of regenerated
+    GENERATION_CACHE_ENABLED = True
+    GENERATION_CACHE_FILE = "memory/generation_cache.sqlite3"
+    GENERATION_CACHE_MAX_ENTRIES = 500  # Least recently used comments are evicted above this count
+
+    # Retry queue - posts that failed to get a comment are retried from the memory database, without re-crawling
+    WORK_QUEUE_ENABLED = True
+    WORK_QUEUE_MAX_ATTEMPTS = 4  # Failures before a post is dead-lettered and never tried again
+    WORK_QUEUE_RETRY_BASE_DELAY = 30 * 60  # Seconds before the first retry; doubled after every further failure
+    WORK_QUEUE_RETRY_MAX_DELAY = 24 * 60 * 60
+
+    # Metrics and profiling
+    METRICS_ENABLED = True
+    METRICS_JSONL_FILE = "memory/metrics.jsonl"  # Spans and counters appended after every run (None to disable)
+    METRICS_PROMETHEUS_FILE = None  # e.g. "/var/lib/node_exporter/textfile_collector/blog_commenter.prom"
+    PROFILE_RUN = False  # Capture cProfile + tracemalloc for the whole run
+    PROFILE_OUTPUT_DIR = "memory/profiles"
+
+    # Multi-site scheduling - a JSON list of site profiles, each overriding settings in this class except PROCESS_WIDE_SETTINGS
+    SITES_FILE = "config/sites.json"  # Used by main.py when it exists; see config/sites.example.json
+    MAX_CONCURRENT_SITES = 4  # Sites whose pipelines run at the same time
+    SHARED_FETCH_WORKERS = 8  # Page fetches in flight across all sites (each site is still limited to FETCH_WORKERS)
+
+    # Daemon mode (python main.py daemon)
+    DAEMON_POLL_INTERVAL = 30 * 60  # Seconds between polls; keep above HTTP_CACHE_TTL so every poll revalidates the feeds
 
     # Debug mode
     DEBUG = True  # Set to True for verbose logging
 
     # Selenium settings
-    SELENIUM_HEADLESS = False  # Set to False to show browser UI for captcha solving
+    SELENIUM_HEADLESS = True  # The operator reaches headless sessions through DevTools; set False to solve captchas in a visible window
     SELENIUM_TIMEOUT = 30  # Default timeout in seconds
-    SELENIUM_WAIT_AFTER_COMMENT = 10  # Seconds to wait after posting a comment
+    SELENIUM_PAGE_LOAD_TIMEOUT = 15  # Max seconds for the post page to reach readyState 'complete'
+    SELENIUM_IFRAME_TIMEOUT = 15  # Max seconds for the Disqus iframe to appear
+    SELENIUM_EDITOR_TIMEOUT = 10  # Max seconds for the comment editor to become usable
+    SELENIUM_FORM_TIMEOUT = 10  # Max seconds for each guest form field to expand/appear
+    SELENIUM_WAIT_AFTER_COMMENT = 10  # Max seconds to wait for a submitted comment to appear in the thread
+    SELENIUM_CLEARED_EDITOR_SETTLE = 3  # Seconds the editor must stay empty before an unrendered submit counts as accepted
     SELENIUM_CHROMEDRIVER_PATH = '/opt/homebrew/bin/chromedriver' # Path to chromedriver
+    BROWSER_POOL_SIZE = 3  # Number of warm Chrome sessions kept across posts
+    BROWSER_MAX_USES = 20  # Recycle a pooled browser after this many posts
+    SELECTOR_CACHE_FILE = "memory/selector_cache.json"  # Which Disqus selector worked at each posting step (None to disable)
     # Manual captcha solving
-    MANUAL_CAPTCHA_TIMEOUT = 10  # Maximum time (in seconds) to wait for manual captcha solving
\ No newline at end of file
+    CAPTCHA_HANDOFF = True  # Park filled-in forms in the operator queue instead of waiting on a visible browser
+    CAPTCHA_APPEAR_TIMEOUT = 3  # Seconds to wait for a reCAPTCHA widget to render; one rendering later is solved after the submit stalls
+    MANUAL_CAPTCHA_TIMEOUT = 10  # Maximum time (in seconds) to wait for manual captcha solving in a visible browser
+    OPERATOR_SOLVE_TIMEOUT = 15 * 60  # Seconds a handed-off session waits for the operator before it is retried later
+    OPERATOR_QUEUE_FILE = "memory/operator_queue.json"  # Sessions currently waiting for the operator (None to disable)
+
+    # Settings derived from SITE_URL or SITE_NAME; for_site() recomputes them unless a profile sets them explicitly
+    SITE_DERIVED_SETTINGS = {
+        "BLOG_BASE_URL": lambda c: f"{c.SITE_URL}/blog/",
+        "SITEMAP_URL": lambda c: f"{c.SITE_URL}/sitemap.xml",
+        "FEED_URLS": lambda c: [f"{c.SITE_URL}/{name}" for name in ("index.xml", "feed.xml", "rss.xml", "atom.xml")],
+        "MEMORY_DB_FILE": lambda c: f"memory/sites/{c.SITE_NAME}/agent_memory.sqlite3",
+        "MEMORY_FILE": lambda c: f"memory/sites/{c.SITE_NAME}/agent_memory.json",
+        "SELECTOR_CACHE_FILE": lambda c: f"memory/sites/{c.SITE_NAME}/selector_cache.json",
+    }
+
+    # Settings read by components every site shares (LLM client, HTTP transport and caches, browser pool,
+    # metrics, the scheduler itself); a site profile can't change them
+    PROCESS_WIDE_SETTINGS = frozenset([
+        "OPENAI_API_KEY", "OPENAI_BASE_URL", "OPENAI_MODEL", "OPENAI_TEMPERATURE", "OPENAI_MAX_TOKENS",
+        "GENERATION_MAX_RETRIES", "GENERATION_RETRY_BASE_DELAY", "GENERATION_BATCH_CONCURRENCY",
+        "PROMPT_CONTENT_TOKEN_BUDGET", "CONTENT_CACHE_MAX_ENTRIES",
+        "HTTP_CONNECT_TIMEOUT", "HTTP_READ_TIMEOUT", "HTTP_MAX_RETRIES", "HTTP_RETRY_BACKOFF", "HTTP_MAX_BODY_BYTES",
+        "HTTP_CACHE_ENABLED", "HTTP_CACHE_FILE", "HTTP_CACHE_MAX_BYTES", "HTTP_CACHE_TTL", "POST_BODY_SPILL_DIR",
+        "GENERATION_CACHE_ENABLED", "GENERATION_CACHE_FILE", "GENERATION_CACHE_MAX_ENTRIES",
+        "METRICS_ENABLED", "METRICS_JSONL_FILE", "METRICS_PROMETHEUS_FILE", "PROFILE_RUN", "PROFILE_OUTPUT_DIR",
+        "SITES_FILE", "MAX_CONCURRENT_SITES", "SHARED_FETCH_WORKERS", "DAEMON_POLL_INTERVAL",
+        "SELENIUM_HEADLESS", "SELENIUM_CHROMEDRIVER_PATH", "BROWSER_POOL_SIZE", "BROWSER_MAX_USES",
+        "OPERATOR_QUEUE_FILE", "SITE_DERIVED_SETTINGS", "PROCESS_WIDE_SETTINGS",
+    ])
+
+    @classmethod
+    def for_site(cls, name, **overrides):
+        """Return a Config subclass for one site profile.
+
+        Only settings this class already defines, and that are not PROCESS_WIDE_SETTINGS, can be
+        overridden. URLs and memory paths that depend on SITE_URL / SITE_NAME are re-derived, so
+        each site gets its own memory namespace.
+        """
+        unknown = sorted(key for key in overrides if not key.isupper() or not hasattr(cls, key))
+        if unknown:
+            raise ValueError(f"Unknown settings in site profile '{name}': {', '.join(unknown)}")
+        shared = sorted(key for key in overrides if key in cls.PROCESS_WIDE_SETTINGS)
+        if shared:
+            raise ValueError(f"Settings in site profile '{name}' apply to all sites and can only be set in "
+                             f"config/config.py: {', '.join(shared)}")
+        site_config = type(f"Config[{name}]", (cls,), {"SITE_NAME": name, **overrides})
+        for key, derive in cls.SITE_DERIVED_SETTINGS.items():
+            if key not in overrides:
+                setattr(site_config, key, derive(site_config))
+        return site_config
+
+    @classmethod
+    def load_sites(cls, path=None):
+        """Load the site profiles in `path` (default SITES_FILE) as a list of per-site Config classes."""
+        path = path or cls.SITES_FILE
+        with open(path) as f:
+            profiles = json.load(f)
+        sites = []
+        for profile in profiles:
+            profile = dict(profile)
+            name = profile.pop("name", None)
+            if not name:
+                raise ValueError(f"Every site profile in {path} needs a 'name'")
+            sites.append(cls.for_site(name, **profile))
+        names = [site.SITE_NAME for site in sites]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Site profile names in {path} must be unique")
+        cls._adopt_legacy_memory(sites, profiles)
+        return sites
+
+    @classmethod
+    def _adopt_legacy_memory(cls, sites, profiles):
+        """Keep the single-site memory when switching to site profiles.
+
+        If memory exists at the single-site paths, the profile for SITE_URL (or the first
+        profile) keeps using those paths instead of starting empty under memory/sites/<name>/,
+        unless it sets them itself.
+        """
+        if not sites or not any(os.path.exists(getattr(cls, key)) for key in ("MEMORY_DB_FILE", "MEMORY_FILE")):
+            return
+        index = next((i for i, site in enumerate(sites) if site.SITE_URL == cls.SITE_URL), 0)
+        site = sites[index]
+        if any(os.path.exists(getattr(site, key)) for key in ("MEMORY_DB_FILE", "MEMORY_FILE")):
+            return  # The profile already has memory of its own
+        for key in ("MEMORY_DB_FILE", "MEMORY_FILE", "SELECTOR_CACHE_FILE"):
+            if key not in profiles[index]:
+                setattr(site, key, getattr(cls, key))
+        print(f"Site '{site.SITE_NAME}' keeps the existing single-site memory at {site.MEMORY_DB_FILE}")
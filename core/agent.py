@@ -1,314 +1,309 @@
-import json
 import time
 import random
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
+import threading
+import traceback
 from config.config import Config  # Import Config from config module
 from core.scraper import WebScraper
 from core.comment_generator import CommentGenerator
+from core.memory_store import create_memory_store
+from core.dedup import ContentIndex, SimHashIndex, canonicalize_url
+from core.browser_pool import BrowserPool
+from core.operator_queue import operator_queue
+from core.pipeline import Pipeline
+from core.post_record import PostRecord
+from core.selector_cache import SelectorCache
+from core.work_queue import InfrastructureFailure, WorkQueue
+from core.metrics import metrics, profile_run
 
 
 class CommentAgent:
     """Main agent class to orchestrate blog commenting."""
 
-    def __init__(self):
-        self.scraper = WebScraper()
-        self.comment_generator = CommentGenerator()
-        self.memory = self.load_memory()
-
-    def load_memory(self):
-        """Load memory of commented posts from JSON file."""
-        try:
-            with open(Config.MEMORY_FILE, 'r') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return {"commented_posts": []}
-        except json.JSONDecodeError:
-            print("Warning: Memory file is corrupted. Starting with empty memory.")
-            return {"commented_posts": []}
-
-    def save_memory(self):
-        """Save memory of commented posts to JSON file."""
-        with open(Config.MEMORY_FILE, 'w') as f:
-            json.dump(self.memory, f, indent=4)
+    def __init__(self, config=Config, scraper=None, comment_generator=None, browser_pool=None):
+        """`config` is the settings class of the site to work on. The scraper, comment generator and
+        browser pool can be passed in to share them between sites; the agent only closes what it created."""
+        self.config = config
+        self.owns_shared = comment_generator is None and browser_pool is None
+        self.scraper = scraper or WebScraper(config=config)
+        self.comment_generator = comment_generator or CommentGenerator()
+        self.memory = create_memory_store(config=config)  # Each site has its own memory namespace
+        self.content_index = ContentIndex(config.MEMORY_DB_FILE, config.DEDUP_MAX_DISTANCE,
+                                          self.memory.urls()) if config.DEDUP_ENABLED else None
+        self.run_index = SimHashIndex(config.DEDUP_MAX_DISTANCE)  # Posts already queued in the current run
+        self.work_queue = WorkQueue(config.MEMORY_DB_FILE, config.WORK_QUEUE_MAX_ATTEMPTS, config.WORK_QUEUE_RETRY_BASE_DELAY,
+                                    config.WORK_QUEUE_RETRY_MAX_DELAY) if config.WORK_QUEUE_ENABLED else None
+        self.browser_pool = browser_pool or BrowserPool()
+        self.selector_cache = SelectorCache(config.SELECTOR_CACHE_FILE)  # Disqus selectors that worked on this site
 
     def is_already_commented(self, post_url):
-        """Check if the post URL is already in memory."""
-        return post_url in self.memory["commented_posts"]
-
-    def mark_post_as_commented(self, post_url):
-        """Add the post URL to memory."""
-        if not self.is_already_commented(post_url):
-            self.memory["commented_posts"].append(post_url)
-            self.save_memory()
-
-    def post_comment_selenium(self, url, comment_text, headless=Config.SELENIUM_HEADLESS):
-        """Posts a comment to Disqus using Selenium WebDriver."""
-        # Configure Chrome options
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument("--headless")  # Run in headless mode
-        chrome_options.add_argument("--window-size=1920,1080")  # Set window size
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        # Add user agent to make it look like a real browser
-        chrome_options.add_argument(
-            "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
-
-        # Initialize the driver
-        service = Service(executable_path=Config.SELENIUM_CHROMEDRIVER_PATH)  # Use path from Config
-        driver = webdriver.Chrome(service=service, options=chrome_options)  # Use service object
-
+        """Check if the post URL, or another URL variant of the same post, is already in memory."""
+        with metrics.span("memory_lookup"):
+            if self.memory.contains(post_url):
+                return True
+            return self.content_index is not None and canonicalize_url(post_url) in self.content_index
+
+    def record_post(self, post, outcome="posted", comment_text=None):
+        """Record a PostRecord in memory using its precomputed content hash and SimHash (no body needed)."""
+        self.memory.record(post.url, outcome=outcome, comment_text=comment_text, content_hash=post.content_hash)
+        if self.content_index is not None:
+            self.content_index.add(canonicalize_url(post.url), post.simhash)
+
+    def find_duplicate(self, post):
+        """URL of an earlier post (in memory or queued this run) with near-identical content, or None.
+
+        A post that isn't a duplicate is added to this run's index, so later copies collapse onto it.
+        """
+        fingerprint = post.simhash
+        if self.content_index is None or fingerprint is None:
+            return None
+        canonical = canonicalize_url(post.url)
+        with metrics.span("dedup_lookup"):
+            duplicate_of = self.content_index.find(fingerprint, exclude=canonical) or \
+                self.run_index.find(fingerprint, exclude=canonical)
+        if duplicate_of is None:
+            self.run_index.add(canonical, fingerprint)
+        return duplicate_of
+
+    def is_queued(self, post_url):
+        """True if the post is in the retry queue (waiting for a retry, or dead-lettered), so discovery leaves it alone."""
+        return self.work_queue is not None and post_url in self.work_queue
+
+    def queued_posts(self):
+        """Yield PostRecords for queued posts whose next attempt is due, rebuilt from the queue without fetching them.
+
+        Each one goes through the memory check and the Disqus pre-check first, so a comment that
+        did land (slow to render, or held for moderation) is never posted a second time.
+        """
+        if self.work_queue is None:
+            return
+        for item in self.work_queue.eligible(self.config.MAX_POSTS_TO_PROCESS):
+            if self.is_already_commented(item.url):
+                print(f"Dropping queued post already in memory: {item.url}")
+                self.work_queue.mark_done(item.url)
+                continue
+            post = PostRecord.create(item.url, item.title, item.slug, item.content, self.scraper.bodies, self.config)
+            state = self.scraper.precheck.check(post) if self.scraper.precheck else None
+            if state and state.skip:
+                print(f"Dropping queued post '{post.title}': {state.detail}")
+                self.record_post(post, outcome=state.status)
+                self.work_queue.mark_done(post.url)
+                post.release()
+                continue
+            print(f"Retrying queued post (attempt {item.attempts + 1}, {item.status}): {item.url}")
+            yield post
+
+    def pipeline_source(self):
+        """Queued retries first, then discovery for whatever is left of the MAX_POSTS_TO_PROCESS budget."""
+        retries = 0
+        for post in self.queued_posts():
+            retries += 1
+            yield post
+        remaining = self.config.MAX_POSTS_TO_PROCESS - retries
+        if remaining <= 0:
+            return
+        discovery = self.scraper.iter_blog_posts(self, remaining)  # Pass self (CommentAgent instance) to scraper
         try:
-            # Navigate to the blog post
-            print(f"Loaded page: {url}")
-            driver.get(url)
-
-            # Find and click the comments button to load Disqus
-            try:
-                # Wait for the page to load
-                time.sleep(5)
-
-                # Look for the Comments button - try different possible selectors
-                comment_buttons = []
-                try:
-                    comment_buttons = driver.find_elements(By.XPATH, "//button[contains(text(), 'Comments')]")
-                    if not comment_buttons:
-                        comment_buttons = driver.find_elements(By.XPATH, "//a[contains(text(), 'Comments')]")
-                    if not comment_buttons:
-                        comment_buttons = driver.find_elements(By.CSS_SELECTOR, ".comment-count, .comments-link, #comments-button")
-                except Exception as e:  # Catch specific exceptions if you want to debug button finding more
-                    print(f"Error finding comment button: {e}")
-                    pass
-
-                if comment_buttons:
-                    print("Found 'Comments' button, clicking it...")
-                    comment_buttons[0].click()
-                    time.sleep(3)  # Wait for Disqus to load after clicking
-                else:
-                    print("No comments button found, assuming Disqus is already loaded...")
-
-                # Wait for Disqus iframe to load - **Improved iframe detection**
-                disqus_iframe = None
-                iframes = driver.find_elements(By.TAG_NAME, "iframe")
-                for iframe in iframes:
-                    try:
-                        if "disqus" in iframe.get_attribute("src").lower():  # Lowercase for case-insensitive check
-                            driver.switch_to.frame(iframe)
-                            print(f"Switched to Disqus iframe: {iframe.get_attribute('src')}")
-                            disqus_iframe = iframe  # Mark iframe as found
-                            break  # Exit loop after finding the Disqus iframe
-                    except:  # Handle potential errors getting iframe src
-                        continue
-
-                if not disqus_iframe:  # Check if iframe was actually found and switched to
-                    print("❌ No Disqus iframe found or failed to switch. Checking for alternative Disqus elements (may not be in iframe).")
-                    # Try to find any Disqus elements on the page if iframe approach fails as fallback.
-                    disqus_elements = driver.find_elements(By.CSS_SELECTOR, "[id*='disqus']")
-                    if disqus_elements:
-                        print(f"Found alternative Disqus elements (not iframe), assuming Disqus is directly embedded.")
-                        # Assuming Disqus is directly embedded, no need to switch frame.
-                    else:
-                        print("❌ No Disqus iframe or alternative elements found. Disqus might not be loaded or incorrectly detected.")
-                        return False  # Early return if no Disqus context found
-
-                # Try to find the start discussion by focusing on textarea
-                try:
-                    comment_textarea_element = WebDriverWait(driver, 10).until(
-                        EC.element_to_be_clickable((By.CSS_SELECTOR, "div[role='textbox'][contenteditable='true']"))
-                    )
-                    print("Found comment textarea (editable div), clicking to focus...")
-                    comment_textarea_element.click()  # Click to focus and start discussion
-                    time.sleep(2)  # Wait for UI to update after focusing textarea
-                except TimeoutException:
-                    print("❌ Timed out waiting for comment textarea (editable div) to be clickable.")
-                    return False
-
-                # Now try to find the comment textarea - **Adjusted textarea selector to target the actual textarea element**
-                try:
-                    comment_textarea = WebDriverWait(driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR,
-                                                         "textarea#post-message, textarea.textarea, div[role='textbox'][contenteditable='true']"))
-                    )  # Include editable div as fallback if textarea not directly found
-                    print("✅ Found comment textarea element.")
-
-                    # Enter the comment text
-                    print("Entering comment text...")
-                    driver.execute_script("arguments[0].scrollIntoView(true);", comment_textarea)
-                    time.sleep(1)
-                    driver.execute_script("arguments[0].focus();", comment_textarea)
-                    comment_textarea.send_keys(comment_text)
-                    time.sleep(1)
-
-                    # **Guest Form Interaction START**
-
-                    # 1. Click Name Field to expand form
-                    try:
-                        name_field_placeholder = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, "//input[@placeholder='Name']"))
-                        )
-                        print("Found 'Name' field, clicking it...")
-                        name_field_placeholder.click()
-                        time.sleep(1)  # Small wait for form expansion
-                    except TimeoutException:
-                        print("❌ Timed out waiting for 'Name' field to be clickable.")
-                        return False
-
-                    # 2. Enter Guest Name
-                    try:
-                        name_field = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.NAME, "display_name"))  # Using display_name as seen in HTML
-                        )
-                        name_field.send_keys(Config.COMMENT_NAME)  # Use name from config
-                        print(f"Entered guest name: {Config.COMMENT_NAME}")
-                    except TimeoutException:
-                        print("❌ Timed out waiting for name input field to be present.")
-                        return False
-
-                    # 3. Check 'Post as Guest' Checkbox
-                    try:
-                        guest_checkbox = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.XPATH, "//input[@name='author-guest']"))
-                        )
-                        print("Found 'Post as a guest' checkbox, clicking it...")
-                        guest_checkbox.click()
-                        time.sleep(1)  # Small wait after checkbox click
-                    except TimeoutException:
-                        print("❌ Timed out waiting for 'Post as a guest' checkbox to be clickable.")
-                        return False
-
-                    # 4. Enter Guest Email
-                    try:
-                        email_field = WebDriverWait(driver, 10).until(
-                            EC.presence_of_element_located((By.NAME, "email"))
-                        )
-                        email_field.send_keys(Config.COMMENT_EMAIL)  # Use email from config
-                        print(f"Entered guest email: {Config.COMMENT_EMAIL}")
-                    except TimeoutException:
-                        print("❌ Timed out waiting for email input field to be present.")
-                        return False
-
-                    print("✅ Guest form filled. Waiting for manual reCAPTCHA completion... PLEASE COMPLETE THE reCAPTCHA MANUALLY IN THE BROWSER!")
-                    time.sleep(Config.MANUAL_CAPTCHA_TIMEOUT)  # **Wait for manual reCAPTCHA completion - Configurable Timeout**
-                    print("⌛️ Assuming reCAPTCHA completed. Proceeding...")
-
-                    # **Guest Form Interaction END**
-
-                    # Look for the post/submit comment button - **Using more specific selector for arrow button**
-                    post_buttons = []
-                    try:
-                        post_buttons = driver.find_elements(By.CSS_SELECTOR, "button.proceed__button.btn.submit")  # More specific CSS for arrow button
-                        if not post_buttons:  # Fallback to previous selectors if specific arrow button not found
-                            post_buttons = driver.find_elements(By.XPATH,
-                                                                "//button[contains(text(), 'Post') or contains(text(), 'Submit') or contains(text(), 'Comment')] | //button[contains(., 'Add to the discussion')] | //button[@type='submit'] | //button[contains(., 'Reply')] | //button[contains(@aria-label, 'Post')] | //button[contains(@aria-label, 'Comment')] | //button[contains(@class, 'submit')] | //button[contains(@class, 'post-button')] | //button[contains(@class, 'reply-button')] | //button[contains(@class, 'proceed__button')]")
-
-                            if not post_buttons:  # Fallback CSS selectors
-                                post_buttons = driver.find_elements(By.CSS_SELECTOR,
-                                                                    ".btn-primary, .submit, .post-button, [type='submit'], .reply-button, .proceed__button, button.submit-button, button.post-button")
-                    except Exception as post_button_err:  # More specific exception handling
-                        print(f"Error finding post button: {post_button_err}")
-                        pass
-
-                    if post_buttons:
-                        post_button = post_buttons[0]  # Get the first post button element
-                        print("Found post button (arrow), waiting for it to be clickable...")
-                        try:  # Add explicit wait for clickability for the post button
-                            WebDriverWait(driver, Config.SELENIUM_TIMEOUT).until(EC.element_to_be_clickable(post_button))  # Configurable timeout
-                            print("Post button is clickable, scrolling into view...")  # Add log message
-                            driver.execute_script("arguments[0].scrollIntoView(true);", post_button)  # Scroll into view *before* click
-                            time.sleep(1)  # Short wait after scroll, might not be strictly necessary
-                            print("Clicking post button (arrow)...")
-                            post_button.click()
-                            time.sleep(Config.SELENIUM_WAIT_AFTER_COMMENT)  # Configurable wait after post click
-                            print(
-                                f"✅ Successfully posted comment to: {url} (hopefully, check website to confirm after captcha!)")  # Updated success message
-                            return True
-                        except TimeoutException:
-                            print("❌ Timed out waiting for post button (arrow) to become clickable, or element is still not interactable after waiting.")
-                            return False
-                    else:
-                        print("❌ No post button (arrow) found after entering comment and guest details.")
-                        return False
-
-                except TimeoutException:
-                    print("❌ Timed out waiting for comment textarea or guest form elements.")
-
-                    
-
-                    # Debug info - print the page structure - Keep debug info, potentially expand if needed, focus on form.
-                    print("\nPage elements for debugging (around guest form - first 100 elements from form):")  # Increased to 100
-                    form_element = driver.find_element(By.TAG_NAME, "form")  # Assuming form is still relevant context
-                    elements = form_element.find_elements(By.XPATH, ".//*")  # Search within the form
-                    print(f"Found {len(elements)} form elements. Printing first 100 around guest form:")  # Increased to 100
-                    for i, element in enumerate(elements[:100]):  # Increased to 100
-                        print(
-                            f"{i + 1}: Tag: {element.tag_name}, Class: {element.get_attribute('class')}, ID: {element.get_attribute('id')}, Text: '{element.text[:50]}...'")  # Print tag, class, id, and partial text
-
-                    # Print common Disqus elements - Keep common element checks.
-                    print("\nLooking for Disqus-specific elements:")
-                    for selector in [".post-list", "#disqus_thread", ".textarea", ".wysiwyg", ".comment-box"]:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            print(f"Found {selector}: {len(elements)} elements")
-
-                    # Print buttons - Keep button printing.
-                    buttons = driver.find_elements(By.TAG_NAME, "button")
-                    print(f"Found {len(buttons)} buttons. Printing first 5:")
-                    for i, button in enumerate(buttons[:5]):  # Print first 5 buttons
-                        print(f"Button {i + 1}: '{button.text}'")
-
-                    return False
-
-            except TimeoutException as e:
-                print(f"❌ Timed out waiting for comment interface (initial load): {e}")
-                return False
-            except Exception as e:
-                print(f"❌ General error posting comment: {e}")
-                import traceback  # For detailed error info
-                traceback.print_exc()  # Print full traceback
+            yield from discovery
+        finally:
+            discovery.close()  # Cancels in-flight prefetches when the pipeline stops early
+
+    def is_unchanged_since_skipped(self, post_url, lastmod):
+        """True if the post was already inspected and skipped, and its lastmod hasn't moved since."""
+        seen_lastmod = self.memory.get_seen_lastmod(post_url)
+        return lastmod is not None and seen_lastmod is not None and lastmod <= seen_lastmod
+
+    def mark_post_as_skipped(self, post_url, lastmod):
+        """Remember a post that can't be commented on, so it is only re-fetched when its lastmod changes."""
+        if lastmod is not None:
+            self.memory.mark_seen(post_url, lastmod)
+
+    def post_comment_selenium(self, url, comment_text):
+        """Posts a comment to Disqus using a browser borrowed from the pool.
+
+        Returns the memory outcome ("posted", "pending_moderation" or "submitted"), or None if it failed.
+        Raises InfrastructureFailure when no browser could be started or the reCAPTCHA went unsolved.
+        """
+        from core.disqus_poster import DisqusPoster  # Imports Selenium, so only load it once there is something to post
+        with metrics.span("post_comment", url=url, site=self.config.SITE_NAME) as span:
+            poster = DisqusPoster(self.config, self.selector_cache)
+            with self.browser_pool.lease() as driver:
+                span["posted"] = poster.post(driver, url, comment_text)
+            span["outcome"] = poster.outcome
+            if isinstance(poster.failure, InfrastructureFailure):
+                raise poster.failure  # Only now, so the browser went back to the pool as healthy
+            return poster.outcome if span["posted"] else None
+
+    def _generate_stage(self, post):
+        """Pipeline stage: generate a comment for a discovered post."""
+        print(f"\n--- Processing post: {post.title} ---")
+        result = None
+        try:
+            if self.work_queue is not None:
+                self.work_queue.add(post)
+            # A failed generation yields no comment at all, so nothing canned can reach the posting stage
+            result = self.comment_generator.cached_or_generate(post)
+        finally:
+            post.release()  # The body is only needed for the prompt
+            if self.work_queue is not None and not (result and result.ok):
+                self.work_queue.fail(post.url, result.error if result else "comment generation raised")
+        if not result.ok:
+            print(f"❌ Could not generate comment for: {post.url}")
+            return None
+        if self.work_queue is not None:
+            self.work_queue.mark_generated(post.url)
+        print(f"Generated comment: {result.comment[:80]}...")  # Preview
+        return post, result.comment
+
+    def _reserve_comment_slot(self):
+        """Claim one of the MAX_POSTS_TO_PROCESS slots and wait out the pacing delay. False if none are left."""
+        with self.run_lock:
+            if self.processed_count + self.in_flight >= self.config.MAX_POSTS_TO_PROCESS:
                 return False
-
+            self.in_flight += 1
+            # Space comments DELAY_BETWEEN_COMMENTS (plus jitter) apart, even with several posting workers
+            start_at = max(time.monotonic(), self.next_comment_at)
+            self.next_comment_at = start_at + self.config.DELAY_BETWEEN_COMMENTS + random.uniform(*self.config.COMMENT_DELAY_JITTER)
+        time.sleep(max(0, start_at - time.monotonic()))
+        return True
+
+    def _post_stage(self, item):
+        """Pipeline stage: post a generated comment through the browser pool."""
+        post, comment_text = item
+        if not self._reserve_comment_slot():
+            return None
+
+        posted = None
+        reason = "posting returned no confirmation"
+        counts = True
+        try:
+            posted = self.post_comment_selenium(post.url, comment_text)
+        except InfrastructureFailure as e:
+            reason = f"{type(e).__name__}: {e}"
+            counts = False  # Not the post's fault, so it keeps its attempts
+        except Exception as e:
+            reason = f"{type(e).__name__}: {e}"
+            raise
         finally:
-            # Close the driver
-            driver.quit()
+            with self.run_lock:
+                self.in_flight -= 1
+                if posted:
+                    self.processed_count += 1
+                    reached_limit = self.processed_count >= self.config.MAX_POSTS_TO_PROCESS
+            if self.work_queue is not None and not posted:
+                self.work_queue.fail(post.url, reason, count_attempt=counts)  # Retried with backoff on a later run
+
+        if not posted:
+            print(f"❌ Failed to post comment on: {post.url}")
+            metrics.incr("comments_failed", site=self.config.SITE_NAME)
+            return None
+
+        self.record_post(post, outcome=posted, comment_text=comment_text)
+        self.comment_generator.forget_comment(post.url)
+        if self.work_queue is not None:
+            self.work_queue.mark_done(post.url)
+        metrics.incr("comments_posted", site=self.config.SITE_NAME, outcome=posted)
+        print(f"✅ Commented on: {post.url} ({posted})")
+        if reached_limit:
+            print(f"Reached maximum posts to process ({self.config.MAX_POSTS_TO_PROCESS}). Stopping.")
+            self.pipeline.stop()
+        return post
+
+    def run_pipeline(self):
+        """Discover, generate and post for this agent's site. Returns the number of comments posted.
+
+        Discovery, comment generation and posting run as a pipeline connected by bounded
+        queues, so the next post is generated while the current one is being posted. Queued posts
+        due for a retry are fed in before anything new is discovered.
+        """
+        self.run_lock = threading.Lock()
+        self.run_index = SimHashIndex(self.config.DEDUP_MAX_DISTANCE)
+        self.processed_count = 0
+        self.in_flight = 0
+        self.next_comment_at = 0
+
+        # Memory and retry-queue checks are done during discovery, so only new posts enter the pipeline after the retries
+        self.pipeline = Pipeline(self.pipeline_source())
+        self.pipeline.add_stage("generate", self._generate_stage,
+                                concurrency=self.config.GENERATION_CONCURRENCY, queue_size=self.config.PIPELINE_QUEUE_SIZE)
+        self.pipeline.add_stage("post", self._post_stage,
+                                concurrency=self.config.POSTING_CONCURRENCY, queue_size=self.config.PIPELINE_QUEUE_SIZE)
+        self.pipeline.run()
+        return self.processed_count
+
+    def close(self):
+        """Close the memory store, and the browser pool and caches if this agent created them."""
+        if self.owns_shared:
+            self.scraper.close()
+            self.browser_pool.close()
+            print(self.browser_pool.summary())
+            print(operator_queue.summary())
+            if self.comment_generator.cache:
+                print(self.comment_generator.cache.summary())
+        self.memory.close()
+        if self.content_index is not None:
+            self.content_index.close()
+        if self.work_queue is not None:
+            print(self.work_queue.summary())
+            self.work_queue.close()
+        self.selector_cache.save()
+        if self.config.DEBUG:
+            print(self.selector_cache.summary())
 
     def run_agent(self):
         """Main function to run the blog commenting agent."""
         print("Starting Blog Commenting Agent...")
 
-        posts = self.scraper.get_blog_posts(self)  # Pass self (CommentAgent instance) to scraper
-        if not posts:
-            print("No new blog posts found to comment on (or all are already commented). Exiting.")  # Updated message
-            return
-
-        processed_count = 0
-        for post in posts:
-            if processed_count >= Config.MAX_POSTS_TO_PROCESS:
-                print(f"Reached maximum posts to process ({Config.MAX_POSTS_TO_PROCESS}). Stopping.")
-                break
-
-            # Memory check is now done in get_blog_posts, no need to check here again
-            print(f"\n--- Processing post: {post['title']} ---")
-            comment_text = self.comment_generator.generate_comment(post)
-            if comment_text:
-                print(f"Generated comment: {comment_text[:80]}...")  # Preview
-
-                time.sleep(Config.DELAY_BETWEEN_COMMENTS + random.uniform(0.5, 1.5))  # Delay before comment
-
-                if self.post_comment_selenium(post['url'], comment_text, headless=Config.SELENIUM_HEADLESS):  # Use headless config
-                    self.mark_post_as_commented(post['url'])
-                    processed_count += 1
-                    print(f"✅ Commented on: {post['url']}")
-                else:
-                    print(f"❌ Failed to post comment on: {post['url']}")
-            else:
-                print(f"❌ Could not generate comment for: {post['url']}")
+        with profile_run():
+            self.run_pipeline()
 
+        self.close()
+        if self.config.DEBUG:
+            print(f"\nRun metrics:\n{metrics.summary()}")
+        metrics.export()
         print("\nBlog Commenting Agent run finished.")
-        print(f"Successfully commented on {processed_count} new posts.")
\ No newline at end of file
+        print(f"Successfully commented on {self.processed_count} new posts.")
+
+    def discover(self, limit=None):
+        """Discovery only: list the posts the next run would comment on, without generating or posting anything."""
+        posts = list(self.scraper.iter_blog_posts(self, limit))
+        if self.owns_shared:
+            self.scraper.close()
+        self.memory.close()
+        if self.content_index is not None:
+            self.content_index.close()
+        if self.work_queue is not None:
+            print(self.work_queue.summary())
+            self.work_queue.close()
+        for post in posts:
+            print(f"  {post.url}  ({post.title})")
+        return posts
+
+    def watch(self, interval=Config.DAEMON_POLL_INTERVAL):
+        """Daemon mode: run the pipeline every `interval` seconds until interrupted.
+
+        The HTTP session and response cache, the LLM client, the browser pool and the memory
+        store stay open between polls. Discovery revalidates the sitemap/feed with conditional
+        requests and skips posts by memory and lastmod, so a poll with nothing new costs a few
+        small requests.
+        """
+        print(f"Starting Blog Commenting Agent in daemon mode (polling every {interval}s)...")
+        polls = total = 0
+        try:
+            while True:
+                started = time.monotonic()
+                try:
+                    total += self.run_pipeline()
+                except Exception:
+                    print("❌ Poll failed, will retry on the next one:")
+                    traceback.print_exc()
+                polls += 1
+                metrics.export()
+                wait = max(0, interval - (time.monotonic() - started)) + random.uniform(0, interval * 0.05)
+                print(f"Poll {polls} done ({total} comments so far). Next poll in {wait:.0f}s.")
+                time.sleep(wait)
+        except KeyboardInterrupt:
+            print("\nStopping daemon...")
+        finally:
+            self.close()
+            metrics.export()
+            print(f"Blog Commenting Agent daemon stopped after {polls} polls and {total} comments.")
@@ -0,0 +1,167 @@
+import queue
+import threading
+from contextlib import contextmanager
+from config.config import Config  # Import Config from config module
+from core.work_queue import InfrastructureFailure
+
+# Selenium is imported on first use, so runs that never post a comment don't pay for it
+
+
+def _webdriver_exception():
+    from selenium.common.exceptions import WebDriverException
+    return WebDriverException
+
+
+def build_chrome_options(headless=Config.SELENIUM_HEADLESS):
+    """Chrome options shared by every pooled browser."""
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")  # Full Chrome without a window, so DevTools can show and drive the page
+    chrome_options.add_argument("--window-size=1920,1080")  # Set window size
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    # Add user agent to make it look like a real browser
+    chrome_options.add_argument(
+        "--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
+    return chrome_options
+
+
+def debugger_url(driver):
+    """DevTools address of a running Chrome, where an operator can view and click the page (None if unknown)."""
+    address = (driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+    return f"http://{address}" if address else None
+
+
+class BrowserLaunchError(InfrastructureFailure):
+    """Chrome or chromedriver could not be started."""
+
+
+class PooledDriver:
+    """A WebDriver plus the number of posts it has served."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.uses = 0
+
+
+class BrowserPool:
+    """Keeps up to `size` warm Chrome sessions and lends them out one post at a time."""
+
+    def __init__(self, size=Config.BROWSER_POOL_SIZE, max_uses=Config.BROWSER_MAX_USES,
+                 headless=Config.SELENIUM_HEADLESS):
+        self.max_uses = max_uses
+        self.headless = headless
+        self.idle = queue.LifoQueue()  # Most recently used browser first, it is the warmest
+        self.slots = threading.BoundedSemaphore(size)
+        self.lock = threading.Lock()
+        self.stats = {"launches": 0, "reuses": 0, "recycled": 0, "crashed": 0}
+
+    def _count(self, key):
+        with self.lock:
+            self.stats[key] += 1
+
+    def _launch(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        service = Service(executable_path=Config.SELENIUM_CHROMEDRIVER_PATH)  # Use path from Config
+        driver = webdriver.Chrome(service=service, options=build_chrome_options(self.headless))
+        self._count("launches")
+        if Config.DEBUG:
+            print("Launched a new Chrome session for the browser pool")
+        return PooledDriver(driver)
+
+    @staticmethod
+    def _is_healthy(pooled):
+        try:
+            pooled.driver.window_handles  # Round-trip to the browser; raises if Chrome has died
+            return True
+        except _webdriver_exception():
+            return False
+
+    @staticmethod
+    def _reset(pooled):
+        """Close extra tabs, leave any iframe and park the browser on a blank page."""
+        driver = pooled.driver
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.switch_to.default_content()
+        driver.get("about:blank")
+
+    @staticmethod
+    def _quit(pooled):
+        try:
+            pooled.driver.quit()
+        except _webdriver_exception():
+            pass
+
+    def acquire(self):
+        """Borrow a healthy browser, launching one if no warm session is available."""
+        self.slots.acquire()
+        try:
+            while True:
+                try:
+                    pooled = self.idle.get_nowait()
+                except queue.Empty:
+                    try:
+                        return self._launch()
+                    except Exception as e:
+                        raise BrowserLaunchError(f"Could not start Chrome: {type(e).__name__}: {e}") from e
+                if self._is_healthy(pooled):
+                    self._count("reuses")
+                    return pooled
+                print("⚠️ Pooled browser failed its health check, replacing it")
+                self._count("crashed")
+                self._quit(pooled)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def release(self, pooled, failed=False):
+        """Return a browser to the pool, or retire it after a crash or `max_uses` posts."""
+        try:
+            pooled.uses += 1
+            if failed or pooled.uses >= self.max_uses:
+                self._count("crashed" if failed else "recycled")
+                self._quit(pooled)
+                return
+            try:
+                self._reset(pooled)
+            except _webdriver_exception() as e:
+                print(f"⚠️ Could not reset pooled browser, discarding it: {e}")
+                self._count("crashed")
+                self._quit(pooled)
+                return
+            self.idle.put(pooled)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def lease(self):
+        """Context manager yielding a WebDriver that goes back to the pool afterwards."""
+        pooled = self.acquire()
+        failed = False
+        try:
+            yield pooled.driver
+        except _webdriver_exception():
+            failed = True
+            raise
+        finally:
+            self.release(pooled, failed=failed)
+
+    def close(self):
+        """Quit every idle browser."""
+        while True:
+            try:
+                self._quit(self.idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def summary(self):
+        """One-line human readable summary of the pool counters."""
+        s = self.stats
+        return (f"Browser pool: {s['launches']} launches, {s['reuses']} reuses, "
+                f"{s['recycled']} recycled after {self.max_uses} uses, {s['crashed']} crashed")
@@ -1,47 +1,311 @@
-from openai import OpenAI
-from config.config import Config # Import Config from config module
-
-class CommentGenerator:
-    """Comment generator class using OpenAI's GPT models."""
+import asyncio
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional
 
-    def __init__(self):
-        self.client = OpenAI(api_key=Config.OPENAI_API_KEY)  # Use the new client
+from config.config import Config # Import Config from config module
+from core.content import ContentCondenser
+from core.generation_cache import GenerationCache, request_key
+from core.metrics import metrics
 
-    def generate_comment(self, post):
-        """Generate a thoughtful comment based on the blog post content using GPT-4o"""
-        system_message = """You are an intelligent blog reader who writes thoughtful comments.
+SYSTEM_MESSAGE = """You are an intelligent blog reader who writes thoughtful comments.
 Your comments should be insightful, relevant to the post content, and add value to the discussion.
 Your tone should be friendly, curious, and enthusiastic about the topic.
 Always reference specific details from the blog post to show you've read it carefully."""
 
-        user_message = f"""I'm going to show you a blog post. Please write a thoughtful, engaging comment that adds value to the discussion.
+USER_MESSAGE_TEMPLATE = """I'm going to show you a blog post. Please write a thoughtful, engaging comment that adds value to the discussion.
 The comment should be insightful, reference specific parts of the post, and possibly ask a thoughtful question or add additional context.
 Keep the comment between 3-5 sentences, friendly and conversational in tone.
 
-Blog Post Title: {post['title']}
+Blog Post Title: {title}
 Blog Post Content:
-{post['content'][:4000]}  # Truncate if too long
+{content}
 
 Generate a thoughtful comment for this blog post:"""
 
+MAX_RETRY_AFTER = 60  # Seconds; a longer Retry-After is cut short so one post can't stall a generation worker
+
+
+@dataclass
+class GenerationResult:
+    """Outcome of generating one comment. `comment` is None when generation failed."""
+    url: str
+    comment: Optional[str] = None
+    latency: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def ok(self):
+        return self.comment is not None
+
+
+def error_code(error):
+    """The `code` of an OpenAI API error body (e.g. "insufficient_quota"), or None."""
+    code = getattr(error, "code", None)
+    body = getattr(error, "body", None)
+    if code is None and isinstance(body, dict):
+        code = body.get("code")
+    return code
+
+
+def is_retryable(error):
+    """Rate limits, server errors, timeouts and dropped connections are worth retrying.
+
+    A 429 for an exhausted quota is not: it lasts until billing changes, not for a few seconds.
+    """
+    import openai
+    if isinstance(error, openai.RateLimitError):
+        return error_code(error) != "insufficient_quota"
+    if isinstance(error, openai.APIConnectionError):  # APITimeoutError is a connection error
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def retry_delay(error, attempt):
+    """Exponential backoff with jitter, honouring Retry-After (up to MAX_RETRY_AFTER) when the server sends it."""
+    response = getattr(error, "response", None)
+    headers = response.headers if response is not None else {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1)):
         try:
-            print(f"Generating comment for post: {post['title']}")
-
-            # Correct API Call using the new OpenAI Client
-            response = self.client.chat.completions.create(
-                model="gpt-4o",  # Ensure correct model usage
-                messages=[
-                    {"role": "system", "content": system_message},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
-
-            comment = response.choices[0].message.content.strip()  # Corrected response parsing
-            print(f"Comment generated successfully ({len(comment)} chars)")
-            return comment
-
-        except Exception as e:
-            print(f"Error generating comment: {e}")
-            return "I found this post very insightful and well-written. Thanks for sharing your expertise on this topic!"
\ No newline at end of file
+            return min(MAX_RETRY_AFTER, max(0.0, float(headers.get(header)) * scale))
+        except (TypeError, ValueError):  # Missing, or an HTTP date
+            pass
+    return Config.GENERATION_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+
+
+class CommentGenerator:
+    """Comment generator class using OpenAI's GPT models."""
+
+    def __init__(self):
+        self._client = None
+        self.client_lock = threading.Lock()
+        self.cache = GenerationCache() if Config.GENERATION_CACHE_ENABLED else None
+        self.condenser = ContentCondenser()
+
+    @property
+    def client(self):
+        """The OpenAI client, created on first use so importing and constructing the generator stays cheap."""
+        with self.client_lock:
+            if self._client is None:
+                from openai import OpenAI
+                # Retries are handled here (see is_retryable), so the client's own retry loop is disabled
+                self._client = OpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL, max_retries=0)
+            return self._client
+
+    def build_messages(self, post):
+        """Chat messages asking for a comment on `post`."""
+        # Only the most relevant paragraphs that fit PROMPT_CONTENT_TOKEN_BUDGET, without code or page furniture
+        content = self.condenser.condense(post.content, post.title)
+        user_message = USER_MESSAGE_TEMPLATE.format(title=post.title, content=content)
+        return [
+            {"role": "system", "content": SYSTEM_MESSAGE},
+            {"role": "user", "content": user_message}
+        ]
+
+    def request_body(self, post):
+        """Chat completion parameters for `post`; also the input of the generation cache key."""
+        return {
+            "model": Config.OPENAI_MODEL,
+            "messages": self.build_messages(post),
+            "max_tokens": Config.OPENAI_MAX_TOKENS,
+            "temperature": Config.OPENAI_TEMPERATURE,
+        }
+
+    @staticmethod
+    def _fill_result(result, response, started):
+        result.comment = response.choices[0].message.content.strip()
+        result.latency = time.perf_counter() - started
+        if response.usage:
+            result.prompt_tokens = response.usage.prompt_tokens
+            result.completion_tokens = response.usage.completion_tokens
+        return result
+
+    def generate_result(self, post):
+        """Generate a comment for one post, retrying transient API errors. Never raises."""
+        result = GenerationResult(url=post.url)
+        started = time.perf_counter()
+        for attempt in range(Config.GENERATION_MAX_RETRIES + 1):
+            result.attempts = attempt + 1
+            metrics.incr("llm_requests")
+            try:
+                response = self.client.chat.completions.create(**self.request_body(post))
+                return self._record(self._fill_result(result, response, started))
+            except Exception as e:
+                result.error = f"{type(e).__name__}: {e}"
+                if attempt == Config.GENERATION_MAX_RETRIES or not is_retryable(e):
+                    break
+                delay = retry_delay(e, attempt)
+                print(f"⚠️ Retryable error generating comment ({result.error}); retrying in {delay:.1f}s")
+                metrics.incr("llm_retries")
+                time.sleep(delay)
+        result.latency = time.perf_counter() - started
+        return self._record(result)
+
+    @staticmethod
+    def _record(result):
+        """Report a finished generation as a metrics span, including token usage."""
+        metrics.record_span("generate_comment", result.latency or 0.0, url=result.url, attempts=result.attempts,
+                            prompt_tokens=result.prompt_tokens, completion_tokens=result.completion_tokens,
+                            error=result.error)
+        if result.ok:
+            metrics.incr("llm_prompt_tokens", result.prompt_tokens or 0)
+            metrics.incr("llm_completion_tokens", result.completion_tokens or 0)
+        else:
+            metrics.incr("llm_failures")
+        return result
+
+    def cached_comment(self, post):
+        """Return a previously generated, still unposted comment for this exact post content, if any."""
+        if not self.cache:
+            return None
+        key = request_key(self.request_body(post))
+        comment = self.cache.get(key)
+        if comment is None:
+            self.cache.invalidate_url(post.url, keep_key=key)  # The post changed since it was last generated
+        return comment
+
+    def remember_comment(self, post, comment):
+        """Cache a generated comment until it has been posted."""
+        if self.cache:
+            self.cache.put(request_key(self.request_body(post)), post.url, comment)
+
+    def forget_comment(self, post_url):
+        """Drop the cached comment for a post once it has been posted."""
+        if self.cache:
+            self.cache.forget_url(post_url)
+
+    def cached_or_generate(self, post):
+        """GenerationResult for `post`: a pending comment from the cache, or a freshly generated one.
+
+        A failed generation comes back with `ok` False and the error; there is no canned comment.
+        """
+        comment = self.cached_comment(post)
+        if comment:
+            print(f"Reusing pending comment from cache for post: {post.title}")
+            return GenerationResult(url=post.url, comment=comment, latency=0.0)
+
+        print(f"Generating comment for post: {post.title}")
+        result = self.generate_result(post)
+        if result.ok:
+            print(f"Comment generated successfully ({len(result.comment)} chars)")
+            self.remember_comment(post, result.comment)
+        else:
+            print(f"Error generating comment: {result.error}")
+        return result
+
+    def generate_comment(self, post):
+        """Generate a thoughtful comment based on the blog post content using GPT-4o. None if generation failed."""
+        return self.cached_or_generate(post).comment
+
+    async def _generate_result_async(self, client, semaphore, post):
+        result = GenerationResult(url=post.url)
+        async with semaphore:
+            started = time.perf_counter()
+            for attempt in range(Config.GENERATION_MAX_RETRIES + 1):
+                result.attempts = attempt + 1
+                metrics.incr("llm_requests")
+                try:
+                    response = await client.chat.completions.create(**self.request_body(post))
+                    return self._record(self._fill_result(result, response, started))
+                except Exception as e:
+                    result.error = f"{type(e).__name__}: {e}"
+                    if attempt == Config.GENERATION_MAX_RETRIES or not is_retryable(e):
+                        break
+                    metrics.incr("llm_retries")
+                    await asyncio.sleep(retry_delay(e, attempt))
+            result.latency = time.perf_counter() - started
+            return self._record(result)
+
+    async def generate_comments_async(self, posts, concurrency=Config.GENERATION_BATCH_CONCURRENCY):
+        """Generate comments for many posts concurrently, at most `concurrency` requests in flight.
+
+        Returns one GenerationResult per post, in the same order as `posts`. Posts with a
+        pending comment in the generation cache are answered from the cache.
+        """
+        from openai import AsyncOpenAI
+        semaphore = asyncio.Semaphore(concurrency)
+        async with AsyncOpenAI(api_key=Config.OPENAI_API_KEY, base_url=Config.OPENAI_BASE_URL, max_retries=0) as client:
+            return await asyncio.gather(*(self._cached_or_generate_async(client, semaphore, post) for post in posts))
+
+    async def _cached_or_generate_async(self, client, semaphore, post):
+        comment = self.cached_comment(post)
+        if comment:
+            return GenerationResult(url=post.url, comment=comment, latency=0.0)
+        result = await self._generate_result_async(client, semaphore, post)
+        if result.ok:
+            self.remember_comment(post, result.comment)
+        return result
+
+    def generate_comments(self, posts, concurrency=Config.GENERATION_BATCH_CONCURRENCY):
+        """Blocking wrapper around generate_comments_async."""
+        results = asyncio.run(self.generate_comments_async(posts, concurrency))
+        failed = sum(1 for result in results if not result.ok)
+        print(f"Generated {len(results) - failed} comments ({failed} failed)")
+        return results
+
+    def submit_batch(self, posts):
+        """Queue comment generation for a large backlog as an offline OpenAI Batch job. Returns the batch id."""
+        lines = [
+            json.dumps({"custom_id": post.url, "method": "POST", "url": "/v1/chat/completions",
+                        "body": self.request_body(post)})
+            for post in posts
+        ]
+        batch_file = self.client.files.create(
+            file=("comment_batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))), purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h")
+        print(f"Submitted batch {batch.id} with {len(posts)} posts")
+        return batch.id
+
+    def collect_batch(self, batch_id):
+        """Fetch results of a finished batch job as GenerationResults, or None while it is still running.
+
+        Generated comments go into the generation cache under the key of the request that
+        produced them, so the next run posts them instead of generating them again.
+        """
+        batch = self.client.batches.retrieve(batch_id)
+        if batch.status in ("validating", "in_progress", "finalizing"):
+            print(f"Batch {batch_id} is still {batch.status}")
+            return None
+        if batch.status != "completed":
+            raise RuntimeError(f"Batch {batch_id} ended with status {batch.status}")
+
+        results = []
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self._file_lines(file_id):
+                results.append(self._parse_batch_line(line))
+
+        if self.cache:
+            # The input lines hold the exact request bodies, i.e. the cache keys cached_comment() will look up
+            keys = {line["custom_id"]: request_key(line["body"]) for line in self._file_lines(batch.input_file_id)}
+            for result in results:
+                if result.ok and result.url in keys:
+                    self.cache.put(keys[result.url], result.url, result.comment)
+        return results
+
+    def _file_lines(self, file_id):
+        """Parsed JSON lines of an uploaded or generated batch file."""
+        return [json.loads(line) for line in self.client.files.content(file_id).text.splitlines() if line.strip()]
+
+    @staticmethod
+    def _parse_batch_line(record):
+        result = GenerationResult(url=record["custom_id"], attempts=1)
+        response = record.get("response") or {}
+        body = response.get("body") or {}
+        if record.get("error") or response.get("status_code") != 200:
+            result.error = json.dumps(record.get("error") or body.get("error"))
+            return result
+        result.comment = body["choices"][0]["message"]["content"].strip()
+        usage = body.get("usage") or {}
+        result.prompt_tokens = usage.get("prompt_tokens")
+        result.completion_tokens = usage.get("completion_tokens")
+        return result
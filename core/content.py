@@ -0,0 +1,181 @@
+import re
+import threading
+from collections import Counter, OrderedDict
+from config.config import Config # Import Config from config module
+from core.memory_store import fingerprint
+from core.metrics import metrics
+
+# Lines that are page furniture rather than article text
+BOILERPLATE_PATTERNS = re.compile(
+    r"^(share (this|on)|subscribe|sign up|follow (me|us)|read more|continue reading|related posts?|"
+    r"previous post|next post|posted (in|on|by)|tags?:|categories:|filed under|table of contents|"
+    r"copyright|©|all rights reserved|leave a (comment|reply)|comments?$|\d+ min(ute)? read)",
+    re.IGNORECASE)
+CODE_LINE_PATTERN = re.compile(
+    r"^(\$ |>>> |#include|import |from \S+ import|def |class |function |const |let |var |public |private |return\b)"
+    r"|[;{}]$|=>|\)\s*\{|^\s*[}\])]")
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'+-]*")
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+STOPWORDS = frozenset(
+    "a an and are as at be been but by can do does for from has have how i if in into is it its just "
+    "me more my no not of on or our so than that the their them then there these they this to too "
+    "up us was we what when which who will with you your".split())
+
+
+class TokenCounter:
+    """Counts tokens with tiktoken for OPENAI_MODEL, or estimates ~4 characters per token without it.
+
+    The encoding is loaded on first use; tiktoken is slow to import and may have to fetch its tables.
+    """
+
+    def __init__(self, model=Config.OPENAI_MODEL):
+        self.model = model
+        self.encoding = None
+        self.loaded = False
+        self.lock = threading.Lock()
+
+    def _load(self):
+        try:
+            import tiktoken
+            try:
+                self.encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:  # Model tiktoken doesn't know about (e.g. a local OpenAI-compatible server)
+                self.encoding = tiktoken.get_encoding("o200k_base")
+        except ImportError:
+            self.encoding = None
+        except Exception as e:  # Installed, but its tables can't be downloaded (offline, proxy, sandbox)
+            print(f"⚠️ Could not load the tiktoken encoding ({type(e).__name__}: {e}); estimating ~4 characters per token")
+            self.encoding = None
+        self.loaded = True
+
+    def count(self, text):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self._load()
+        if self.encoding is None:
+            return (len(text) + 3) // 4
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+
+def normalize_whitespace(text):
+    """Collapse runs of spaces inside lines and drop empty lines, keeping one paragraph per line."""
+    lines = (" ".join(line.split()) for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def _looks_like_code(line):
+    if CODE_LINE_PATTERN.search(line):
+        return True
+    symbols = sum(1 for ch in line if ch in "{}[]()<>;=#$*/\\|&_`")
+    return len(line) >= 8 and symbols / len(line) > 0.15
+
+
+def clean_paragraphs(text):
+    """Normalized article paragraphs, without code, boilerplate, fragments and repeats."""
+    paragraphs = []
+    seen = set()
+    for line in normalize_whitespace(text).splitlines():
+        if BOILERPLATE_PATTERNS.match(line) or _looks_like_code(line):
+            continue
+        if len(line.split()) < 4 and not line.endswith((".", "?", "!")):
+            continue  # Headings, captions, button labels
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        paragraphs.append(line)
+    return paragraphs
+
+
+def _terms(text):
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS and len(word) > 2]
+
+
+def rank_paragraphs(paragraphs, title=""):
+    """Score each paragraph by title overlap, how central its terms are to the whole post, and position."""
+    doc_terms = Counter(term for paragraph in paragraphs for term in set(_terms(paragraph)))
+    title_terms = set(_terms(title))
+    scores = []
+    for position, paragraph in enumerate(paragraphs):
+        terms = _terms(paragraph)
+        if not terms:
+            scores.append(0.0)
+            continue
+        centrality = sum(doc_terms[term] - 1 for term in set(terms)) / len(set(terms))
+        title_overlap = len(title_terms.intersection(terms))
+        lead = 1.0 / (1 + position)  # Introductions usually state what the post is about
+        scores.append(centrality + 2.0 * title_overlap + 2.0 * lead)
+    return scores
+
+
+def _fit_sentences(paragraph, budget, counter):
+    """As many leading whole sentences of `paragraph` as fit in `budget` tokens."""
+    kept = []
+    used = 0
+    for sentence in SENTENCE_END.split(paragraph):
+        tokens = counter.count(sentence)
+        if used + tokens > budget:
+            break
+        kept.append(sentence)
+        used += tokens
+    if not kept:  # A single run-on sentence: cut it at a word boundary
+        return paragraph[:budget * 4].rsplit(" ", 1)[0]
+    return " ".join(kept)
+
+
+class ContentCondenser:
+    """Turns scraped post text into the most relevant paragraphs that fit a token budget.
+
+    Results are cached by content hash, so regenerating a comment for an unchanged post is free.
+    """
+
+    def __init__(self, token_budget=Config.PROMPT_CONTENT_TOKEN_BUDGET, max_entries=Config.CONTENT_CACHE_MAX_ENTRIES):
+        self.token_budget = token_budget
+        self.max_entries = max_entries
+        self.counter = TokenCounter()
+        self.cache = OrderedDict()  # fingerprint(title + content) -> condensed text
+        self.lock = threading.Lock()
+
+    def condense(self, content, title=""):
+        """Return the condensed text of `content`, selected paragraphs kept in their original order."""
+        key = fingerprint(f"{self.token_budget}\n{title}\n{content}")
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+
+        condensed = self._condense(content, title)
+
+        with self.lock:
+            self.cache[key] = condensed
+            while len(self.cache) > self.max_entries:
+                self.cache.popitem(last=False)
+        return condensed
+
+    def _condense(self, content, title):
+        paragraphs = clean_paragraphs(content)
+        if not paragraphs:
+            return normalize_whitespace(content)[:self.token_budget * 4]
+        costs = [self.counter.count(paragraph) + 1 for paragraph in paragraphs]  # +1 for the joining newline
+        if sum(costs) <= self.token_budget:
+            selected = paragraphs
+        else:
+            scores = rank_paragraphs(paragraphs, title)
+            chosen = set()
+            used = 0
+            for i in sorted(range(len(paragraphs)), key=lambda i: -scores[i]):
+                if used + costs[i] <= self.token_budget:
+                    chosen.add(i)
+                    used += costs[i]
+            selected = [paragraphs[i] for i in sorted(chosen)]
+            if not selected:
+                # Even the best paragraph is over budget: keep its leading sentences instead of cutting mid-word
+                best = max(range(len(paragraphs)), key=lambda i: scores[i])
+                selected = [_fit_sentences(paragraphs[best], self.token_budget, self.counter)]
+
+        condensed = "\n\n".join(selected)
+        kept_tokens = self.counter.count(condensed)
+        metrics.incr("prompt_content_tokens", kept_tokens)
+        metrics.incr("prompt_content_tokens_dropped", max(0, self.counter.count(content) - kept_tokens))
+        return condensed
@@ -0,0 +1,176 @@
+import hashlib
+import re
+import threading
+import time
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from config.config import Config # Import Config from config module
+from core.storage import connect_sqlite
+
+TRACKING_PARAM_PREFIXES = ("utm_", "mc_")
+TRACKING_PARAMS = frozenset(["fbclid", "gclid", "ref", "source", "share", "amp"])
+WORD_PATTERN = re.compile(r"\w+")
+SIMHASH_BITS = 64
+MIN_SHINGLES = 20  # Below this a fingerprint says more about boilerplate than about the post
+
+
+def canonicalize_url(url):
+    """Key under which URL variants of one post collide.
+
+    Ignores scheme, "www.", default ports, fragments, tracking parameters, parameter order,
+    duplicate or trailing slashes, "index.html" and the ".html"/".htm" extension.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    path = re.sub(r"/{2,}", "/", parts.path)
+    path = re.sub(r"/index\.html?$", "/", path)
+    path = re.sub(r"\.html?$", "", path).rstrip("/") or "/"
+    query = sorted((key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES))
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash of the word shingles of `text`, or None if the text is too short to fingerprint."""
+    words = WORD_PATTERN.findall(text.lower())
+    shingles = Counter(" ".join(words[i:i + shingle_size]) for i in range(max(0, len(words) - shingle_size + 1)))
+    if sum(shingles.values()) < MIN_SHINGLES:
+        return None
+    features = [(int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"), weight)
+                for shingle, weight in shingles.items()]
+    fingerprint = 0
+    for bit in range(SIMHASH_BITS):
+        mask = 1 << bit
+        if sum(weight if feature & mask else -weight for feature, weight in features) > 0:
+            fingerprint |= mask
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def _to_signed(value):
+    """SQLite integers are signed 64-bit."""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+class SimHashIndex:
+    """In-memory near-duplicate index over 64-bit SimHashes.
+
+    Fingerprints are split into `max_distance + 1` bands. Two fingerprints within `max_distance`
+    bits must agree on at least one band, so a lookup only compares against the few entries
+    sharing a band value instead of scanning the whole index.
+    """
+
+    def __init__(self, max_distance=Config.DEDUP_MAX_DISTANCE):
+        self.max_distance = max_distance
+        bands = max_distance + 1
+        width = SIMHASH_BITS // bands
+        # (shift, mask) per band; the last band takes the leftover bits
+        self.bands = [(i * width, (1 << (width if i < bands - 1 else SIMHASH_BITS - i * width)) - 1)
+                      for i in range(bands)]
+        self.buckets = {}  # (band, band value) -> set of keys
+        self.fingerprints = {}  # key -> fingerprint
+        self.lock = threading.Lock()
+
+    def _band_keys(self, fingerprint):
+        return [(i, (fingerprint >> shift) & mask) for i, (shift, mask) in enumerate(self.bands)]
+
+    def __contains__(self, key):
+        return key in self.fingerprints
+
+    def __len__(self):
+        return len(self.fingerprints)
+
+    def add(self, key, fingerprint):
+        with self.lock:
+            if key in self.fingerprints:
+                self._discard(key)
+            self.fingerprints[key] = fingerprint
+            for band_key in self._band_keys(fingerprint):
+                self.buckets.setdefault(band_key, set()).add(key)
+
+    def _discard(self, key):
+        for band_key in self._band_keys(self.fingerprints.pop(key)):
+            bucket = self.buckets.get(band_key)
+            if bucket:
+                bucket.discard(key)
+
+    def find(self, fingerprint, exclude=None):
+        """Key of the closest indexed fingerprint within `max_distance` bits (other than `exclude`), or None."""
+        best_key, best_distance = None, self.max_distance + 1
+        with self.lock:
+            for band_key in self._band_keys(fingerprint):
+                for key in self.buckets.get(band_key, ()):
+                    if key == exclude:
+                        continue
+                    distance = hamming_distance(fingerprint, self.fingerprints[key])
+                    if distance < best_distance:
+                        best_key, best_distance = key, distance
+        return best_key
+
+
+class ContentIndex:
+    """Persistent SimHash index of posts already in memory, keyed by canonical URL.
+
+    Rows live in a table next to the memory store and are loaded into a SimHashIndex at startup,
+    so lookups never touch the disk. `known_urls` are the posts already in memory; any of them
+    missing from the table (history from before the index existed, migrated JSON memory) are
+    added under their canonical URL, without a fingerprint.
+    """
+
+    def __init__(self, path=Config.MEMORY_DB_FILE, max_distance=Config.DEDUP_MAX_DISTANCE, known_urls=()):
+        self.lock = threading.Lock()
+        self.conn = connect_sqlite(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS content_fingerprints (
+                canonical_url TEXT PRIMARY KEY,
+                simhash INTEGER,
+                recorded_at REAL NOT NULL
+            )""")
+        self.index = SimHashIndex(max_distance)
+        self.urls = set()
+        for canonical_url, fingerprint in self.conn.execute("SELECT canonical_url, simhash FROM content_fingerprints"):
+            self.urls.add(canonical_url)
+            if fingerprint is not None:
+                self.index.add(canonical_url, fingerprint & ((1 << 64) - 1))
+        self._seed(known_urls)
+
+    def _seed(self, known_urls):
+        missing = {canonicalize_url(url) for url in known_urls} - self.urls
+        if not missing:
+            return
+        now = time.time()
+        with self.lock:
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO content_fingerprints (canonical_url, simhash, recorded_at) VALUES (?, NULL, ?)",
+                [(url, now) for url in missing])
+            self.conn.execute("COMMIT")
+            self.urls.update(missing)
+        print(f"Indexed {len(missing)} canonical URLs from memory for duplicate detection")
+
+    def __contains__(self, canonical_url):
+        return canonical_url in self.urls
+
+    def add(self, canonical_url, fingerprint):
+        """Record a post (fingerprint may be None for posts too short to fingerprint)."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO content_fingerprints (canonical_url, simhash, recorded_at) VALUES (?, ?, ?)",
+                (canonical_url, None if fingerprint is None else _to_signed(fingerprint), time.time()))
+            self.urls.add(canonical_url)
+        if fingerprint is not None:
+            self.index.add(canonical_url, fingerprint)
+
+    def find(self, fingerprint, exclude=None):
+        return self.index.find(fingerprint, exclude)
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,387 @@
+import time
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from config.config import Config  # Import Config from config module
+from core.browser_pool import debugger_url
+from core.metrics import metrics
+from core.operator_queue import operator_queue
+from core.selector_cache import SelectorCache
+from core.work_queue import InfrastructureFailure
+
+COMMENT_BUTTON_SELECTORS = [
+    (By.XPATH, "//button[contains(text(), 'Comments')]"),
+    (By.XPATH, "//a[contains(text(), 'Comments')]"),
+    (By.CSS_SELECTOR, ".comment-count, .comments-link, #comments-button"),
+]
+IFRAME_SCAN = (By.TAG_NAME, "iframe")  # Last resort: read the src of every iframe on the page
+IFRAME_SELECTORS = [
+    (By.CSS_SELECTOR, "iframe[src*='disqus.com/embed/comments']"),
+    (By.CSS_SELECTOR, "iframe[src*='disqus']"),
+    IFRAME_SCAN,
+]
+EDITOR_SELECTOR = (By.CSS_SELECTOR, "div[role='textbox'][contenteditable='true']")
+TEXTAREA_SELECTORS = [
+    (By.CSS_SELECTOR, "textarea#post-message"),
+    (By.CSS_SELECTOR, "textarea.textarea"),
+    (By.CSS_SELECTOR, "div[role='textbox'][contenteditable='true']"),
+]
+TEXTAREA_ANY_CSS = ", ".join(value for _, value in TEXTAREA_SELECTORS)
+NAME_PLACEHOLDER_SELECTOR = (By.XPATH, "//input[@placeholder='Name']")
+NAME_FIELD_SELECTOR = (By.NAME, "display_name")
+GUEST_CHECKBOX_SELECTOR = (By.XPATH, "//input[@name='author-guest']")
+EMAIL_FIELD_SELECTOR = (By.NAME, "email")
+SUBMIT_BUTTON_SELECTORS = [
+    (By.CSS_SELECTOR, "button.proceed__button.btn.submit"),
+    (By.XPATH, "//button[contains(text(), 'Post') or contains(text(), 'Submit') or contains(text(), 'Comment')] | //button[contains(., 'Add to the discussion')] | //button[@type='submit'] | //button[contains(., 'Reply')] | //button[contains(@aria-label, 'Post')] | //button[contains(@aria-label, 'Comment')] | //button[contains(@class, 'submit')] | //button[contains(@class, 'post-button')] | //button[contains(@class, 'reply-button')] | //button[contains(@class, 'proceed__button')]"),
+    (By.CSS_SELECTOR, ".btn-primary, .submit, .post-button, [type='submit'], .reply-button, .proceed__button, button.submit-button, button.post-button"),
+]
+
+# True once any iframe on the page points at Disqus (one round-trip, whatever the number of iframes)
+DISQUS_IFRAME_PRESENT_SCRIPT = """
+var frames = document.getElementsByTagName('iframe');
+for (var i = 0; i < frames.length; i++) {
+    if ((frames[i].src || '').toLowerCase().indexOf('disqus') !== -1) { return true; }
+}
+return false;
+"""
+
+# Where a submitted comment is: "editing" (still in the editor), "visible" (rendered in the thread),
+# "moderation" (Disqus says it is held for approval), "cleared" (an empty editor, nothing rendered) or
+# "unknown" (no editor at all, e.g. a reloaded iframe, or one holding other text). Text is compared with
+# runs of whitespace collapsed, like the snippet built in Python.
+COMMENT_STATE_SCRIPT = """
+var snippet = arguments[0];
+var normalize = function (text) { return (text || '').replace(/\\s+/g, ' '); };
+var editors = document.querySelectorAll("div[role='textbox'][contenteditable='true'], textarea#post-message");
+var empty = editors.length > 0;
+for (var i = 0; i < editors.length; i++) {
+    var text = normalize(editors[i].innerText || editors[i].value);
+    if (text.indexOf(snippet) !== -1) { return 'editing'; }
+    if (text.trim()) { empty = false; }
+}
+var messages = document.querySelectorAll(".post-message, [data-role='message']");
+for (var j = 0; j < messages.length; j++) {
+    if (normalize(messages[j].innerText).indexOf(snippet) !== -1) { return 'visible'; }
+}
+var notice = /(awaiting|pending|held for) (moderation|approval|review)/i;
+if (document.body && notice.test(document.body.innerText || '')) { return 'moderation'; }
+return empty ? 'cleared' : 'unknown';
+"""
+# Memory outcome recorded for each confirmed comment state
+CONFIRMED_OUTCOMES = {"visible": "posted", "moderation": "pending_moderation", "cleared": "submitted"}
+
+# "absent" unless a reCAPTCHA needing a human (not an invisible one) is on the form, then "pending" or "solved"
+CAPTCHA_STATE_SCRIPT = """
+var frames = document.querySelectorAll("iframe[src*='/recaptcha/']");
+var visible = false;
+for (var i = 0; i < frames.length; i++) {
+    var src = frames[i].src || '';
+    if (src.indexOf('anchor') !== -1 && src.indexOf('size=invisible') === -1) { visible = true; }
+}
+if (!visible) { return 'absent'; }
+var responses = document.querySelectorAll("textarea[name='g-recaptcha-response']");
+for (var j = 0; j < responses.length; j++) {
+    if (responses[j].value) { return 'solved'; }
+}
+return 'pending';
+"""
+
+
+class StepFailed(Exception):
+    """A readiness condition in the posting flow was not met in time."""
+
+
+class CaptchaNotSolved(StepFailed, InfrastructureFailure):
+    """Nobody solved the reCAPTCHA in time. Says nothing about the post, so it doesn't use up a retry."""
+
+
+class LateCaptcha(Exception):
+    """A reCAPTCHA rendered after the form was submitted without a token, so Disqus is holding the comment back."""
+
+
+class DisqusPoster:
+    """Drives the Disqus guest-comment flow, waiting on page readiness instead of fixed sleeps.
+
+    Create one poster per comment; it keeps the step timings and the outcome of that attempt
+    ("posted", "pending_moderation" or "submitted", see CONFIRMED_OUTCOMES) or the exception it
+    failed with (`failure`). `config` is the
+    settings class of the site being commented on (guest name, email and timeouts). `selectors`
+    is the site's SelectorCache, shared between posters so each fallback chain starts with the
+    selector that worked last time.
+    """
+
+    def __init__(self, config=Config, selectors=None):
+        self.config = config
+        self.selectors = selectors or SelectorCache(None)
+        self.timings = []
+        self.outcome = None
+        self.failure = None
+        self.captcha_token = False  # Whether the form was submitted with a solved reCAPTCHA
+
+    def _step(self, name, action):
+        """Run one step of the flow and log how long it took."""
+        started = time.perf_counter()
+        try:
+            return action()
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings.append((name, elapsed))
+            metrics.record_span(f"selenium {name}", elapsed)
+            if self.config.DEBUG:
+                print(f"⏱️  {name}: {elapsed:.2f}s")
+
+    @staticmethod
+    def _first(driver, selector):
+        """First element matching `selector`, or None (a single WebDriver round-trip)."""
+        elements = driver.find_elements(*selector)
+        return elements[0] if elements else None
+
+    @staticmethod
+    def _wait(driver, timeout, condition, failure_message, error=StepFailed):
+        try:
+            return WebDriverWait(driver, timeout).until(condition)
+        except TimeoutException:
+            raise error(failure_message)
+
+    def post(self, driver, url, comment_text):
+        """Post `comment_text` on `url`. Returns True once Disqus has accepted the comment (see `outcome`)."""
+        self.timings = []
+        self.outcome = None
+        self.failure = None
+        self.captcha_token = False
+        try:
+            self._step("page load", lambda: self._load_page(driver, url))
+            self._step("open comments", lambda: self._open_comments(driver))
+            self._step("disqus iframe", lambda: self._enter_disqus_frame(driver))
+            self._step("editor ready", lambda: self._fill_editor(driver, comment_text))
+            self._step("guest form", lambda: self._fill_guest_form(driver))
+            self._step("captcha", lambda: self._wait_for_captcha(driver, url))
+            self._step("submit", lambda: self._submit(driver))
+            try:
+                self.outcome = self._step("confirmation", lambda: self._confirm(driver, comment_text))
+            except LateCaptcha:
+                # The widget rendered after CAPTCHA_APPEAR_TIMEOUT: solve it like any other, then submit again
+                print("⚠️ A reCAPTCHA appeared after submitting. Solving it and submitting again...")
+                metrics.incr("captcha_late", site=self.config.SITE_NAME)
+                self._step("captcha", lambda: self._wait_for_captcha(driver, url))
+                self._step("submit", lambda: self._submit(driver))
+                self.outcome = self._step("confirmation", lambda: self._confirm(driver, comment_text))
+            print(f"✅ Successfully posted comment to: {url} ({self.outcome})")
+            return True
+        except StepFailed as e:
+            self.failure = e
+            print(f"❌ {e}")
+            if self.config.DEBUG:
+                self.dump_debug_info(driver)
+            return False
+        except WebDriverException as e:
+            self.failure = e
+            print(f"❌ General error posting comment: {e}")
+            import traceback  # For detailed error info
+            traceback.print_exc()  # Print full traceback
+            return False
+        finally:
+            self.selectors.save()
+            total = sum(elapsed for _, elapsed in self.timings)
+            print("Step timings: " + ", ".join(f"{name} {elapsed:.2f}s" for name, elapsed in self.timings)
+                  + f" (total {total:.2f}s)")
+
+    def _load_page(self, driver, url):
+        driver.get(url)
+        print(f"Loaded page: {url}")
+        self._wait(driver, self.config.SELENIUM_PAGE_LOAD_TIMEOUT,
+                   lambda d: d.execute_script("return document.readyState") == "complete",
+                   "Timed out waiting for the page to finish loading.")
+
+    def _open_comments(self, driver):
+        # Look for the Comments button - try different possible selectors, last winner first
+        comment_button = self.selectors.resolve("comments button", COMMENT_BUTTON_SELECTORS,
+                                                lambda selector: self._first(driver, selector))
+        if comment_button:
+            print("Found 'Comments' button, clicking it...")
+            comment_button.click()
+            return
+        print("No comments button found, assuming Disqus is already loaded...")
+
+    @staticmethod
+    def _find_disqus_iframe(driver):
+        for iframe in driver.find_elements(By.TAG_NAME, "iframe"):
+            src = (iframe.get_attribute("src") or "").lower()  # Lowercase for case-insensitive check
+            if "disqus" in src:
+                return iframe
+        return False
+
+    def _probe_iframe(self, driver, selector):
+        return self._find_disqus_iframe(driver) if selector == IFRAME_SCAN else self._first(driver, selector)
+
+    def _enter_disqus_frame(self, driver):
+        # Poll with one cheap script, then walk the selector chain once so its stats count one lookup per post
+        try:
+            WebDriverWait(driver, self.config.SELENIUM_IFRAME_TIMEOUT).until(
+                lambda d: d.execute_script(DISQUS_IFRAME_PRESENT_SCRIPT))
+            iframe = self.selectors.resolve("disqus iframe", IFRAME_SELECTORS,
+                                            lambda selector: self._probe_iframe(driver, selector))
+            if not iframe:
+                raise TimeoutException("Disqus iframe went away")
+        except TimeoutException:
+            print("❌ No Disqus iframe found. Checking for alternative Disqus elements (may not be in iframe).")
+            # Try to find any Disqus elements on the page if iframe approach fails as fallback.
+            if driver.find_elements(By.CSS_SELECTOR, "[id*='disqus']"):
+                print("Found alternative Disqus elements (not iframe), assuming Disqus is directly embedded.")
+                return
+            raise StepFailed("No Disqus iframe or alternative elements found. Disqus might not be loaded or incorrectly detected.")
+        print(f"Switched to Disqus iframe: {iframe.get_attribute('src')}")
+        driver.switch_to.frame(iframe)
+
+    def _fill_editor(self, driver, comment_text):
+        # Focus the editable div to start the discussion
+        editor = self._wait(driver, self.config.SELENIUM_EDITOR_TIMEOUT, EC.element_to_be_clickable(EDITOR_SELECTOR),
+                            "Timed out waiting for comment textarea (editable div) to be clickable.")
+        print("Found comment textarea (editable div), clicking to focus...")
+        editor.click()
+
+        self._wait(driver, self.config.SELENIUM_EDITOR_TIMEOUT, lambda d: d.find_elements(By.CSS_SELECTOR, TEXTAREA_ANY_CSS),
+                   "Timed out waiting for comment textarea.")
+        comment_textarea = self.selectors.resolve("comment textarea", TEXTAREA_SELECTORS,
+                                                  lambda selector: self._first(driver, selector))
+        if not comment_textarea:
+            raise StepFailed("Comment textarea disappeared before it could be filled.")
+        print("✅ Found comment textarea element. Entering comment text...")
+        driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].focus();", comment_textarea)
+        comment_textarea.send_keys(comment_text)
+        self._wait(driver, self.config.SELENIUM_EDITOR_TIMEOUT,
+                   lambda d: (comment_textarea.get_attribute("value") or comment_textarea.text or "").strip(),
+                   "Comment text did not appear in the editor.")
+
+    def _fill_guest_form(self, driver):
+        timeout = self.config.SELENIUM_FORM_TIMEOUT
+
+        # 1. Click Name Field to expand form, then wait for the expanded name input
+        name_field_placeholder = self._wait(driver, timeout, EC.element_to_be_clickable(NAME_PLACEHOLDER_SELECTOR),
+                                            "Timed out waiting for 'Name' field to be clickable.")
+        print("Found 'Name' field, clicking it...")
+        name_field_placeholder.click()
+
+        # 2. Enter Guest Name
+        name_field = self._wait(driver, timeout, EC.visibility_of_element_located(NAME_FIELD_SELECTOR),
+                                "Timed out waiting for name input field to be present.")
+        name_field.send_keys(self.config.COMMENT_NAME)  # Use name from config
+        print(f"Entered guest name: {self.config.COMMENT_NAME}")
+
+        # 3. Check 'Post as Guest' Checkbox
+        guest_checkbox = self._wait(driver, timeout, EC.element_to_be_clickable(GUEST_CHECKBOX_SELECTOR),
+                                    "Timed out waiting for 'Post as a guest' checkbox to be clickable.")
+        print("Found 'Post as a guest' checkbox, clicking it...")
+        guest_checkbox.click()
+
+        # 4. Enter Guest Email once the checkbox has revealed it
+        email_field = self._wait(driver, timeout, EC.visibility_of_element_located(EMAIL_FIELD_SELECTOR),
+                                 "Timed out waiting for email input field to be present.")
+        email_field.send_keys(self.config.COMMENT_EMAIL)  # Use email from config
+        print(f"Entered guest email: {self.config.COMMENT_EMAIL}")
+
+    @staticmethod
+    def _captcha_state(driver):
+        return driver.execute_script(CAPTCHA_STATE_SCRIPT)
+
+    def _wait_for_captcha(self, driver, url):
+        """Wait until the reCAPTCHA is solved (polling its response field), handing the session to the operator queue."""
+        try:
+            WebDriverWait(driver, self.config.CAPTCHA_APPEAR_TIMEOUT, poll_frequency=0.25).until(
+                lambda d: self._captcha_state(d) != "absent")
+        except TimeoutException:
+            print("✅ Guest form filled. No reCAPTCHA to solve, proceeding...")
+            return
+        solved = lambda d: self._captcha_state(d) == "solved"
+        if not self.config.CAPTCHA_HANDOFF:
+            print("✅ Guest form filled. Waiting for manual reCAPTCHA completion... PLEASE COMPLETE THE reCAPTCHA MANUALLY IN THE BROWSER!")
+            self._wait(driver, self.config.MANUAL_CAPTCHA_TIMEOUT, solved, "reCAPTCHA was not completed in time.",
+                       CaptchaNotSolved)
+        else:
+            # Only this posting worker waits; discovery, generation and the other sessions carry on
+            with operator_queue.session(url, debugger_url(driver)):
+                self._wait(driver, self.config.OPERATOR_SOLVE_TIMEOUT, solved,
+                           "The operator did not solve the reCAPTCHA in time.", CaptchaNotSolved)
+        self.captcha_token = True
+        print("✅ reCAPTCHA completed. Proceeding...")
+
+    def _submit(self, driver):
+        # Look for the post/submit comment button: last winner first, then most specific selector first
+        post_button = self.selectors.resolve("submit button", SUBMIT_BUTTON_SELECTORS,
+                                             lambda selector: self._first(driver, selector))
+        if not post_button:
+            raise StepFailed("No post button (arrow) found after entering comment and guest details.")
+
+        print("Found post button (arrow), waiting for it to be clickable...")
+        self._wait(driver, self.config.SELENIUM_TIMEOUT, EC.element_to_be_clickable(post_button),
+                   "Timed out waiting for post button (arrow) to become clickable.")
+        driver.execute_script("arguments[0].scrollIntoView(true);", post_button)  # Scroll into view *before* click
+        print("Clicking post button (arrow)...")
+        post_button.click()
+
+    def _confirm(self, driver, comment_text):
+        """Wait until Disqus accepted the comment and return its memory outcome.
+
+        A rendered comment or a moderation notice confirms at once. An editor that was emptied
+        without either (moderated threads that show no notice) only counts once it was seen holding
+        the comment after the click, and has to stay empty for SELENIUM_CLEARED_EDITOR_SETTLE
+        seconds, so a comment about to render still counts as "posted".
+        Raises LateCaptcha if the comment is stuck in the editor behind a reCAPTCHA that rendered
+        after the form was submitted without a token.
+        """
+        snippet = " ".join(comment_text.split())[:40]
+        cleared_at = {}
+        seen = set()
+
+        def accepted(d):
+            state = d.execute_script(COMMENT_STATE_SCRIPT, snippet)
+            seen.add(state)
+            if state == "editing" and not self.captcha_token and self._captcha_state(d) != "absent":
+                raise LateCaptcha()
+            if state != "cleared":
+                cleared_at.clear()
+                return state if state in CONFIRMED_OUTCOMES else False
+            if "editing" not in seen:
+                return False  # Never saw our text, so an empty editor proves nothing (e.g. a reloaded iframe)
+            started = cleared_at.setdefault("at", time.monotonic())
+            return state if time.monotonic() - started >= self.config.SELENIUM_CLEARED_EDITOR_SETTLE else False
+
+        state = self._wait(driver, self.config.SELENIUM_WAIT_AFTER_COMMENT, accepted,
+                           "Comment was submitted but Disqus did not accept it.")
+        print({"visible": "✅ Comment is visible in the Disqus thread.",
+               "moderation": "✅ Comment is awaiting moderation.",
+               "cleared": "✅ Comment was accepted (editor cleared) but is not shown yet."}[state])
+        return CONFIRMED_OUTCOMES[state]
+
+    @staticmethod
+    def dump_debug_info(driver):
+        """Print the Disqus form structure to help diagnose selector changes."""
+        try:
+            DisqusPoster._print_debug_info(driver)
+        except WebDriverException as e:
+            print(f"Could not collect debug info: {e}")
+
+    @staticmethod
+    def _print_debug_info(driver):
+        print("\nPage elements for debugging (first 100 elements from form):")
+        forms = driver.find_elements(By.TAG_NAME, "form")
+        if forms:
+            elements = forms[0].find_elements(By.XPATH, ".//*")  # Search within the form
+            print(f"Found {len(elements)} form elements. Printing first 100 around guest form:")
+            for i, element in enumerate(elements[:100]):
+                print(
+                    f"{i + 1}: Tag: {element.tag_name}, Class: {element.get_attribute('class')}, ID: {element.get_attribute('id')}, Text: '{element.text[:50]}...'")
+
+        print("\nLooking for Disqus-specific elements:")
+        for selector in [".post-list", "#disqus_thread", ".textarea", ".wysiwyg", ".comment-box"]:
+            elements = driver.find_elements(By.CSS_SELECTOR, selector)
+            if elements:
+                print(f"Found {selector}: {len(elements)} elements")
+
+        buttons = driver.find_elements(By.TAG_NAME, "button")
+        print(f"Found {len(buttons)} buttons. Printing first 5:")
+        for i, button in enumerate(buttons[:5]):  # Print first 5 buttons
+            print(f"Button {i + 1}: '{button.text}'")
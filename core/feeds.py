@@ -0,0 +1,143 @@
+import codecs
+import io
+import re
+import xml.etree.ElementTree as ET
+from collections import namedtuple
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+
+FeedEntry = namedtuple("FeedEntry", "url lastmod")  # lastmod is a UTC timestamp or None
+SitemapRef = namedtuple("SitemapRef", "url lastmod")  # A child sitemap listed in a sitemap index
+
+ATOM_LINK_RELS = (None, "alternate")
+# W3C datetime profile of ISO 8601 (sitemaps, Atom); seconds, fractions and the offset are optional
+W3C_DATETIME = re.compile(
+    r"(\d{4})(?:-(\d{2})(?:-(\d{2})(?:[T ](\d{2}):(\d{2})(?::(\d{2})(?:[.,]\d+)?)?)?)?)?"
+    r"\s*(?:(Z)|([+-])(\d{2}):?(\d{2}))?", re.IGNORECASE)
+XML_DECLARED_ENCODING = re.compile(rb"""^<\?xml[^>]*?encoding\s*=\s*["']([A-Za-z0-9._-]+)["']""")
+
+
+def _local(tag):
+    """Element name without its XML namespace."""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_w3c_datetime(value):
+    """Parse a sitemap/Atom date (W3C datetime, e.g. 2024-05-01 or 2024-05-01T10:00:00.123+0200) to a UTC timestamp.
+
+    Matched by hand rather than with datetime.fromisoformat, which before Python 3.11 rejects
+    fractional seconds that aren't 3 or 6 digits, offsets without a colon and "Z". Fractions
+    are dropped; dates without an offset are taken as UTC.
+    """
+    if not value:
+        return None
+    match = W3C_DATETIME.fullmatch(value.strip())
+    if not match:
+        return None
+    year, month, day, hour, minute, second, zulu, sign, offset_hours, offset_minutes = match.groups()
+    try:
+        tz = timezone.utc
+        if sign:
+            offset = timedelta(hours=int(offset_hours), minutes=int(offset_minutes))
+            tz = timezone(-offset if sign == "-" else offset)
+        parsed = datetime(int(year), int(month or 1), int(day or 1), int(hour or 0), int(minute or 0),
+                          int(second or 0), tzinfo=tz)
+    except ValueError:  # Out of range fields, e.g. month 13 or offset beyond 24 hours
+        return None
+    return parsed.timestamp()
+
+
+def parse_rfc822_datetime(value):
+    """Parse an RSS pubDate (RFC 822) to a UTC timestamp."""
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value.strip())
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def xml_encoding(data):
+    """Encoding of an XML document given as bytes: its byte order mark, else its declaration, else UTF-8."""
+    if data.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    match = XML_DECLARED_ENCODING.match(data.lstrip())
+    if match:
+        try:
+            return codecs.lookup(match.group(1).decode("ascii")).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def _iterparse(xml_text):
+    """Stream (event, element) pairs, freeing each finished element so memory stays flat on large files.
+
+    Bytes go to the parser untouched so it honors the document's own encoding. Text was already
+    decoded, so it is fed as text and its encoding declaration (now meaningless) is ignored.
+    """
+    if isinstance(xml_text, bytes):
+        for event, elem in ET.iterparse(io.BytesIO(xml_text), events=("end",)):
+            yield _local(elem.tag), elem
+        return
+    parser = ET.XMLPullParser(events=("end",))
+    for start in range(0, len(xml_text), 64 * 1024):
+        parser.feed(xml_text[start:start + 64 * 1024])
+        for event, elem in parser.read_events():
+            yield _local(elem.tag), elem
+    parser.close()
+    for event, elem in parser.read_events():
+        yield _local(elem.tag), elem
+
+
+def iter_sitemap(xml_text):
+    """Yield FeedEntry for <url> entries and SitemapRef for <sitemap> entries of a sitemap or sitemap index."""
+    for name, elem in _iterparse(xml_text):
+        if name not in ("url", "sitemap"):
+            continue
+        loc = lastmod = None
+        for child in elem:
+            child_name = _local(child.tag)
+            if child_name == "loc":
+                loc = (child.text or "").strip()
+            elif child_name == "lastmod":
+                lastmod = parse_w3c_datetime(child.text)
+        if loc:
+            yield (FeedEntry if name == "url" else SitemapRef)(loc, lastmod)
+        elem.clear()
+
+
+def iter_feed(xml_text):
+    """Yield FeedEntry for every item of an RSS 2.0 or Atom feed."""
+    for name, elem in _iterparse(xml_text):
+        if name == "item":  # RSS
+            link = lastmod = None
+            for child in elem:
+                child_name = _local(child.tag)
+                if child_name == "link":
+                    link = (child.text or "").strip()
+                elif child_name == "pubDate":
+                    lastmod = parse_rfc822_datetime(child.text)
+                elif child_name == "updated" and lastmod is None:
+                    lastmod = parse_w3c_datetime(child.text)
+            if link:
+                yield FeedEntry(link, lastmod)
+            elem.clear()
+        elif name == "entry":  # Atom
+            link = lastmod = None
+            for child in elem:
+                child_name = _local(child.tag)
+                if child_name == "link" and child.get("rel") in ATOM_LINK_RELS and link is None:
+                    link = child.get("href")
+                elif child_name == "updated":
+                    lastmod = parse_w3c_datetime(child.text)
+                elif child_name == "published" and lastmod is None:
+                    lastmod = parse_w3c_datetime(child.text)
+            if link:
+                yield FeedEntry(link, lastmod)
+            elem.clear()
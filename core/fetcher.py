@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+from config.config import Config # Import Config from config module
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, up to `capacity` banked."""
+
+    def __init__(self, rate, capacity):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated_at
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """Block until a token is available, then take it."""
+        while True:
+            with self.lock:
+                self._refill(time.monotonic())
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so every site gets its own request budget."""
+
+    def __init__(self, rate=Config.REQUESTS_PER_SECOND_PER_HOST, burst=Config.REQUEST_BURST_PER_HOST):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url):
+        """Return the token bucket for the host of `url`."""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self.buckets[host] = bucket
+            return bucket
+
+    def set_host_limit(self, url, rate, burst):
+        """Give the host of `url` its own limit. Sites sharing a host get the strictest limit among them."""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is not None:
+                rate, burst = min(rate, bucket.rate), min(burst, bucket.capacity)
+            self.buckets[host] = TokenBucket(rate, burst)
+
+    def acquire(self, url):
+        """Block until a request to the host of `url` is allowed."""
+        self.bucket_for(url).acquire()
+
+
+class ConcurrentFetcher:
+    """Runs fetch jobs on a worker pool and streams results back in input order."""
+
+    def __init__(self, max_workers=Config.FETCH_WORKERS):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+
+    def imap_ordered(self, fn, items, window=None, discard=None):
+        """Yield (item, fn(item)) pairs in input order, keeping up to `window` calls in flight.
+
+        `items` is consumed lazily, so a consumer that stops early also stops new work from being queued.
+        Calls still queued when the consumer stops are cancelled; `discard(item, result)` is called with the
+        result of each one already running or finished, when it completes, so it can be cleaned up.
+        """
+        window = window or self.max_workers
+        pending = deque()
+        items = iter(items)
+        try:
+            while True:
+                while len(pending) < window:
+                    try:
+                        item = next(items)
+                    except StopIteration:
+                        break
+                    pending.append((item, self.executor.submit(fn, item)))
+                if not pending:
+                    return
+                item, future = pending.popleft()
+                yield item, future.result()
+        finally:
+            for item, future in pending:
+                if not future.cancel() and discard is not None:
+                    future.add_done_callback(lambda done, item=item: self._discard(discard, item, done))
+
+    @staticmethod
+    def _discard(discard, item, future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        discard(item, future.result())
+
+    def shutdown(self):
+        """Stop the worker pool."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,88 @@
+import hashlib
+import json
+import threading
+import time
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+from core.storage import connect_sqlite
+
+def request_key(request_body):
+    """Content address of a generation request: title, prompt content, templates, model and sampling settings."""
+    canonical = json.dumps(request_body, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class GenerationCache:
+    """Persistent cache of generated-but-not-yet-posted comments, keyed on the request content hash."""
+
+    def __init__(self, path=Config.GENERATION_CACHE_FILE, max_entries=Config.GENERATION_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidated": 0, "evictions": 0}
+        self.conn = connect_sqlite(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS generated_comments (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                comment TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS generated_comments_url ON generated_comments (url)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS generated_comments_accessed_at ON generated_comments (accessed_at)")
+
+    def get(self, key):
+        """Return the cached comment for `key`, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT comment FROM generated_comments WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.stats["misses"] += 1
+                metrics.incr("generation_cache", outcome="misses")
+                return None
+            self.conn.execute("UPDATE generated_comments SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.stats["hits"] += 1
+            metrics.incr("generation_cache", outcome="hits")
+            return row[0]
+
+    def put(self, key, url, comment):
+        """Store a freshly generated comment, evicting the least recently used entries over the cap."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO generated_comments (key, url, comment, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, url, comment, now, now))
+            excess = self.conn.execute("SELECT COUNT(*) FROM generated_comments").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM generated_comments WHERE key IN "
+                    "(SELECT key FROM generated_comments ORDER BY accessed_at LIMIT ?)", (excess,))
+                self.stats["evictions"] += excess
+
+    def invalidate_url(self, url, keep_key=None):
+        """Drop comments generated for an older version of `url` (anything not matching `keep_key`)."""
+        with self.lock:
+            cursor = self.conn.execute(
+                "DELETE FROM generated_comments WHERE url = ? AND key IS NOT ?", (url, keep_key))
+            self.stats["invalidated"] += cursor.rowcount
+            return cursor.rowcount
+
+    def forget_url(self, url):
+        """Drop the comment cached for `url` once it is no longer needed (not counted as an invalidation)."""
+        with self.lock:
+            return self.conn.execute("DELETE FROM generated_comments WHERE url = ?", (url,)).rowcount
+
+    def hit_rate(self):
+        """Fraction of lookups served from the cache."""
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / lookups if lookups else 0.0
+
+    def summary(self):
+        """One-line human readable summary of the cache counters."""
+        s = self.stats
+        return (f"Generation cache: {s['hits']} hits, {s['misses']} misses ({self.hit_rate():.0%} hit rate), "
+                f"{s['invalidated']} invalidated, {s['evictions']} evictions")
+
+    def close(self):
+        """Close the underlying database."""
+        with self.lock:
+            self.conn.close()
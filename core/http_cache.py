@@ -0,0 +1,109 @@
+import threading
+import time
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+from core.storage import connect_sqlite
+
+class CachedResponse:
+    """A cached page body plus the validators needed to revalidate it."""
+
+    def __init__(self, url, body, etag, last_modified, fetched_at):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, ttl):
+        """True if the entry is young enough to serve without contacting the server."""
+        return time.time() - self.fetched_at < ttl
+
+    def conditional_headers(self):
+        """Headers for a conditional GET against this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """On-disk HTTP response cache with TTL freshness, conditional revalidation and LRU eviction."""
+
+    def __init__(self, path=Config.HTTP_CACHE_FILE, max_bytes=Config.HTTP_CACHE_MAX_BYTES, ttl=Config.HTTP_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "refreshed": 0, "evictions": 0}
+        self.conn = connect_sqlite(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    def get(self, url):
+        """Return the cached entry for `url` (fresh or stale), or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        return CachedResponse(url, row[0], row[1], row[2], row[3])
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """Insert or replace the entry for `url`, evicting least recently used entries over the size cap."""
+        now = time.time()
+        size = len(body.encode("utf-8"))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (url, body, etag, last_modified, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, size, now, now))
+            self._evict()
+
+    def mark_revalidated(self, url, etag=None, last_modified=None):
+        """Restart the TTL of an entry after the server answered 304 Not Modified."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (now, now, etag, last_modified, url))
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            self.stats["evictions"] += 1
+
+    def record(self, outcome):
+        """Count a cache outcome ('hits', 'misses', 'revalidated' or 'refreshed')."""
+        with self.lock:
+            self.stats[outcome] += 1
+        metrics.incr("http_cache", outcome=outcome)
+
+    def summary(self):
+        """One-line human readable summary of the cache counters."""
+        s = self.stats
+        return (f"HTTP cache: {s['hits']} fresh hits, {s['revalidated']} revalidated (304), "
+                f"{s['refreshed']} changed, {s['misses']} misses, {s['evictions']} evictions")
+
+    def close(self):
+        """Close the underlying database."""
+        with self.lock:
+            self.conn.close()
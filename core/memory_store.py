@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from config.config import Config # Import Config from config module
+from core.storage import connect_sqlite
+
+def fingerprint(text):
+    """Stable SHA-256 hex digest used for comment hashes and content fingerprints."""
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+class JSONMemoryStore:
+    """Legacy memory backend: the whole history lives in one JSON file, rewritten on every change."""
+
+    def __init__(self, path=Config.MEMORY_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.records, self.seen = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}, {}
+        except json.JSONDecodeError:
+            print("Warning: Memory file is corrupted. Starting with empty memory.")
+            return {}, {}
+        records = {url: {"url": url, "outcome": "posted"} for url in data.get("commented_posts", [])}
+        records.update(data.get("post_metadata", {}))
+        return records, data.get("seen_posts", {})
+
+    def _save(self):
+        data = {
+            "commented_posts": list(self.records),
+            "post_metadata": self.records,
+            "seen_posts": self.seen,
+        }
+        # Write to a temporary file and swap it in so a crash never leaves a truncated memory file
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+    def contains(self, url):
+        """Check if the post URL is already in memory."""
+        return url in self.records
+
+    def get(self, url):
+        """Return the stored metadata for a post, or None."""
+        return self.records.get(url)
+
+    def record(self, url, outcome="posted", comment_text=None, content=None, content_hash=None):
+        """Store (or update) a post with its outcome, comment hash and content fingerprint (or precomputed `content_hash`)."""
+        with self.lock:
+            self.records[url] = {
+                "url": url,
+                "commented_at": time.time(),
+                "outcome": outcome,
+                "comment_hash": fingerprint(comment_text) if comment_text else None,
+                "content_fingerprint": content_hash or (fingerprint(content) if content else None),
+            }
+            self._save()
+
+    def urls(self):
+        """All post URLs in memory."""
+        return list(self.records)
+
+    def get_seen_lastmod(self, url):
+        """Last-modified timestamp of a post the last time it was inspected and skipped, or None."""
+        return self.seen.get(url)
+
+    def mark_seen(self, url, lastmod):
+        """Remember that a post was inspected at `lastmod` and could not be commented on."""
+        with self.lock:
+            self.seen[url] = lastmod
+            self._save()
+
+    def close(self):
+        """Nothing to release for the JSON backend."""
+
+
+class SQLiteMemoryStore:
+    """Memory backend on SQLite: indexed lookups and one small transactional insert per comment."""
+
+    def __init__(self, path=Config.MEMORY_DB_FILE):
+        self.lock = threading.Lock()
+        self.conn = connect_sqlite(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS commented_posts (
+                url TEXT PRIMARY KEY,
+                commented_at REAL NOT NULL,
+                outcome TEXT NOT NULL,
+                comment_hash TEXT,
+                content_fingerprint TEXT
+            )""")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_posts (url TEXT PRIMARY KEY, lastmod REAL)")
+        # Keep the URL set in memory so is_already_commented never touches disk
+        self.known_urls = {row[0] for row in self.conn.execute("SELECT url FROM commented_posts")}
+
+    def contains(self, url):
+        """Check if the post URL is already in memory."""
+        return url in self.known_urls
+
+    def get(self, url):
+        """Return the stored metadata for a post, or None."""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT url, commented_at, outcome, comment_hash, content_fingerprint "
+                "FROM commented_posts WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        keys = ("url", "commented_at", "outcome", "comment_hash", "content_fingerprint")
+        return dict(zip(keys, row))
+
+    def record(self, url, outcome="posted", comment_text=None, content=None, commented_at=None, content_hash=None):
+        """Store (or update) a post with its outcome, comment hash and content fingerprint (or precomputed `content_hash`)."""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO commented_posts "
+                "(url, commented_at, outcome, comment_hash, content_fingerprint) VALUES (?, ?, ?, ?, ?)",
+                (url, commented_at or time.time(), outcome,
+                 fingerprint(comment_text) if comment_text else None,
+                 content_hash or (fingerprint(content) if content else None)))
+            self.known_urls.add(url)
+
+    def urls(self):
+        """All post URLs in memory."""
+        return list(self.known_urls)
+
+    def get_seen_lastmod(self, url):
+        """Last-modified timestamp of a post the last time it was inspected and skipped, or None."""
+        with self.lock:
+            row = self.conn.execute("SELECT lastmod FROM seen_posts WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def mark_seen(self, url, lastmod):
+        """Remember that a post was inspected at `lastmod` and could not be commented on."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO seen_posts (url, lastmod) VALUES (?, ?)", (url, lastmod))
+
+    def get_meta(self, key):
+        """Read a value from the store's key/value metadata table."""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key, value):
+        """Write a value to the store's key/value metadata table."""
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self):
+        """Close the underlying database."""
+        with self.lock:
+            self.conn.close()
+
+
+def migrate_json_memory(store, json_path=Config.MEMORY_FILE):
+    """One-shot import of the legacy JSON memory file into a SQLite store. Returns the number of posts imported."""
+    if store.get_meta("migrated_from_json") or not os.path.exists(json_path):
+        return 0
+
+    legacy = JSONMemoryStore(json_path)
+    imported = 0
+    with store.lock:
+        # Import everything in a single transaction so an interrupted migration leaves no partial state
+        store.conn.execute("BEGIN")
+        try:
+            for url in legacy.urls():
+                record = legacy.get(url)
+                store.conn.execute(
+                    "INSERT OR IGNORE INTO commented_posts "
+                    "(url, commented_at, outcome, comment_hash, content_fingerprint) VALUES (?, ?, ?, ?, ?)",
+                    (url, record.get("commented_at") or os.path.getmtime(json_path),
+                     record.get("outcome", "posted"), record.get("comment_hash"),
+                     record.get("content_fingerprint")))
+                imported += 1
+            # Posts skipped at a lastmod, so they aren't all fetched again after the switch
+            store.conn.executemany("INSERT OR IGNORE INTO seen_posts (url, lastmod) VALUES (?, ?)",
+                                   legacy.seen.items())
+            store.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                               ("migrated_from_json", json_path))
+            store.conn.execute("COMMIT")
+        except Exception:
+            store.conn.execute("ROLLBACK")
+            raise
+        store.known_urls.update(legacy.urls())
+    print(f"Migrated {imported} posts from {json_path} into the SQLite memory store")
+    return imported
+
+
+def create_memory_store(backend=None, config=Config):
+    """Build the configured memory backend ('sqlite' or 'json') at the paths of `config` (one site's namespace)."""
+    backend = backend or config.MEMORY_BACKEND
+    if backend == "json":
+        return JSONMemoryStore(config.MEMORY_FILE)
+    if backend == "sqlite":
+        store = SQLiteMemoryStore(config.MEMORY_DB_FILE)
+        migrate_json_memory(store, config.MEMORY_FILE)
+        return store
+    raise ValueError(f"Unknown memory backend: {backend}")
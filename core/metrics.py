@@ -0,0 +1,194 @@
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from config.config import Config # Import Config from config module
+
+PROMETHEUS_PREFIX = "blog_commenter"
+
+
+def _metric_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower()
+
+
+def _escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_string(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape_label(v)}"' for k, v in sorted(labels)) + "}"
+
+
+class Metrics:
+    """Process-wide counters and timing spans, exportable as JSON lines and a Prometheus text file."""
+
+    def __init__(self, max_events=100000):
+        self.lock = threading.Lock()
+        self.run_id = uuid.uuid4().hex[:12]
+        self.counters = {}  # (name, labels) -> value
+        self.span_totals = {}  # name -> [count, total_seconds, max_seconds]
+        self.events = deque(maxlen=max_events)  # Bounded so long daemon runs can't grow without limit
+
+    def incr(self, name, value=1, **labels):
+        """Increase a counter, e.g. incr("http_requests", status=200)."""
+        if not Config.METRICS_ENABLED:
+            return
+        key = (_metric_name(name), tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record_span(self, name, duration, **attrs):
+        """Record a finished timing span."""
+        if not Config.METRICS_ENABLED:
+            return
+        name = _metric_name(name)
+        with self.lock:
+            totals = self.span_totals.setdefault(name, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += duration
+            totals[2] = max(totals[2], duration)
+            self.events.append({"run_id": self.run_id, "type": "span", "name": name, "ts": time.time(),
+                                "duration": round(duration, 6), "thread": threading.current_thread().name,
+                                **attrs})
+
+    @contextmanager
+    def span(self, name, **attrs):
+        """Time a block. Yields a dict the block can add attributes to (e.g. token counts)."""
+        started = time.perf_counter()
+        try:
+            yield attrs
+        except Exception as e:
+            attrs["error"] = type(e).__name__
+            self.incr("span_errors", span=_metric_name(name))
+            raise
+        finally:
+            self.record_span(name, time.perf_counter() - started, **attrs)
+
+    def summary(self):
+        """Human readable per-span totals and counters."""
+        with self.lock:
+            lines = [f"{'span':28s} {'count':>7s} {'total s':>9s} {'avg ms':>9s} {'max ms':>9s}"]
+            for name, (count, total, longest) in sorted(self.span_totals.items(), key=lambda item: -item[1][1]):
+                lines.append(f"{name:28s} {count:7d} {total:9.2f} {total / count * 1000:9.1f} {longest * 1000:9.1f}")
+            for (name, labels), value in sorted(self.counters.items()):
+                lines.append(f"{name}{_label_string(labels)} = {value}")
+        return "\n".join(lines)
+
+    def export_jsonl(self, path=Config.METRICS_JSONL_FILE):
+        """Append all recorded spans plus a counters snapshot to a JSON lines file."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self.lock:
+            events = list(self.events)
+            self.events.clear()
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self.counters.items()]
+        with open(path, "a") as f:
+            for event in events:
+                f.write(json.dumps(event) + "\n")
+            f.write(json.dumps({"run_id": self.run_id, "type": "counters", "ts": time.time(), "counters": counters}) + "\n")
+
+    def write_prometheus(self, path=Config.METRICS_PROMETHEUS_FILE):
+        """Write counters and span totals in the Prometheus text format (for node_exporter's textfile collector)."""
+        with self.lock:
+            lines = []
+            for name in sorted({name for name, _ in self.counters}):
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}_{name}_total counter")
+                for (counter_name, labels), value in sorted(self.counters.items()):
+                    if counter_name == name:
+                        lines.append(f"{PROMETHEUS_PREFIX}_{name}_total{_label_string(labels)} {value}")
+            if self.span_totals:
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}_span_seconds summary")
+                for name, (count, total, _) in sorted(self.span_totals.items()):
+                    labels = _label_string((("span", name),))
+                    lines.append(f"{PROMETHEUS_PREFIX}_span_seconds_count{labels} {count}")
+                    lines.append(f"{PROMETHEUS_PREFIX}_span_seconds_sum{labels} {total:.6f}")
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}_span_seconds_max gauge")
+                for name, (_, _, longest) in sorted(self.span_totals.items()):
+                    lines.append(f"{PROMETHEUS_PREFIX}_span_seconds_max{_label_string((('span', name),))} {longest:.6f}")
+            lines.append(f"# TYPE {PROMETHEUS_PREFIX}_last_run_timestamp_seconds gauge")
+            lines.append(f"{PROMETHEUS_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+
+        # The textfile collector may read at any moment, so write to a temp file and rename it into place
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+    def export(self):
+        """Write whichever exports are configured."""
+        if not Config.METRICS_ENABLED:
+            return
+        if Config.METRICS_JSONL_FILE:
+            self.export_jsonl(Config.METRICS_JSONL_FILE)
+        if Config.METRICS_PROMETHEUS_FILE:
+            self.write_prometheus(Config.METRICS_PROMETHEUS_FILE)
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def profile_run(enabled=Config.PROFILE_RUN, output_dir=Config.PROFILE_OUTPUT_DIR):
+    """Opt-in cProfile + tracemalloc capture around a whole run.
+
+    Up to Python 3.11, threads started inside the block (pipeline stages, fetch workers) get
+    their own profiler, and all of them are merged into one report. Python 3.12+ allows only one
+    active profiler per process, so there only the calling thread is profiled.
+    """
+    if not enabled:
+        yield
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+    profiler = cProfile.Profile()
+    thread_profilers = []
+
+    per_thread = sys.version_info < (3, 12)
+
+    def start_thread_profiler(frame, event, arg):
+        # Runs once on the first event of each new thread, then hands over to a real profiler
+        thread_profiler = cProfile.Profile()
+        try:
+            thread_profiler.enable()
+        except ValueError:  # Another profiler is already active; leave this thread unprofiled
+            sys.setprofile(None)
+            return
+        thread_profilers.append(thread_profiler)
+
+    tracemalloc.start()
+    if per_thread:
+        threading.setprofile(start_thread_profiler)
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        if per_thread:
+            threading.setprofile(None)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        profile_path = os.path.join(output_dir, f"run-{stamp}.prof")
+        print(f"\nProfile written to {profile_path} (open with `python -m pstats` or snakeviz)")
+        stats = pstats.Stats(profiler)
+        for thread_profiler in thread_profilers:
+            stats.add(thread_profiler)
+        stats.dump_stats(profile_path)
+        stats.sort_stats("cumulative").print_stats(15)
+
+        print(f"Memory: {current / 1024 / 1024:.1f} MiB live at exit, {peak / 1024 / 1024:.1f} MiB peak")
+        for stat in snapshot.statistics("lineno")[:10]:
+            print(f"  {stat}")
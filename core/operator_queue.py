@@ -0,0 +1,98 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+
+
+class HandOff:
+    """A headless browser session parked on a filled-in comment form, waiting for a human to solve its reCAPTCHA."""
+
+    def __init__(self, number, url, debugger_url):
+        self.number = number
+        self.url = url
+        self.debugger_url = debugger_url
+        self.queued_at = time.time()
+
+
+class OperatorQueue:
+    """First-in first-out queue of browser sessions waiting for the operator.
+
+    Posting workers fill the form headless, hand the session off here and keep polling for
+    the solved captcha, while discovery and generation carry on. The operator is pointed at
+    one session at a time (its DevTools address, where the page can be viewed and clicked)
+    and at the next one as soon as it is done. The waiting list is also written to
+    `path` so it can be followed from another terminal when the agent runs as a daemon.
+    """
+
+    def __init__(self, path=Config.OPERATOR_QUEUE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.waiting = []
+        self.counter = 0
+        self.stats = {"solved": 0, "expired": 0}
+
+    @contextmanager
+    def session(self, url, debugger_url):
+        """Queue a session for the duration of the block; it counts as solved if the block exits cleanly."""
+        hand_off = self.hand_off(url, debugger_url)
+        solved = False
+        try:
+            yield hand_off
+            solved = True
+        finally:
+            self.finish(hand_off, solved)
+
+    def hand_off(self, url, debugger_url):
+        with self.lock:
+            self.counter += 1
+            hand_off = HandOff(self.counter, url, debugger_url)
+            self.waiting.append(hand_off)
+            position = len(self.waiting)
+            self._write()
+        if position == 1:
+            self._announce(hand_off)
+        else:
+            print(f"👤 reCAPTCHA #{hand_off.number} queued for the operator ({position - 1} ahead): {url}")
+        return hand_off
+
+    def finish(self, hand_off, solved):
+        with self.lock:
+            was_first = bool(self.waiting) and self.waiting[0] is hand_off
+            self.waiting.remove(hand_off)
+            self.stats["solved" if solved else "expired"] += 1
+            following = self.waiting[0] if was_first and self.waiting else None
+            self._write()
+        waited = time.time() - hand_off.queued_at
+        metrics.record_span("operator_captcha", waited, solved=solved)
+        print(f"👤 reCAPTCHA #{hand_off.number} {'solved' if solved else 'abandoned'} after {waited:.0f}s")
+        if following:
+            self._announce(following)
+
+    def _announce(self, hand_off):
+        more = len(self.waiting) - 1
+        print(f"👤 OPERATOR: solve reCAPTCHA #{hand_off.number} for {hand_off.url}\n"
+              f"   Open {hand_off.debugger_url or 'the browser window'} (DevTools, inspect the post page) and tick the captcha."
+              + (f" {more} more waiting." if more > 0 else ""))
+
+    def _write(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        entries = [{"number": h.number, "url": h.url, "debugger_url": h.debugger_url, "queued_at": h.queued_at}
+                   for h in self.waiting]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=4)
+        os.replace(tmp_path, self.path)
+
+    def summary(self):
+        """One-line human readable summary of the hand-offs so far."""
+        with self.lock:
+            return (f"Operator queue: {self.stats['solved']} captchas solved, {self.stats['expired']} abandoned, "
+                    f"{len(self.waiting)} waiting")
+
+
+operator_queue = OperatorQueue()  # Shared by every site, so one operator works through a single queue
@@ -0,0 +1,224 @@
+from collections import namedtuple
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlparse
+from config.config import Config # Import Config from config module
+
+PostPage = namedtuple("PostPage", "title content has_disqus_container has_disqus_button has_disqus_script")
+ListingPage = namedtuple("ListingPage", "post_links pagination_links")
+
+HIDDEN_TEXT_TAGS = ("script", "style", "template")  # Their text is not page text (BeautifulSoup's .text skips it too)
+
+
+def pagination_marker(config=Config):
+    """Path prefix of the blog's pagination pages, e.g. "/blog/page" for BLOG_BASE_URL ".../blog/"."""
+    return urlparse(config.BLOG_BASE_URL).path.rstrip('/') + '/page'
+
+
+def _classes(attrs):
+    return (dict(attrs).get("class") or "").split()
+
+
+class _ScopedText:
+    """Tracks whether the parser is inside one element (counting nested tags of the same name) and collects its text."""
+
+    def __init__(self):
+        self.tag = None
+        self.depth = 0
+        self.parts = []
+        self.done = False
+
+    @property
+    def active(self):
+        return self.depth > 0
+
+    def enter(self, tag):
+        self.tag = tag
+        self.depth = 1
+
+    def starttag(self, tag):
+        if self.active and tag == self.tag:
+            self.depth += 1
+
+    def endtag(self, tag):
+        if self.active and tag == self.tag:
+            self.depth -= 1
+            if self.depth == 0:
+                self.done = True
+
+    def text(self):
+        return "".join(self.parts).strip()
+
+
+class PostPageExtractor(HTMLParser):
+    """Single streaming pass over a post page that pulls the title, content and Disqus markers."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = _ScopedText()
+        self.content = _ScopedText()
+        self.has_disqus_container = False
+        self.has_disqus_button = False
+        self.has_disqus_script = False
+        self.in_script = False
+        self.script_parts = []
+        self.hidden_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        self.title.starttag(tag)
+        self.content.starttag(tag)
+        if tag in HIDDEN_TEXT_TAGS:
+            self.hidden_depth += 1
+        if tag == "h1" and not self.title.done and not self.title.active and "post-title" in _classes(attrs):
+            self.title.enter(tag)
+        elif tag == "div" and not self.content.done and not self.content.active and "post__content" in _classes(attrs):
+            self.content.enter(tag)
+        elif tag == "div" and dict(attrs).get("id") == "disqus_thread":
+            self.has_disqus_container = True
+        elif tag == "button" and dict(attrs).get("id") == "show-comments-button":
+            self.has_disqus_button = True
+        elif tag == "script":
+            self.in_script = True
+            self.script_parts = []
+
+    def handle_endtag(self, tag):
+        self.title.endtag(tag)
+        self.content.endtag(tag)
+        if tag in HIDDEN_TEXT_TAGS and self.hidden_depth:
+            self.hidden_depth -= 1
+        if tag == "script" and self.in_script:
+            self.in_script = False
+            if "disqus" in "".join(self.script_parts):
+                self.has_disqus_script = True
+
+    def handle_data(self, data):
+        if not self.hidden_depth:
+            if self.title.active:
+                self.title.parts.append(data)
+            if self.content.active:
+                self.content.parts.append(data)
+        if self.in_script:
+            self.script_parts.append(data)
+
+    def result(self):
+        return PostPage(self.title.text() or "Unknown Title", self.content.text(),
+                        self.has_disqus_container, self.has_disqus_button, self.has_disqus_script)
+
+
+class ListingPageExtractor(HTMLParser):
+    """Single streaming pass over a listing page that pulls post links and pagination links together."""
+
+    def __init__(self, pagination_marker='/blog/page'):
+        super().__init__(convert_charrefs=True)
+        self.pagination_marker = pagination_marker
+        self.article = _ScopedText()
+        self.article_title = _ScopedText()
+        self.pagination = _ScopedText()
+        self.title_href = None
+        self.first_href = None
+        self.post_hrefs = []
+        self.pagination_hrefs = []
+
+    def handle_starttag(self, tag, attrs):
+        for scope in (self.article, self.article_title, self.pagination):
+            scope.starttag(tag)
+        classes = _classes(attrs)
+        href = dict(attrs).get("href")
+
+        if not self.article.active and tag in ("article", "div") and "article" in classes:
+            self.article.enter(tag)
+            self.title_href = self.first_href = None
+        elif not self.pagination.active and tag == "div" and "pagination" in classes:
+            self.pagination.enter(tag)
+        elif self.article.active and not self.article_title.active and tag in ("h2", "h3") and "article__title" in classes:
+            self.article_title.enter(tag)
+        elif tag == "a" and href:
+            if self.article.active:
+                # Prefer the link inside the article title, fall back to the first link in the article
+                if self.article_title.active and self.title_href is None:
+                    self.title_href = href
+                if self.first_href is None:
+                    self.first_href = href
+            if self.pagination.active and self.pagination_marker in href:
+                self.pagination_hrefs.append(href)
+
+    def handle_endtag(self, tag):
+        was_in_article = self.article.active
+        for scope in (self.article, self.article_title, self.pagination):
+            scope.endtag(tag)
+        if was_in_article and not self.article.active:
+            href = self.title_href or self.first_href
+            if href:
+                self.post_hrefs.append((self.article.tag, href))
+
+    def result(self, page_url, site_url=None):
+        # Like the original crawler: <article class="article"> wins, <div class="article"> is the fallback
+        hrefs = [href for tag, href in self.post_hrefs if tag == "article"] or [href for _, href in self.post_hrefs]
+        site_url = site_url or Config.SITE_URL
+        post_links = [href if href.startswith('http') else urljoin(site_url, href) for href in hrefs]
+        pagination_links = [urljoin(page_url, href) for href in self.pagination_hrefs]
+        return ListingPage(post_links, pagination_links)
+
+
+def _soup(html, backend):
+    from bs4 import BeautifulSoup
+    try:
+        return BeautifulSoup(html, backend)
+    except Exception:  # bs4.FeatureNotFound when lxml isn't installed
+        return BeautifulSoup(html, 'html.parser')
+
+
+def _parse_post_soup(html, backend):
+    soup = _soup(html, backend)
+    title_elem = soup.find('h1', class_='post-title')
+    content_elem = soup.find('div', class_='post__content')
+    return PostPage(
+        title_elem.text.strip() if title_elem else "Unknown Title",
+        content_elem.text.strip() if content_elem else "",
+        bool(soup.find('div', id='disqus_thread')),
+        bool(soup.find('button', id='show-comments-button')),
+        any('disqus' in (script.string or '') for script in soup.find_all('script')))
+
+
+def _parse_listing_soup(html, page_url, config):
+    site_url = config.SITE_URL
+    marker = pagination_marker(config)
+    soup = _soup(html, config.HTML_PARSER_BACKEND)
+    post_links = []
+    for article in soup.find_all('article', class_='article') or soup.find_all('div', class_='article'):
+        title_elem = article.find(['h2', 'h3'], class_='article__title')
+        title_link = title_elem.find('a', href=True) if title_elem else None
+        title_link = title_link or article.find('a', href=True)
+        if title_link:
+            href = title_link['href']
+            post_links.append(href if href.startswith('http') else urljoin(site_url, href))
+
+    pagination_links = []
+    pagination = soup.find('div', class_='pagination')
+    if pagination:
+        pagination_links = [urljoin(page_url, a['href']) for a in pagination.find_all('a', href=True)
+                            if marker in a['href']]
+    return ListingPage(post_links, pagination_links)
+
+
+def parse_post(html, config=Config):
+    """Parse a post page once and return its PostPage fields, using the HTML_PARSER_BACKEND of `config`."""
+    if config.HTML_PARSER_BACKEND == "stream":
+        extractor = PostPageExtractor()
+        extractor.feed(html)
+        extractor.close()
+        return extractor.result()
+    return _parse_post_soup(html, config.HTML_PARSER_BACKEND)
+
+
+def parse_listing(html, page_url, config=Config):
+    """Parse a blog/tag listing page once and return its post links and pagination links.
+
+    `config` is the settings class of the site: relative post links are resolved against its
+    SITE_URL and pagination links are recognized under its BLOG_BASE_URL.
+    """
+    if config.HTML_PARSER_BACKEND == "stream":
+        extractor = ListingPageExtractor(pagination_marker(config))
+        extractor.feed(html)
+        extractor.close()
+        return extractor.result(page_url, config.SITE_URL)
+    return _parse_listing_soup(html, page_url, config)
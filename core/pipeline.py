@@ -0,0 +1,100 @@
+import queue
+import threading
+import traceback
+
+_END = object()  # Sentinel telling a stage its upstream is exhausted
+
+
+class Stage:
+    """One pipeline stage: `concurrency` worker threads applying `fn` to items from a bounded queue."""
+
+    def __init__(self, name, fn, concurrency=1, queue_size=1):
+        self.name = name
+        self.fn = fn
+        self.concurrency = max(1, concurrency)
+        self.inbox = queue.Queue(maxsize=max(1, queue_size))
+        self.remaining_workers = self.concurrency
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """Feeds a source iterator through a chain of stages so that every stage works concurrently.
+
+    A stage function returns the item to hand to the next stage, or None to drop it.
+    Calling `stop()` makes the source stop producing and the stages drain without doing more work.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.stages = []
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def add_stage(self, name, fn, concurrency=1, queue_size=1):
+        """Append a stage; returns the pipeline so calls can be chained."""
+        self.stages.append(Stage(name, fn, concurrency, queue_size))
+        return self
+
+    def stop(self):
+        """Ask the source and every stage to wind down."""
+        self.stop_event.set()
+
+    @property
+    def stopped(self):
+        return self.stop_event.is_set()
+
+    def _send_end(self, index):
+        """Tell the stage at `index` (if any) that nothing more is coming."""
+        if index < len(self.stages):
+            stage = self.stages[index]
+            for _ in range(stage.concurrency):
+                stage.inbox.put(_END)
+
+    def _produce(self):
+        try:
+            for item in self.source:
+                if self.stopped:
+                    break
+                self.stages[0].inbox.put(item)
+        except Exception:
+            print("❌ Pipeline source failed:")
+            traceback.print_exc()
+        finally:
+            close = getattr(self.source, "close", None)
+            if close:
+                close()  # Let generator sources release their resources early
+            self._send_end(0)
+
+    def _work(self, index):
+        stage = self.stages[index]
+        while True:
+            item = stage.inbox.get()
+            if item is _END:
+                with stage.lock:
+                    stage.remaining_workers -= 1
+                    last_worker = stage.remaining_workers == 0
+                if last_worker:
+                    self._send_end(index + 1)
+                return
+            if self.stopped:
+                continue  # Drain without working so upstream puts never block forever
+            try:
+                result = stage.fn(item)
+            except Exception:
+                print(f"❌ Pipeline stage '{stage.name}' failed:")
+                traceback.print_exc()
+                continue
+            if result is not None and index + 1 < len(self.stages):
+                self.stages[index + 1].inbox.put(result)
+
+    def run(self):
+        """Start every stage and block until all items have flowed through."""
+        self.threads = [threading.Thread(target=self._produce, name="pipeline-source", daemon=True)]
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.concurrency):
+                self.threads.append(threading.Thread(
+                    target=self._work, args=(index,), name=f"pipeline-{stage.name}-{n}", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        for thread in self.threads:
+            thread.join()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+from config.config import Config # Import Config from config module
+from core.dedup import simhash
+from core.memory_store import fingerprint
+from core.storage import connect_sqlite
+
+
+class BodyStore:
+    """Keeps post bodies out of the heap: zlib-compressed rows in a throwaway SQLite file, keyed by content hash.
+
+    The file is created on the first `put` and deleted on `close`.
+    """
+
+    def __init__(self, directory=Config.POST_BODY_SPILL_DIR):
+        self.directory = directory
+        self.path = None
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def _open(self):
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(prefix="post-bodies-", suffix=".sqlite3", dir=self.directory)
+        os.close(fd)
+        self.conn = connect_sqlite(self.path)
+        self.conn.execute("CREATE TABLE IF NOT EXISTS bodies (content_hash TEXT PRIMARY KEY, body BLOB NOT NULL, refs INTEGER NOT NULL)")
+
+    def put(self, content_hash, content):
+        with self.lock:
+            if self.conn is None:
+                self._open()
+            updated = self.conn.execute("UPDATE bodies SET refs = refs + 1 WHERE content_hash = ?", (content_hash,))
+            if updated.rowcount == 0:
+                self.conn.execute("INSERT INTO bodies (content_hash, body, refs) VALUES (?, ?, 1)",
+                                  (content_hash, zlib.compress(content.encode("utf-8"), 1)))
+
+    def get(self, content_hash):
+        """The body for `content_hash`, or None once it has been discarded."""
+        with self.lock:
+            if self.conn is None:
+                return None
+            row = self.conn.execute("SELECT body FROM bodies WHERE content_hash = ?", (content_hash,)).fetchone()
+        return zlib.decompress(row[0]).decode("utf-8") if row else None
+
+    def discard(self, content_hash):
+        """Drop one reference to a body, deleting it when no post needs it any more."""
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.execute("UPDATE bodies SET refs = refs - 1 WHERE content_hash = ?", (content_hash,))
+            self.conn.execute("DELETE FROM bodies WHERE content_hash = ? AND refs <= 0", (content_hash,))
+
+    def close(self):
+        with self.lock:
+            if self.conn is None:
+                return
+            self.conn.close()
+            self.conn = None
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(self.path + suffix)
+                except FileNotFoundError:
+                    pass
+
+
+@dataclass
+class PostRecord:
+    """A discovered post: a few short fields in memory, the body text read on demand from a BodyStore."""
+    __slots__ = ("url", "title", "slug", "content_hash", "simhash", "bodies")
+    url: str
+    title: str
+    slug: str
+    content_hash: str
+    simhash: Optional[int]  # Content SimHash for near-duplicate detection, None for very short posts
+    bodies: BodyStore
+
+    @classmethod
+    def create(cls, url, title, slug, content, bodies, config=Config):
+        """Fingerprint `content`, spill it to `bodies` and return the record (with a SimHash if the site's DEDUP_ENABLED)."""
+        content_hash = fingerprint(content)
+        bodies.put(content_hash, content)
+        return cls(url, title, slug, content_hash, simhash(content) if config.DEDUP_ENABLED else None, bodies)
+
+    @property
+    def content(self):
+        return self.bodies.get(self.content_hash) or ""
+
+    def release(self):
+        """Free the spilled body once the post no longer needs it."""
+        self.bodies.discard(self.content_hash)
@@ -0,0 +1,126 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from config.config import Config # Import Config from config module
+from core.agent import CommentAgent
+from core.browser_pool import BrowserPool
+from core.operator_queue import operator_queue
+from core.comment_generator import CommentGenerator
+from core.metrics import metrics, profile_run
+from core.scraper import WebScraper
+
+
+class SiteScheduler:
+    """Runs the agent for several sites in one process.
+
+    Every site gets its own CommentAgent (settings, memory namespace, pacing and post limit),
+    while the HTTP session, fetch workers, response cache, LLM client and browser pool are
+    shared. Per-host rate limits still apply, so sites on different hosts proceed in
+    parallel and sites sharing a host share its budget.
+    """
+
+    def __init__(self, sites, max_concurrent_sites=Config.MAX_CONCURRENT_SITES):
+        self.sites = sites
+        self.max_concurrent_sites = max(1, max_concurrent_sites)
+        self.scraper = WebScraper(max_workers=Config.SHARED_FETCH_WORKERS, hosts=len(sites))
+        for site in sites:
+            self.scraper.rate_limiter.set_host_limit(site.SITE_URL, site.REQUESTS_PER_SECOND_PER_HOST,
+                                                     site.REQUEST_BURST_PER_HOST)
+        self.comment_generator = CommentGenerator()
+        self.browser_pool = BrowserPool()
+        self.agents = {}  # site name -> CommentAgent, kept between daemon polls
+        self.lock = threading.Lock()
+        self.results = {}  # site name -> comments posted, or the exception that stopped the site
+
+    def agent_for(self, site):
+        """The CommentAgent of `site`, created on first use."""
+        with self.lock:
+            agent = self.agents.get(site.SITE_NAME)
+            if agent is None:
+                agent = CommentAgent(config=site, scraper=WebScraper(config=site, shared=self.scraper),
+                                     comment_generator=self.comment_generator, browser_pool=self.browser_pool)
+                self.agents[site.SITE_NAME] = agent
+            return agent
+
+    def _run_site(self, site):
+        print(f"\n=== Starting site '{site.SITE_NAME}' ({site.SITE_URL}) ===")
+        try:
+            result = self.agent_for(site).run_pipeline()
+            print(f"=== Site '{site.SITE_NAME}' finished: {result} new comments ===")
+        except Exception as e:
+            print(f"❌ Site '{site.SITE_NAME}' failed: {e}")
+            metrics.incr("site_failures", site=site.SITE_NAME)
+            result = e
+        with self.lock:
+            self.results[site.SITE_NAME] = result
+
+    def run_once(self):
+        """Run every site once, up to `max_concurrent_sites` at a time. Returns {site name: comments posted or error}."""
+        self.results = {}
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_sites, thread_name_prefix="site") as executor:
+            list(executor.map(self._run_site, self.sites))
+        return self.results
+
+    def close(self):
+        """Close every site's memory, the shared browser pool, fetch workers and spilled post bodies."""
+        for agent in self.agents.values():
+            agent.close()
+        self.agents = {}
+        self.browser_pool.close()
+        print(self.browser_pool.summary())
+        print(operator_queue.summary())
+        if self.comment_generator.cache:
+            print(self.comment_generator.cache.summary())
+        self.scraper.close()
+
+    def report(self):
+        for site in self.sites:
+            result = self.results.get(site.SITE_NAME)
+            outcome = f"failed ({result})" if isinstance(result, Exception) else f"{result} new comments"
+            print(f"  {site.SITE_NAME}: {outcome}")
+
+    def run_agent(self):
+        """Run every site once and shut down (the multi-site counterpart of CommentAgent.run_agent)."""
+        print(f"Starting Blog Commenting Agent for {len(self.sites)} sites...")
+        with profile_run():
+            self.run_once()
+        self.close()
+        if Config.DEBUG:
+            print(f"\nRun metrics:\n{metrics.summary()}")
+        metrics.export()
+
+        print("\nBlog Commenting Agent run finished.")
+        self.report()
+        return self.results
+
+    def watch(self, interval=Config.DAEMON_POLL_INTERVAL):
+        """Daemon mode for all sites: poll every `interval` seconds, keeping shared clients and agents warm."""
+        print(f"Starting Blog Commenting Agent for {len(self.sites)} sites in daemon mode (polling every {interval}s)...")
+        polls = 0
+        try:
+            while True:
+                started = time.monotonic()
+                self.run_once()
+                polls += 1
+                metrics.export()
+                print(f"\nPoll {polls} done:")
+                self.report()
+                wait = max(0, interval - (time.monotonic() - started)) + random.uniform(0, interval * 0.05)
+                print(f"Next poll in {wait:.0f}s.")
+                time.sleep(wait)
+        except KeyboardInterrupt:
+            print("\nStopping daemon...")
+        finally:
+            self.close()
+            metrics.export()
+
+    def discover(self, limit=None):
+        """Discovery only, site by site: list the posts the next run would comment on."""
+        found = {}
+        for site in self.sites:
+            print(f"\n=== {site.SITE_NAME} ({site.SITE_URL}) ===")
+            found[site.SITE_NAME] = self.agent_for(site).discover(limit)
+        self.agents = {}  # discover() already closed each agent's memory
+        self.scraper.close()
+        return found
@@ -1,200 +1,349 @@
 import requests
-import time
-import random
-from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
+import threading
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
 from config.config import Config # Import Config from config module
+from core.dedup import canonicalize_url
+from core.disqus_precheck import DisqusPrecheck
+from core.fetcher import ConcurrentFetcher, HostRateLimiter
+from core.http_cache import ResponseCache
+from core.post_record import BodyStore, PostRecord
+from core.parser import ListingPage, parse_listing, parse_post
+from core.feeds import SitemapRef, iter_feed, iter_sitemap, xml_encoding
+from core.metrics import metrics
+from core.transport import Transport
+
 
 class WebScraper:
     """Web scraper class to discover blog posts."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({"User-Agent": Config.USER_AGENT})
+    def __init__(self, max_workers=None, config=Config, shared=None, hosts=1):
+        """`config` is the (per-site) settings class. `shared` is another WebScraper whose
+        transport, rate limiter, fetch workers and response cache this one reuses. `hosts` sizes the
+        connection pool when the session will serve several sites."""
+        self.config = config
+        self.precheck = DisqusPrecheck(self, config) if config.DISQUS_PRECHECK_ENABLED else None
+        if shared is not None:
+            self.transport = shared.transport
+            self.session = shared.session
+            self.rate_limiter = shared.rate_limiter
+            self.fetcher = shared.fetcher
+            self.cache = shared.cache
+            self.bodies = shared.bodies
+            self.owns_cache = False  # Closed by the scraper that opened it
+            return
+        max_workers = max_workers or config.FETCH_WORKERS
+        # One pooled keep-alive connection per worker, so concurrent fetches don't queue on the adapter
+        self.rate_limiter = HostRateLimiter(config.REQUESTS_PER_SECOND_PER_HOST, config.REQUEST_BURST_PER_HOST)
+        self.transport = Transport(max_workers, hosts, config, self.rate_limiter)  # Every attempt waits for the host's bucket
+        self.session = self.transport.session
+        self.fetcher = ConcurrentFetcher(max_workers=max_workers)
+        self.cache = ResponseCache() if config.HTTP_CACHE_ENABLED else None
+        self.owns_cache = True
+        self.bodies = BodyStore()
+
+    def close(self):
+        """Stop the fetch workers, close pooled connections and the response cache, and delete the spilled post bodies."""
+        self.fetcher.shutdown()
+        self.transport.close()
+        if self.cache and self.owns_cache:
+            self.cache.close()
+        self.bodies.close()
 
     def test_connection(self):
-        """Test if we can access the website"""
+        """Test if we can access the website (a HEAD request, so the home page isn't downloaded)"""
         try:
-            print(f"Testing connection to {Config.SITE_URL}...")
-            response = self.session.get(Config.SITE_URL)
+            print(f"Testing connection to {self.config.SITE_URL}...")
+            response = self.transport.check(self.config.SITE_URL, headers=self.request_headers())
             if response.status_code == 200:
-                print(f"✅ Successfully connected to {Config.SITE_URL}")
+                print(f"✅ Successfully connected to {self.config.SITE_URL}")
                 return True
             else:
-                print(f"❌ Failed to connect to {Config.SITE_URL}: {response.status_code}")
+                print(f"❌ Failed to connect to {self.config.SITE_URL}: {response.status_code}")
                 return False
         except Exception as e:
-            print(f"❌ Exception when connecting to {Config.SITE_URL}: {e}")
+            print(f"❌ Exception when connecting to {self.config.SITE_URL}: {e}")
             return False
 
+    def request_headers(self):
+        """Per-request headers; the User-Agent is set here because the session may be shared between sites"""
+        return {"User-Agent": self.config.USER_AGENT}
+
     def get_page(self, url):
-        """Get page content with proper rate limiting"""
-        time.sleep(Config.DELAY_BETWEEN_REQUESTS + random.uniform(0.5, 1.5))  # Random delay
+        """Get page content, serving it from the response cache or revalidating it when possible"""
+        with metrics.span("get_page", url=url) as span:
+            return self._get_page(url, span)
+
+    def _get_page(self, url, span):
+        cached = self.cache.get(url) if self.cache else None
+        if cached and cached.is_fresh(self.cache.ttl):
+            self.cache.record("hits")
+            if self.config.DEBUG:
+                print(f"Cache hit: {url}")
+            return cached.body
+
         try:
-            response = self.session.get(url)
+            headers = self.request_headers()
+            if cached:
+                headers.update(cached.conditional_headers())
+            response = self.transport.get(url, headers=headers)
+            span["status"] = response.status_code
+            metrics.incr("http_requests", status=response.status_code)
+            if cached and response.status_code == 304:
+                self.cache.mark_revalidated(url, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+                self.cache.record("revalidated")
+                if self.config.DEBUG:
+                    print(f"Not modified: {url}")
+                return cached.body
+
             response.raise_for_status()
-            if Config.DEBUG:
-                print(f"Retrieved page: {url} ({len(response.text)} bytes)")
-            return response.text
+            body = self.response_text(response)
+            if self.config.DEBUG:
+                print(f"Retrieved page: {url} ({len(body)} bytes)")
+            if self.cache:
+                self.cache.record("refreshed" if cached else "misses")
+                self.cache.store(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            return body
         except requests.RequestException as e:
             print(f"Error fetching {url}: {e}")
+            metrics.incr("http_failures")
             return None
 
-    def extract_post_links_from_page(self, html, page_url):
-        """Extract blog post links from an HTML page"""
-        if not html:
-            return []
-
-        post_links = []
-        soup = BeautifulSoup(html, 'html.parser')
-
-        # Check for articles in the current page
-        # This handles the structure in both blog page and tag pages
-        articles = soup.find_all('article', class_='article') or soup.find_all('div', class_='article')
-
-        if Config.DEBUG:
-            print(f"Found {len(articles)} article elements on the page {page_url}")
-
-        for article in articles:
-            # Try to find the title link using various possible structures
-            title_link = None
-
-            # Structure 1: Find h2 with article__title class that contains an anchor
-            title_elem = article.find(['h2', 'h3'], class_='article__title')
-            if title_elem:
-                title_link = title_elem.find('a', href=True)
-
-            # Structure 2: Alternative direct approach
-            if not title_link:
-                title_link = article.find('a', href=True)
+    def response_text(self, response):
+        """Decoded body. XML served without a charset is decoded by its BOM/declaration, not by requests' guess"""
+        content_type = response.headers.get("Content-Type", "").lower()
+        if "xml" in content_type and "charset" not in content_type:
+            response.encoding = xml_encoding(response.content)
+        return response.text
 
-            if title_link and 'href' in title_link.attrs:
-                # Ensure it's an absolute URL
-                post_url = title_link['href']
-                if not post_url.startswith('http'):
-                    post_url = urljoin(Config.SITE_URL, post_url)
-
-                post_links.append(post_url)
-                if Config.DEBUG:
-                    print(f"Found post link: {post_url}")
-
-        return post_links
-
-    def get_pagination_links(self, html, base_url):
-        """Extract pagination links from the blog index page"""
+    def parse_listing_page(self, html, page_url):
+        """Parse a blog/tag listing page once, returning its post links and pagination links"""
         if not html:
-            return []
-
-        soup = BeautifulSoup(html, 'html.parser')
-        page_links = []
-
-        # Look for pagination div
-        pagination = soup.find('div', class_='pagination')
-        if pagination:
-            # Find all links that match the page pattern
-            for a_tag in pagination.find_all('a', href=True):
-                href = a_tag['href']
-                if '/blog/page' in href:
-                    full_url = urljoin(base_url, href)
-                    page_links.append(full_url)
-                    if Config.DEBUG:
-                        print(f"Found pagination link: {full_url}")
-
-        return page_links
-
-    def get_blog_posts(self, comment_agent): # Pass comment_agent instance here
-        """Discover blog posts by crawling the site, checking memory."""
-        if not self.test_connection():
-            return []
+            return ListingPage([], [])
+
+        with metrics.span("parse_listing"):
+            listing = parse_listing(html, page_url, self.config)
+        if self.config.DEBUG:
+            print(f"Found {len(listing.post_links)} post links on the page {page_url}")
+            for post_url in listing.post_links:
+                print(f"Found post link: {post_url}")
+            for page_link in listing.pagination_links:
+                print(f"Found pagination link: {page_link}")
+        return listing
 
-        posts = []
-        all_post_links = set()  # Use a set to avoid duplicates
+    def extract_post_links_from_page(self, html, page_url):
+        """Extract blog post links from an HTML page"""
+        return self.parse_listing_page(html, page_url).post_links
+
+    def fetch_post(self, full_url, comment_agent=None, lastmod=None, abandoned=None):
+        """Fetch a single post page and return a PostRecord, or None if it can't receive comments.
+
+        Posts that can't receive comments are recorded with their `lastmod` so they are
+        only fetched again once the sitemap/feed reports a change. Posts whose Disqus thread
+        is closed or already has our comment are recorded in memory under that outcome.
+        Once the `abandoned` event is set (discovery stopped while this prefetch was running)
+        nothing is recorded and None is returned.
+        """
+        post_html = self.get_page(full_url)
+        if not post_html or (abandoned and abandoned.is_set()):
+            return None
 
-        # Start with the blog index page
-        print(f"Starting blog post discovery at {Config.BLOG_BASE_URL}")
-        html = self.get_page(Config.BLOG_BASE_URL)
+        # Title, content and Disqus markers all come out of a single parse
+        with metrics.span("parse_post"):
+            page = parse_post(post_html, self.config)
+
+        # Check if post has Disqus capability (container, load-comments button or embed script)
+        has_disqus = page.has_disqus_container or page.has_disqus_button or page.has_disqus_script
+
+        if has_disqus and page.content:
+            # Extract post slug for Disqus from URL
+            parsed_url = urlparse(full_url)
+            post_slug = parsed_url.path.split('/')[-1]
+            if post_slug.endswith('.html'):
+                post_slug = post_slug[:-5]  # Remove .html if present
+
+            # Keep only short fields in memory; the body waits on disk until the comment is generated
+            post = PostRecord.create(full_url, page.title, post_slug, page.content, self.bodies, self.config)
+            state = self.precheck.check(post) if self.precheck else None
+            if abandoned and abandoned.is_set():
+                post.release()
+                return None
+            if state and state.skip:
+                print(f"Skipping post '{page.title}': {state.detail}")
+                if comment_agent:
+                    comment_agent.record_post(post, outcome=state.status)
+                post.release()
+                return None
+            return post
+
+        if self.config.DEBUG:
+            reason = "missing content" if not page.content else "no Disqus components found"
+            print(f"Skipping post '{page.title}': {reason}")
+            print(f"  - Disqus container: {page.has_disqus_container}")
+            print(f"  - Disqus button: {page.has_disqus_button}")
+            print(f"  - Disqus script: {page.has_disqus_script}")
+        if comment_agent and not (abandoned and abandoned.is_set()):
+            comment_agent.mark_post_as_skipped(full_url, lastmod)
+        return None
+
+    def is_blog_post_url(self, url):
+        """True for post URLs under BLOG_BASE_URL (not the index itself or its pagination pages)."""
+        if not url.startswith(self.config.BLOG_BASE_URL):
+            return False
+        path = url[len(self.config.BLOG_BASE_URL):].strip('/')
+        return bool(path) and not path.startswith('page/')
+
+    def discover_from_sitemap(self, sitemap_url=None, depth=0):
+        """Collect {post_url: lastmod} from a sitemap, following sitemap indexes. None if there is no usable sitemap."""
+        sitemap_url = sitemap_url or self.config.SITEMAP_URL
+        xml = self.get_page(sitemap_url)
+        if not xml:
+            return None
+        entries = {}
+        try:
+            for item in iter_sitemap(xml):
+                if isinstance(item, SitemapRef):
+                    if depth < 2:  # Sitemap indexes don't nest deeper than this in practice
+                        entries.update(self.discover_from_sitemap(item.url, depth + 1) or {})
+                elif self.is_blog_post_url(item.url):
+                    entries[item.url] = item.lastmod
+        except ET.ParseError as e:
+            print(f"Could not parse sitemap {sitemap_url}: {e}")
+            return None
+        return entries
+
+    def discover_from_feeds(self):
+        """Collect {post_url: lastmod} from the first RSS/Atom feed that exists. None if there is no feed."""
+        for feed_url in self.config.FEED_URLS:
+            xml = self.get_page(feed_url)
+            if not xml:
+                continue
+            try:
+                return {entry.url: entry.lastmod for entry in iter_feed(xml) if self.is_blog_post_url(entry.url)}
+            except ET.ParseError as e:
+                print(f"Could not parse feed {feed_url}: {e}")
+        return None
+
+    def iter_html_post_links(self):
+        """Lazily yield post links from the blog index, then each pagination page in order, then /tags/.
+
+        Listing pages are only fetched when the consumer asks for more links than the pages
+        already read contained.
+        """
+        html = self.get_page(self.config.BLOG_BASE_URL)
         if not html:
             print("Could not retrieve the blog index page. Check URL and connection.")
-            return posts
-
-        # Get post links from the main blog page
-        blog_post_links = self.extract_post_links_from_page(html, Config.BLOG_BASE_URL)
-        for link in blog_post_links:
-            all_post_links.add(link)
-
-        # Get pagination links and process them
-        pagination_links = self.get_pagination_links(html, Config.BLOG_BASE_URL)
-        for page_link in pagination_links[:3]:  # Limit to first 3 pages
-            page_html = self.get_page(page_link)
-            page_post_links = self.extract_post_links_from_page(page_html, page_link)
-            for link in page_post_links:
-                all_post_links.add(link)
-
-        # Also check tags page for additional posts
-        tags_url = f"{Config.SITE_URL}/tags/"
-        tags_html = self.get_page(tags_url)
-        tags_post_links = self.extract_post_links_from_page(tags_html, tags_url)
-        for link in tags_post_links:
-            all_post_links.add(link)
-
-        # Limit the number of posts to process
-        all_post_links = list(all_post_links)[:Config.MAX_POSTS_TO_PROCESS]
-
-        print(f"Discovered {len(all_post_links)} unique blog post links (before memory check)") # Updated log
-
-        # Process each post link to check for Disqus capability and memory
-        for full_url in list(all_post_links): # Iterate over a *copy* to allow removal
-            if comment_agent.is_already_commented(full_url): # Check memory *first*
-                print(f"Skipping already commented post (from memory): {full_url}")
-                all_post_links.remove(full_url) # Remove from set if already commented
-                continue # Skip to next post
-
-            post_html = self.get_page(full_url)
-
-            if post_html:
-                post_soup = BeautifulSoup(post_html, 'html.parser')
-
-                # Extract post information
-                title_elem = post_soup.find('h1', class_='post-title')
-                title = title_elem.text.strip() if title_elem else "Unknown Title"
-
-                # Get the post content
-                content_elem = post_soup.find('div', class_='post__content')
-                content = content_elem.text.strip() if content_elem else ""
-
-                # Check if this post has Disqus capability (even if not loaded)
-                # Look for either the disqus thread container or the button to load comments
-                has_disqus_container = bool(post_soup.find('div', id='disqus_thread'))
-                has_disqus_button = bool(post_soup.find('button', id='show-comments-button'))
-                has_disqus_script = bool(post_soup.find(lambda tag: tag.name == 'script' and
-                                                          tag.string and
-                                                          'disqus' in tag.string))
-
-                # Check if post has Disqus capability (any of the above)
-                has_disqus = has_disqus_container or has_disqus_button or has_disqus_script
-
-                if has_disqus and content:
-                    # Extract post slug for Disqus from URL
-                    parsed_url = urlparse(full_url)
-                    post_slug = parsed_url.path.split('/')[-1]
-                    if post_slug.endswith('.html'):
-                        post_slug = post_slug[:-5]  # Remove .html if present
-
-                    post = {
-                        'url': full_url,
-                        'title': title,
-                        'content': content,
-                        'slug': post_slug
-                    }
-                    posts.append(post)
-                    print(f"Found commentable post: {title}")
-                else:
-                    if Config.DEBUG:
-                        reason = "missing content" if not content else "no Disqus components found"
-                        print(f"Skipping post '{title}': {reason}")
-                        print(f"  - Disqus container: {has_disqus_container}")
-                        print(f"  - Disqus button: {has_disqus_button}")
-                        print(f"  - Disqus script: {has_disqus_script}")
-
-        print(f"Found {len(posts)} blog posts that can receive new comments (after memory check)") # Updated log
-        return posts
\ No newline at end of file
+            return
+
+        # Get post links and pagination links from the main blog page in one parse
+        index = self.parse_listing_page(html, self.config.BLOG_BASE_URL)
+        yield from index.post_links
+
+        # Blog listing pages are newest first, so walk pagination in page order
+        queued = list(dict.fromkeys(index.pagination_links))
+        seen_pages = set(queued)
+        while queued:
+            page_url = queued.pop(0)
+            listing = self.parse_listing_page(self.get_page(page_url), page_url)
+            yield from listing.post_links
+            for link in listing.pagination_links:
+                if link not in seen_pages:
+                    seen_pages.add(link)
+                    queued.append(link)
+
+        # The tags page is not date ordered, so it only contributes posts the listing pages missed
+        tags_url = f"{self.config.SITE_URL}/tags/"
+        yield from self.extract_post_links_from_page(self.get_page(tags_url), tags_url)
+
+    def iter_candidate_links(self):
+        """Yield unique (post_url, lastmod) pairs newest first, using DISCOVERY_MODE and falling back to the HTML crawl."""
+        mode = self.config.DISCOVERY_MODE
+        entries = None
+        if mode in ("auto", "sitemap"):
+            entries = self.discover_from_sitemap()
+            if entries and mode == "auto" and all(lastmod is None for lastmod in entries.values()):
+                # Sitemap order says nothing about age, so the feed or the newest-first listing pages are a better guide
+                print("Sitemap has no lastmod dates, trying the feed and the blog listing pages instead")
+                entries = None
+            elif entries:
+                print(f"Discovered {len(entries)} posts from sitemap {self.config.SITEMAP_URL}")
+        if not entries and mode in ("auto", "feed"):
+            entries = self.discover_from_feeds()
+            if entries:
+                print(f"Discovered {len(entries)} posts from feed")
+
+        if entries:
+            # Newest first; undated entries last in document order (sorted() is stable, and feeds list newest first)
+            yield from sorted(entries.items(), key=lambda entry: (entry[1] is None, -(entry[1] or 0)))
+            return
+
+        if mode != "html":
+            print("No usable sitemap or feed found, falling back to crawling the blog listing pages")
+        seen = set()
+        for link in self.iter_html_post_links():
+            if link not in seen:
+                seen.add(link)
+                yield link, None
+
+    def iter_blog_posts(self, comment_agent, limit=None): # Pass comment_agent instance here
+        """Lazily discover up to `limit` commentable posts, newest first.
+
+        Memory is checked before any post page is fetched, post pages are prefetched a few at
+        a time in discovery order, and no further listing or post pages are requested once
+        `limit` commentable posts have been found.
+        """
+        if not self.test_connection():
+            return
+        limit = limit or self.config.MAX_POSTS_TO_PROCESS
+
+        print(f"Starting blog post discovery at {self.config.SITE_URL} (mode: {self.config.DISCOVERY_MODE})")
+        checked = found = 0
+
+        def new_links():
+            nonlocal checked
+            seen_posts = set()  # Canonical URLs, so .html / trailing slash / tracking variants are fetched once
+            for full_url, lastmod in self.iter_candidate_links():
+                checked += 1
+                canonical = canonicalize_url(full_url)
+                if canonical in seen_posts:
+                    continue
+                seen_posts.add(canonical)
+                if comment_agent.is_already_commented(full_url):
+                    print(f"Skipping already commented post (from memory): {full_url}")
+                    continue
+                if comment_agent.is_queued(full_url):
+                    if self.config.DEBUG:
+                        print(f"Skipping post handled by the retry queue: {full_url}")
+                    continue
+                if comment_agent.is_unchanged_since_skipped(full_url, lastmod):
+                    if self.config.DEBUG:
+                        print(f"Skipping unchanged post that could not be commented on before: {full_url}")
+                    continue
+                yield full_url, lastmod
+
+        abandoned = threading.Event()  # Set when discovery stops, so prefetches still running record nothing
+        fetch = lambda entry: self.fetch_post(entry[0], comment_agent, entry[1], abandoned)
+        discard = lambda entry, post: post and post.release()  # Prefetched posts nobody will consume
+        # Don't prefetch more post pages than could still be needed, nor take more than this site's share of shared workers
+        window = max(1, min(self.config.FETCH_WORKERS, self.fetcher.max_workers, limit))
+        fetched = self.fetcher.imap_ordered(fetch, new_links(), window=window, discard=discard)
+        try:
+            for _, post in fetched:
+                if post:
+                    duplicate_of = comment_agent.find_duplicate(post)
+                    if duplicate_of:
+                        print(f"Skipping near-duplicate of {duplicate_of}: {post.url}")
+                        comment_agent.record_post(post, outcome="duplicate")
+                        post.release()
+                        continue
+                    found += 1
+                    print(f"Found commentable post: {post.title}")
+                    yield post
+                    if found >= limit:
+                        break
+        finally:
+            abandoned.set()
+            fetched.close()  # Cancel prefetches nobody will consume, also when the consumer closes us early
+            print(f"Found {found} blog posts that can receive new comments after checking {checked} links") # Updated log
+            if self.cache:
+                print(self.cache.summary())
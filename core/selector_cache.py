@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+
+
+class SelectorCache:
+    """Remembers, per posting step, which selector of a fallback chain found the element last time.
+
+    Later posts try that selector first and only walk the rest of the chain when it misses.
+    Selectors are (by, value) pairs of WebDriver locator strings, so the cache is plain JSON
+    (saved to `path` when it changes; `path=None` keeps it in memory). Per-step stats count hits
+    (found by the remembered selector), misses (found further down the chain) and probes
+    (find calls, i.e. WebDriver round-trips).
+    """
+
+    def __init__(self, path=Config.SELECTOR_CACHE_FILE):
+        self.path = path
+        self.lock = threading.Lock()
+        self.winners, self.stats = self._load()
+        self.dirty = False
+
+    def _load(self):
+        if not self.path:
+            return {}, {}
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}, {}
+        except json.JSONDecodeError:
+            print("Warning: Selector cache is corrupted. Starting with an empty cache.")
+            return {}, {}
+        winners = {step: tuple(selector) for step, selector in data.get("selectors", {}).items()}
+        return winners, data.get("stats", {})
+
+    def save(self):
+        """Write the cache if it changed, swapping in a temporary file like the JSON memory store."""
+        with self.lock:
+            if not self.path or not self.dirty:
+                return
+            data = {"selectors": {step: list(selector) for step, selector in self.winners.items()}, "stats": self.stats}
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=4)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+    def ordered(self, step, selectors):
+        """`selectors` with the one that won last time moved to the front."""
+        winner = self.winners.get(step)
+        if winner not in selectors:
+            return list(selectors)
+        return [winner] + [selector for selector in selectors if selector != winner]
+
+    def resolve(self, step, selectors, probe):
+        """Return the first truthy `probe(selector)`, trying the remembered selector first. None if nothing matches."""
+        probes = 0
+        result = found_by = None
+        for selector in self.ordered(step, selectors):
+            probes += 1
+            result = probe(selector)
+            if result:
+                found_by = selector
+                break
+        self._record(step, found_by, probes)
+        return result or None
+
+    def _record(self, step, found_by, probes):
+        with self.lock:
+            stats = self.stats.setdefault(step, {"hits": 0, "misses": 0, "probes": 0})
+            stats["probes"] += probes
+            self.dirty = True
+            if found_by is None:
+                return
+            outcome = "hits" if found_by == self.winners.get(step) else "misses"
+            stats[outcome] += 1
+            self.winners[step] = found_by
+        metrics.incr("selector_cache", step=step, outcome=outcome)
+
+    def summary(self):
+        with self.lock:
+            parts = [f"{step} {s['hits']} hits/{s['misses']} misses/{s['probes']} probes"
+                     for step, s in sorted(self.stats.items())]
+        return "Selector cache: " + ("; ".join(parts) or "empty")
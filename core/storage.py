@@ -0,0 +1,12 @@
+import os
+import sqlite3
+
+def connect_sqlite(path):
+    """Open a SQLite database shared across threads, with WAL journaling for crash-safe writes."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)  # Autocommit; use explicit transactions
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
@@ -0,0 +1,132 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING  # gzip/deflate, plus br/zstd when brotli/zstandard are installed
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER = 60  # Seconds; a longer Retry-After gives up on the request instead of stalling a worker
+
+
+class ResponseTooLarge(requests.RequestException):
+    """The response body exceeded HTTP_MAX_BODY_BYTES and was abandoned."""
+
+
+def retry_after_seconds(response):
+    """Seconds asked for by a Retry-After header (delta or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+class Transport:
+    """Pooled HTTP client under WebScraper: timeouts, retries, compression, a body size cap and per-request timing.
+
+    `pool_size` is the number of keep-alive connections kept per host (one per concurrent
+    worker); `hosts` is how many hosts get their own connection pool. Every attempt, retries
+    included, first takes a token from `rate_limiter`, so a burst of 429/5xx retries still
+    respects the per-host politeness limit.
+    """
+
+    def __init__(self, pool_size=Config.FETCH_WORKERS, hosts=1, config=Config, rate_limiter=None):
+        self.timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+        self.max_body = config.HTTP_MAX_BODY_BYTES
+        self.max_retries = config.HTTP_MAX_RETRIES
+        self.backoff = config.HTTP_RETRY_BACKOFF
+        self.rate_limiter = rate_limiter
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": config.USER_AGENT, "Accept-Encoding": ACCEPT_ENCODING})
+        # urllib3 must not retry on its own: its retries would bypass the rate limiter
+        adapter = HTTPAdapter(pool_connections=max(hosts, pool_size), pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _record(self, method, url, started, status, size=0):
+        elapsed = time.perf_counter() - started
+        host = urlparse(url).netloc
+        metrics.record_span("http_request", elapsed, method=method, host=host, status=status, bytes=size)
+        metrics.incr("http_bytes", size, host=host)
+
+    def _send(self, method, url, **kwargs):
+        """Send one request, retrying connection errors, timeouts, 429 and 5xx with backoff (Retry-After first)."""
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt == self.max_retries:
+                    raise
+                reason, delay = type(e).__name__, None
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                    return response
+                reason, delay = response.status_code, retry_after_seconds(response)
+                if delay is not None and delay > MAX_RETRY_AFTER:
+                    return response  # Let the caller see the 429/503 rather than sleeping for minutes
+                response.close()
+            if delay is None:
+                delay = self.backoff * (2 ** attempt) * random.uniform(0.8, 1.2)
+            metrics.incr("http_retries", host=urlparse(url).netloc, reason=reason)
+            time.sleep(delay)
+
+    def get(self, url, headers=None, timeout=None):
+        """GET `url`, reading the (decompressed) body in chunks and giving up past `max_body` bytes."""
+        started = time.perf_counter()
+        status = "error"
+        size = 0
+        try:
+            response = self._send("GET", url, headers=headers, timeout=timeout or self.timeout, stream=True)
+            status = response.status_code
+            with response:
+                declared = response.headers.get("Content-Length")
+                if declared and declared.isdigit() and int(declared) > self.max_body and "Content-Encoding" not in response.headers:
+                    raise ResponseTooLarge(f"{url} declares {declared} bytes (limit {self.max_body})")
+                chunks = []
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    size += len(chunk)
+                    if size > self.max_body:
+                        raise ResponseTooLarge(f"{url} is larger than {self.max_body} bytes")
+                    chunks.append(chunk)
+                response._content = b"".join(chunks)  # Lets .text/.content work on the streamed response
+            return response
+        except ResponseTooLarge:
+            status = "too_large"
+            raise
+        finally:
+            self._record("GET", url, started, status, size)
+
+    def head(self, url, headers=None, timeout=None):
+        """HEAD `url` (following redirects) without downloading a body."""
+        started = time.perf_counter()
+        status = "error"
+        try:
+            response = self._send("HEAD", url, headers=headers, timeout=timeout or self.timeout, allow_redirects=True)
+            status = response.status_code
+            return response
+        finally:
+            self._record("HEAD", url, started, status)
+
+    def check(self, url, headers=None):
+        """Cheap reachability check: HEAD, or a GET whose body is never read if the server refuses HEAD."""
+        response = self.head(url, headers=headers)
+        if response.status_code in (405, 501):
+            started = time.perf_counter()
+            with self._send("GET", url, headers=headers, timeout=self.timeout, stream=True) as response:
+                self._record("GET", url, started, response.status_code)
+        return response
+
+    def close(self):
+        self.session.close()
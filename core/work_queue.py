@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+import zlib
+from collections import namedtuple
+from config.config import Config # Import Config from config module
+from core.metrics import metrics
+from core.storage import connect_sqlite
+
+# A queued post with its body, enough to rebuild a PostRecord without fetching the page again
+QueuedPost = namedtuple("QueuedPost", "url title slug content status attempts")
+
+ACTIVE_STATUSES = ("pending", "generated", "failed")
+
+
+class InfrastructureFailure(Exception):
+    """The agent's own machinery failed (e.g. Chrome didn't start, nobody solved the reCAPTCHA), not the post.
+
+    Such failures are retried with backoff like any other, but don't use up one of the post's attempts.
+    """
+
+
+class WorkQueue:
+    """Durable per-site queue of posts that entered the pipeline, so failed ones are retried without re-crawling.
+
+    A post is "pending" until its comment is generated, "generated" until it is posted and
+    "done" once posted. Each failure moves it to "failed" with the reason and pushes its next
+    attempt back exponentially; after `max_attempts` failures it is "dead" and only retried
+    again after `revive()` (`python main.py revive`).
+    """
+
+    def __init__(self, path=Config.MEMORY_DB_FILE, max_attempts=Config.WORK_QUEUE_MAX_ATTEMPTS,
+                 base_delay=Config.WORK_QUEUE_RETRY_BASE_DELAY, max_delay=Config.WORK_QUEUE_RETRY_MAX_DELAY):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.conn = connect_sqlite(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS work_queue (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                slug TEXT,
+                content BLOB,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                reason TEXT,
+                next_eligible_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )""")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS work_queue_eligible ON work_queue (status, next_eligible_at)")
+        # Kept in memory so discovery can skip queued posts without touching disk
+        self.known_urls = {row[0] for row in self.conn.execute("SELECT url FROM work_queue WHERE status != 'done'")}
+
+    def __contains__(self, url):
+        return url in self.known_urls
+
+    def add(self, post):
+        """Queue a post as "pending". A post that is already queued keeps its status and attempts."""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO work_queue (url, title, slug, content, status, next_eligible_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 'pending', ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET title = excluded.title, slug = excluded.slug, "
+                "content = excluded.content, updated_at = excluded.updated_at",
+                (post.url, post.title, post.slug, zlib.compress(post.content.encode("utf-8"), 1), now, now))
+            self.known_urls.add(post.url)
+
+    def _set_status(self, url, status, clear_content=False):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE work_queue SET status = ?, reason = NULL, updated_at = ?"
+                + (", content = NULL" if clear_content else "") + " WHERE url = ?",
+                (status, time.time(), url))
+            if status == "done":
+                self.known_urls.discard(url)
+        metrics.incr("work_queue", status=status)
+
+    def mark_generated(self, url):
+        self._set_status(url, "generated")
+
+    def mark_done(self, url):
+        """The comment is posted; the stored body is no longer needed."""
+        self._set_status(url, "done", clear_content=True)
+
+    def retry_delay(self, attempts):
+        """Exponential backoff with jitter: base_delay, 2x, 4x, ... capped at max_delay."""
+        return min(self.max_delay, self.base_delay * 2 ** (attempts - 1)) * random.uniform(0.8, 1.2)
+
+    def fail(self, url, reason, count_attempt=True):
+        """Record a failed attempt. Returns the new status: "failed", or "dead" once attempts run out.
+
+        With `count_attempt=False` (an InfrastructureFailure) the post is retried after the usual
+        backoff but keeps its attempt count, so an outage can't dead-letter it.
+        """
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT attempts FROM work_queue WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            attempts = row[0] + 1 if count_attempt else row[0]
+            status = "dead" if attempts >= self.max_attempts else "failed"
+            self.conn.execute(
+                "UPDATE work_queue SET status = ?, attempts = ?, reason = ?, next_eligible_at = ?, updated_at = ? "
+                "WHERE url = ?",
+                (status, attempts, reason, now + self.retry_delay(max(1, attempts)), now, url))
+        metrics.incr("work_queue", status=status if count_attempt else "deferred")
+        if status == "dead":
+            print(f"💀 Giving up on {url} after {attempts} failed attempts (last: {reason})")
+        return status
+
+    def revive(self, urls=None):
+        """Give dead posts (all of them, or those in `urls`) a fresh set of attempts. Returns how many were revived.
+
+        Posts dead-lettered before their body was kept can't be rebuilt from the queue; they are
+        dropped from it instead, so discovery picks them up again as new posts.
+        """
+        where = "status = 'dead'" + (f" AND url IN ({', '.join('?' * len(urls))})" if urls else "")
+        now = time.time()
+        with self.lock:
+            dropped = [row[0] for row in self.conn.execute(
+                f"SELECT url FROM work_queue WHERE {where} AND content IS NULL", tuple(urls or ()))]
+            self.conn.execute(f"DELETE FROM work_queue WHERE {where} AND content IS NULL", tuple(urls or ()))
+            revived = self.conn.execute(
+                "UPDATE work_queue SET status = 'pending', attempts = 0, reason = NULL, next_eligible_at = ?, "
+                f"updated_at = ? WHERE {where}", (now, now, *(urls or ()))).rowcount
+            self.known_urls.difference_update(dropped)
+        metrics.incr("work_queue", value=revived + len(dropped), status="revived")
+        return revived + len(dropped)
+
+    def eligible(self, limit=None):
+        """Queued posts whose next attempt is due, oldest first (posts left over by an interrupted run included)."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT url, title, slug, content, status, attempts FROM work_queue "
+                f"WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))}) AND next_eligible_at <= ? "
+                "AND content IS NOT NULL ORDER BY next_eligible_at LIMIT ?",
+                (*ACTIVE_STATUSES, time.time(), -1 if limit is None else limit)).fetchall()
+        return [QueuedPost(url, title, slug, zlib.decompress(content).decode("utf-8"), status, attempts)
+                for url, title, slug, content, status, attempts in rows]
+
+    def counts(self):
+        """{status: number of posts}."""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM work_queue GROUP BY status").fetchall())
+
+    def summary(self):
+        counts = self.counts()
+        return "Work queue: " + (", ".join(f"{counts[status]} {status}" for status in sorted(counts)) or "empty")
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
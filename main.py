@@ -1,5 +1,61 @@
-from core.agent import CommentAgent
+import argparse
+import os
+import signal
+from config.config import Config
+
+
+def build_runner(args):
+    """A SiteScheduler when a sites file is present, otherwise a single CommentAgent."""
+    sites_file = args.sites or Config.SITES_FILE
+    if os.path.exists(sites_file):
+        from core.scheduler import SiteScheduler
+        return SiteScheduler(Config.load_sites(sites_file))
+    from core.agent import CommentAgent
+    return CommentAgent()
+
+
+def revive_dead(args):
+    """Give dead-lettered work-queue posts of every site (or only `args.urls`) a fresh set of attempts."""
+    from core.work_queue import WorkQueue
+    sites_file = args.sites or Config.SITES_FILE
+    sites = Config.load_sites(sites_file) if os.path.exists(sites_file) else [Config]
+    for site in sites:
+        queue = WorkQueue(site.MEMORY_DB_FILE, site.WORK_QUEUE_MAX_ATTEMPTS, site.WORK_QUEUE_RETRY_BASE_DELAY,
+                          site.WORK_QUEUE_RETRY_MAX_DELAY)
+        try:
+            revived = queue.revive(args.urls or None)
+            print(f"{site.SITE_NAME}: revived {revived} dead post(s). {queue.summary()}")
+        finally:
+            queue.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Blog Commenter Agent")
+    parser.add_argument("--sites", help=f"Site profiles file (default {Config.SITES_FILE}, used when it exists)")
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("run", help="Discover, generate and post once, then exit (default)")
+    daemon = commands.add_parser("daemon", help="Stay resident and poll for new posts")
+    daemon.add_argument("--interval", type=float, default=Config.DAEMON_POLL_INTERVAL,
+                        help="Seconds between polls (default %(default)s)")
+    discover = commands.add_parser("discover", help="Only list the posts that would be commented on next")
+    discover.add_argument("--limit", type=int, help="Max posts to list (default MAX_POSTS_TO_PROCESS)")
+    revive = commands.add_parser("revive", help="Retry dead-lettered posts on the next run, with a fresh set of attempts")
+    revive.add_argument("urls", nargs="*", help="Only these posts (default: every dead post)")
+    args = parser.parse_args()
+
+    if args.command == "revive":  # Only touches the work queues, so no scraper, LLM client or browser is set up
+        revive_dead(args)
+        return
+
+    runner = build_runner(args)
+    if args.command == "daemon":
+        signal.signal(signal.SIGTERM, signal.default_int_handler)  # Shut down cleanly under systemd/docker stop
+        runner.watch(args.interval)
+    elif args.command == "discover":
+        runner.discover(args.limit)
+    else:
+        runner.run_agent()
+
 
 if __name__ == "__main__":
-    agent = CommentAgent()
-    agent.run_agent()
\ No newline at end of file
+    main()
@@ -0,0 +1,132 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from config.config import Config
+from core.comment_generator import CommentGenerator
+from core.generation_cache import GenerationCache
+from core.post_record import BodyStore, PostRecord
+
+
+class FakeBatchClient:
+    """Just enough of the OpenAI client for submit_batch/collect_batch: files go in, a completed batch comes out."""
+
+    def __init__(self):
+        self.files_by_id = {}
+        self.files = SimpleNamespace(create=self.create_file, content=self.file_content)
+        self.batches = SimpleNamespace(create=self.create_batch, retrieve=self.retrieve_batch)
+        self.batch = None
+
+    def create_file(self, file, purpose):
+        file_id = f"file-{len(self.files_by_id)}"
+        self.files_by_id[file_id] = file[1].getvalue().decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    def file_content(self, file_id):
+        return SimpleNamespace(text=self.files_by_id[file_id])
+
+    def create_batch(self, input_file_id, endpoint, completion_window):
+        self.batch = SimpleNamespace(id="batch-1", status="in_progress", input_file_id=input_file_id,
+                                     output_file_id=None, error_file_id=None)
+        return self.batch
+
+    def retrieve_batch(self, batch_id):
+        return self.batch
+
+    def complete(self, comments, failed=()):
+        """Finish the batch: a comment for each custom_id in `comments`, a 429 for those in `failed`."""
+        output = [{"custom_id": url, "response": {"status_code": 200, "body": {
+            "choices": [{"message": {"content": f" {comment} "}}], "usage": {"prompt_tokens": 10, "completion_tokens": 5}}}}
+            for url, comment in comments.items()]
+        errors = [{"custom_id": url, "response": {"status_code": 429, "body": {"error": {"code": "rate_limit_exceeded"}}}}
+                  for url in failed]
+        self.files_by_id["file-out"] = "\n".join(json.dumps(line) for line in output)
+        self.files_by_id["file-err"] = "\n".join(json.dumps(line) for line in errors)
+        self.batch.status, self.batch.output_file_id, self.batch.error_file_id = "completed", "file-out", "file-err"
+
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    monkeypatch.setattr(Config, "GENERATION_CACHE_ENABLED", False)
+
+
+@pytest.fixture
+def bodies(tmp_path):
+    store = BodyStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def generator(tmp_path):
+    generator = CommentGenerator()
+    generator.cache = GenerationCache(str(tmp_path / "generation.sqlite3"))
+    generator._client = FakeBatchClient()
+    yield generator
+    generator.cache.close()
+
+
+def make_post(bodies, name):
+    return PostRecord.create(f"https://example.com/blog/{name}/", f"Post {name}", name,
+                             f"The content of post {name}, long enough to be a paragraph. " * 20, bodies)
+
+
+def test_collected_batch_comments_are_cached_for_the_next_run(generator, bodies):
+    posts = [make_post(bodies, name) for name in "abc"]
+    batch_id = generator.submit_batch(posts)
+    assert generator.collect_batch(batch_id) is None  # Still running
+
+    generator._client.complete({posts[0].url: "Comment on a", posts[1].url: "Comment on b"}, failed=[posts[2].url])
+    results = {result.url: result for result in generator.collect_batch(batch_id)}
+    assert results[posts[0].url].comment == "Comment on a" and results[posts[0].url].prompt_tokens == 10
+    assert not results[posts[2].url].ok and "rate_limit_exceeded" in results[posts[2].url].error
+
+    # A later run rediscovers the posts and finds their comments waiting in the cache
+    assert generator.cached_comment(make_post(bodies, "a")) == "Comment on a"
+    assert generator.cached_comment(make_post(bodies, "b")) == "Comment on b"
+    assert generator.cached_comment(make_post(bodies, "c")) is None
+
+
+def test_batch_comments_for_an_edited_post_are_not_reused(generator, bodies):
+    post = make_post(bodies, "a")
+    batch_id = generator.submit_batch([post])
+    generator._client.complete({post.url: "Comment on the old text"})
+    generator.collect_batch(batch_id)
+    edited = PostRecord.create(post.url, post.title, post.slug, "Rewritten from scratch, with new points. " * 20, bodies)
+    assert generator.cached_comment(edited) is None
+
+
+def rate_limited(headers):
+    return SimpleNamespace(response=SimpleNamespace(headers=headers))
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"retry-after": "7"}, 7.0),
+    ({"retry-after": "3600"}, 60.0),  # Capped at MAX_RETRY_AFTER
+    ({"retry-after-ms": "250", "retry-after": "1"}, 0.25),
+    ({"retry-after": "-5"}, 0.0),
+])
+def test_retry_delay_honours_retry_after_up_to_a_cap(headers, expected):
+    from core.comment_generator import retry_delay
+    assert retry_delay(rate_limited(headers), attempt=0) == expected
+
+
+def test_retry_delay_backs_off_without_retry_after(monkeypatch):
+    from core.comment_generator import retry_delay
+    monkeypatch.setattr(Config, "GENERATION_RETRY_BASE_DELAY", 2)
+    assert 8 <= retry_delay(rate_limited({"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}), attempt=2) <= 9
+    assert 2 <= retry_delay(Exception("no response"), attempt=0) <= 3
+
+
+def test_exhausted_quota_is_not_retried():
+    openai = pytest.importorskip("openai")
+    import httpx
+    from core.comment_generator import is_retryable
+
+    def error(code):
+        response = httpx.Response(429, request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+        return openai.RateLimitError("429", response=response, body={"code": code, "message": "..."})
+
+    assert is_retryable(error("rate_limit_exceeded"))
+    assert not is_retryable(error("insufficient_quota"))
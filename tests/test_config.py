@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from config.config import Config
+
+
+def test_for_site_rederives_site_settings():
+    site = Config.for_site("docs", SITE_URL="https://docs.example.org", COMMENT_NAME="Docs Bot")
+    assert site.BLOG_BASE_URL == "https://docs.example.org/blog/"
+    assert site.SITEMAP_URL == "https://docs.example.org/sitemap.xml"
+    assert site.MEMORY_DB_FILE == "memory/sites/docs/agent_memory.sqlite3"
+    assert (site.COMMENT_NAME, site.SITE_NAME) == ("Docs Bot", "docs")
+    assert Config.COMMENT_NAME != "Docs Bot" and issubclass(site, Config)
+
+
+def test_for_site_keeps_explicit_overrides_of_derived_settings():
+    site = Config.for_site("docs", SITE_URL="https://docs.example.org", BLOG_BASE_URL="https://docs.example.org/posts/")
+    assert site.BLOG_BASE_URL == "https://docs.example.org/posts/"
+
+
+@pytest.mark.parametrize("key", ["COMMENT_NAMES", "site_url", "for_site"])
+def test_for_site_rejects_unknown_settings(key):
+    with pytest.raises(ValueError, match="Unknown settings"):
+        Config.for_site("docs", **{key: "x"})
+
+
+@pytest.mark.parametrize("key", ["OPENAI_MODEL", "HTTP_READ_TIMEOUT", "BROWSER_POOL_SIZE", "METRICS_JSONL_FILE",
+                                 "PROCESS_WIDE_SETTINGS"])
+def test_for_site_rejects_process_wide_settings(key):
+    with pytest.raises(ValueError, match=key):
+        Config.for_site("docs", **{key: "x"})
+
+
+def test_example_profiles_load(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # No single-site memory here to adopt
+    with open(tmp_path / "sites.json", "w") as f:
+        json.dump([{"name": "a", "SITE_URL": "https://a.example"}, {"name": "b", "SITE_URL": "https://b.example"}], f)
+    sites = Config.load_sites(str(tmp_path / "sites.json"))
+    assert [site.SITE_NAME for site in sites] == ["a", "b"]
+    with open(tmp_path / "dupes.json", "w") as f:
+        json.dump([{"name": "a"}, {"name": "a"}], f)
+    with pytest.raises(ValueError, match="unique"):
+        Config.load_sites(str(tmp_path / "dupes.json"))
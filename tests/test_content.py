@@ -0,0 +1,91 @@
+import pytest
+
+from core.content import ContentCondenser, TokenCounter, clean_paragraphs, normalize_whitespace, rank_paragraphs
+
+
+def estimating_condenser(token_budget, **kwargs):
+    """A condenser that counts ~4 characters per token whether or not tiktoken is installed."""
+    condenser = ContentCondenser(token_budget=token_budget, **kwargs)
+    condenser.counter.encoding, condenser.counter.loaded = None, True
+    return condenser
+
+
+def test_token_counter_estimates_without_an_encoding():
+    counter = TokenCounter()
+    counter.encoding, counter.loaded = None, True
+    assert counter.count("") == 0
+    assert counter.count("abcd") == 1 and counter.count("abcde") == 2
+
+
+def test_normalize_whitespace_keeps_one_paragraph_per_line():
+    assert normalize_whitespace("  First   line \n\n\n\tSecond\t line  ") == "First line\nSecond line"
+
+
+def test_clean_paragraphs_drops_boilerplate_code_fragments_and_repeats():
+    text = """
+    Why we moved our build to a monorepo last spring.
+    Share this post
+    def build(target):
+    const answer = compute();
+    Getting Started
+    The first week was rough, because every tool assumed one repository per service.
+    The first week was rough, because every tool assumed one repository per service.
+    5 min read
+    Did it pay off? We think so!
+    """
+    assert clean_paragraphs(text) == [
+        "Why we moved our build to a monorepo last spring.",
+        "The first week was rough, because every tool assumed one repository per service.",
+        "Did it pay off? We think so!",
+    ]
+
+
+def test_rank_paragraphs_prefers_title_terms_and_central_paragraphs():
+    paragraphs = [
+        "A short note about the weather on the day we started.",
+        "Caching compiled templates cut page render time in half for the template engine.",
+        "Unrelated aside about lunch options near the office.",
+    ]
+    scores = rank_paragraphs(paragraphs, title="Caching compiled templates")
+    assert scores[1] == max(scores)
+
+
+def test_short_posts_are_kept_whole():
+    condenser = estimating_condenser(token_budget=1000)
+    text = "First paragraph of a short post.\nSecond paragraph of a short post."
+    assert condenser.condense(text) == "First paragraph of a short post.\n\nSecond paragraph of a short post."
+
+
+def test_long_posts_keep_the_best_paragraphs_in_their_original_order():
+    filler = ["Our team lunch happened at the noodle place downtown.",
+              "Someone brought homemade cookies, which vanished quickly.",
+              "Weather forecasts predicted heavy rain throughout Tuesday.",
+              "Parking near headquarters remains frustrating every morning.",
+              "Marketing finally picked colours for next year's brochure."]
+    on_topic = "Database indexing strategies decide how fast the database answers queries."
+    closing = "In short, database indexing strategies matter more than database hardware."
+    condenser = estimating_condenser(token_budget=60)
+    condensed = condenser.condense("\n".join([filler[0], on_topic, *filler[1:], closing]),
+                                   title="Database indexing strategies")
+    assert condenser.counter.count(condensed) <= 60
+    assert on_topic in condensed and closing in condensed
+    assert condensed.index(on_topic) < condensed.index(closing)
+
+
+def test_an_oversized_best_paragraph_is_cut_at_a_sentence_boundary():
+    paragraph = " ".join(f"Sentence number {i} about compilers and their optimizations." for i in range(40))
+    condenser = estimating_condenser(token_budget=40)
+    condensed = condenser.condense(paragraph, title="Compilers")
+    assert condensed and condensed.endswith("optimizations.")
+    assert condenser.counter.count(condensed) <= 40
+
+
+@pytest.mark.parametrize("title", ["", "A title"])
+def test_condensed_text_is_cached_per_content_and_title(title):
+    condenser = estimating_condenser(token_budget=1000, max_entries=2)
+    text = "The only paragraph of this post, long enough to keep."
+    first = condenser.condense(text, title)
+    assert condenser.condense(text, title) is first
+    condenser.condense("Another post with its own paragraph of text.", title)
+    condenser.condense("A third post with its own paragraph of text.", title)
+    assert len(condenser.cache) == 2  # The least recently used entry was dropped
@@ -0,0 +1,54 @@
+from core.dedup import ContentIndex, SimHashIndex, canonicalize_url, hamming_distance, simhash
+from core.parser import parse_post
+from benchmarks import corpus
+
+
+def test_canonicalize_url_variants_collide():
+    variants = [
+        "https://example.com/blog/my-post/",
+        "http://www.example.com/blog/my-post",
+        "https://EXAMPLE.com:443/blog//my-post.html",
+        "https://example.com/blog/my-post/index.html#comments",
+        "https://example.com/blog/my-post/?utm_source=feed&fbclid=abc",
+    ]
+    assert {canonicalize_url(url) for url in variants} == {"https://example.com/blog/my-post"}
+
+
+def test_canonicalize_url_keeps_what_identifies_a_post():
+    assert canonicalize_url("https://example.com/blog/a/") != canonicalize_url("https://example.com/blog/b/")
+    assert canonicalize_url("https://example.com/?p=1&lang=en") == canonicalize_url("https://example.com/?lang=en&p=1")
+    assert canonicalize_url("https://example.com/?p=1") != canonicalize_url("https://example.com/?p=2")
+    assert canonicalize_url("https://example.com:8080/a") == "https://example.com:8080/a"
+
+
+def test_simhash_near_duplicates():
+    text = parse_post(corpus.post_html(1)).content
+    other = parse_post(corpus.post_html(2)).content
+    assert hamming_distance(simhash(text), simhash(text + " Updated: typo fixed.")) <= 3
+    assert hamming_distance(simhash(text), simhash(other)) > 10
+    assert simhash("Too short to fingerprint.") is None
+
+
+def test_simhash_index_finds_within_distance():
+    index = SimHashIndex(max_distance=3)
+    base = 0x0123456789ABCDEF
+    index.add("a", base)
+    index.add("b", base ^ 0xFFFF0000)
+    assert index.find(base ^ 0b101) == "a"
+    assert index.find(base, exclude="a") is None
+    assert index.find(base ^ 0xF0F0) is None
+    index.add("a", 0)  # Re-adding replaces the old fingerprint
+    assert index.find(base) is None and len(index) == 2
+
+
+def test_content_index_persists_and_seeds_memory_urls(tmp_path):
+    path = str(tmp_path / "memory.sqlite3")
+    fingerprint = (1 << 63) | 12345  # Needs the unsigned/signed round trip through SQLite
+    index = ContentIndex(path, 3, known_urls=["http://www.example.com/blog/old.html"])
+    index.add(canonicalize_url("https://example.com/blog/new/"), fingerprint)
+    index.close()
+
+    reopened = ContentIndex(path, 3)
+    assert canonicalize_url("https://example.com/blog/old/") in reopened
+    assert reopened.find(fingerprint ^ 1) == "https://example.com/blog/new"
+    reopened.close()
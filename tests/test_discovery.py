@@ -0,0 +1,100 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("requests")
+
+from benchmarks import corpus
+from config.config import Config
+from core.scraper import WebScraper
+
+SITE = "https://example.com"
+
+
+def sitemap(*entries):
+    urls = "".join(f"<url><loc>{SITE}/blog/{slug}/</loc>" + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "") + "</url>"
+                   for slug, lastmod in entries)
+    return f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+
+def listing(*slugs):
+    articles = "".join(f'<article class="article"><h2 class="article__title"><a href="/blog/{slug}/">{slug}</a></h2></article>'
+                       for slug in slugs)
+    return f"<html><body>{articles}</body></html>"
+
+
+@pytest.fixture
+def scraper_for(monkeypatch):
+    monkeypatch.setattr(Config, "HTTP_CACHE_ENABLED", False)
+    scrapers = []
+
+    def make(pages, mode="auto"):
+        site = Config.for_site("example", SITE_URL=SITE, DISCOVERY_MODE=mode, FEED_URLS=[f"{SITE}/index.xml"],
+                               DISQUS_PRECHECK_ENABLED=False)
+        scraper = WebScraper(config=site)
+        scraper.get_page = lambda url: pages.get(url)
+        scrapers.append(scraper)
+        return scraper
+    yield make
+    for scraper in scrapers:
+        scraper.close()
+
+
+def slugs(scraper):
+    return [url[len(f"{SITE}/blog/"):].strip("/") for url, _ in scraper.iter_candidate_links()]
+
+
+def test_dated_sitemap_entries_come_newest_first_and_undated_ones_keep_document_order(scraper_for):
+    pages = {f"{SITE}/sitemap.xml": sitemap(("zebra", None), ("old", "2024-01-01"), ("apple", None),
+                                           ("new", "2024-05-01"))}
+    assert slugs(scraper_for(pages)) == ["new", "old", "zebra", "apple"]
+
+
+def test_sitemap_without_any_lastmod_falls_through_to_the_listing_pages(scraper_for):
+    pages = {f"{SITE}/sitemap.xml": sitemap(("apple", None), ("newest", None), ("zebra", None)),
+             f"{SITE}/blog/": listing("newest", "zebra", "apple")}
+    assert slugs(scraper_for(pages)) == ["newest", "zebra", "apple"]
+
+
+def test_explicit_sitemap_mode_keeps_an_undated_sitemap_in_document_order(scraper_for):
+    pages = {f"{SITE}/sitemap.xml": sitemap(("zebra", None), ("apple", None))}
+    assert slugs(scraper_for(pages, mode="sitemap")) == ["zebra", "apple"]
+
+
+def test_closing_discovery_early_releases_prefetched_posts_and_records_nothing(scraper_for):
+    urls = [f"{SITE}/blog/{corpus.post_slug(i)}/" for i in range(6)]
+    unblock = threading.Event()
+    scraper = scraper_for({})
+
+    def get_page(url):
+        i = urls.index(url)
+        if i > 1:  # Posts 0 and 1 load at once, the rest are still in flight when discovery stops
+            unblock.wait(1)
+        return corpus.post_html(i, with_disqus=i != 3)
+
+    scraper.get_page = get_page
+    scraper.test_connection = lambda: True
+    scraper.iter_candidate_links = lambda: ((url, None) for url in urls)
+    recorded = []
+    agent = SimpleNamespace(is_already_commented=lambda url: False, is_queued=lambda url: False,
+                            is_unchanged_since_skipped=lambda url, lastmod: False, find_duplicate=lambda post: None,
+                            record_post=lambda post, outcome: recorded.append((post.url, outcome)),
+                            mark_post_as_skipped=lambda url, lastmod: recorded.append((url, "skipped")))
+
+    def stored_bodies():
+        return scraper.bodies.conn.execute("SELECT COUNT(*) FROM bodies").fetchone()[0]
+
+    posts = scraper.iter_blog_posts(agent, limit=4)
+    first = next(posts)
+    deadline = time.monotonic() + 1
+    while stored_bodies() < 2 and time.monotonic() < deadline:  # Post 1 is fetched but never consumed
+        time.sleep(0.01)
+    posts.close()
+    unblock.set()
+    scraper.fetcher.executor.shutdown(wait=True)
+
+    assert recorded == []  # Not even post 3, which has no Disqus embed
+    first.release()
+    assert stored_bodies() == 0
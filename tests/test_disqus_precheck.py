@@ -0,0 +1,81 @@
+import json
+from collections import namedtuple
+
+import pytest
+
+from config.config import Config
+from core.disqus_precheck import ThreadState, parse_thread_data, thread_state
+
+Post = namedtuple("Post", "url slug")
+
+
+def payload(closed=False, authors=()):
+    return {"code": 0, "response": {"thread": {"isClosed": closed, "posts": len(authors)},
+                                    "posts": [{"author": {"name": name}} for name in authors]}}
+
+
+def embed(data):
+    return f'<html><script type="text/json" id="disqus-threadData">{json.dumps(data)}</script></html>'
+
+
+def test_parse_thread_data():
+    assert parse_thread_data(embed(payload())) == payload()
+    assert parse_thread_data("<html>no payload</html>") is None
+    assert parse_thread_data('<script id="disqus-threadData">{broken</script>') is None
+    assert parse_thread_data(None) is None
+
+
+@pytest.mark.parametrize("data, expected", [
+    (payload(), ThreadState("open", False, "0 comments")),
+    (payload(authors=["Someone", "Else"]), ThreadState("open", False, "2 comments")),
+    (payload(closed=True), ThreadState("closed", True, "thread is closed")),
+    (payload(authors=["Someone", "  ai assistant "]), ThreadState("already_commented", True, "'AI Assistant' already posted")),
+    ({"code": 2, "response": "Invalid thread"}, ThreadState("unknown", False, "no thread in payload")),
+    (None, ThreadState("unknown", False, "no thread in payload")),
+])
+def test_thread_state(data, expected):
+    assert thread_state(data, "AI Assistant") == expected
+
+
+@pytest.fixture
+def fake_blog(monkeypatch):
+    """The benchmark's local stand-in for the blog and its Disqus embed, with a WebScraper pointed at it."""
+    pytest.importorskip("requests")
+    from benchmarks import corpus
+    from benchmarks.fake_site import start_fake_blog
+    from core.scraper import WebScraper
+    monkeypatch.setattr(Config, "HTTP_CACHE_ENABLED", False)
+    server, base_url = start_fake_blog(num_posts=5)
+    server.blog.seed_threads(commented=1, closed=1, author="AI Assistant")
+    site = Config.for_site("fake", SITE_URL=base_url, COMMENT_NAME="AI Assistant", REQUESTS_PER_SECOND_PER_HOST=100,
+                           DISQUS_EMBED_URL=f"{base_url}/disqus/embed/comments/?t_i={{identifier}}")
+    scraper = WebScraper(config=site)
+    slugs = [corpus.post_slug(i) for i in reversed(range(5))]  # Newest first, like seed_threads
+    yield scraper, base_url, slugs
+    scraper.close()
+    server.shutdown()
+
+
+def test_precheck_reads_the_thread_from_the_embed(fake_blog):
+    scraper, base_url, (commented, closed, open_slug, *_) = fake_blog
+    states = {slug: scraper.precheck.check(Post(f"{base_url}/blog/{slug}", slug)).status
+              for slug in (commented, closed, open_slug)}
+    assert states == {commented: "already_commented", closed: "closed", open_slug: "open"}
+
+
+def test_precheck_failures_let_the_post_through(fake_blog):
+    scraper, base_url, (commented, *_) = fake_blog
+    scraper.precheck.config = Config.for_site("fake", SITE_URL=base_url,
+                                              DISQUS_EMBED_URL=f"{base_url}/no-such-embed/?t_i={{identifier}}")
+    state = scraper.precheck.check(Post(f"{base_url}/blog/{commented}", commented))
+    assert (state.status, state.skip) == ("unknown", False)
+    assert state.detail.startswith("HTTPError")
+
+
+def test_skipped_threads_never_become_posts(fake_blog):
+    scraper, base_url, (commented, closed, open_slug, *_) = fake_blog
+    assert scraper.fetch_post(f"{base_url}/blog/{commented}") is None
+    assert scraper.fetch_post(f"{base_url}/blog/{closed}") is None
+    post = scraper.fetch_post(f"{base_url}/blog/{open_slug}")
+    assert post is not None and post.slug == open_slug
+    post.release()
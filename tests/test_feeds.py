@@ -0,0 +1,68 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from core.feeds import FeedEntry, SitemapRef, iter_feed, iter_sitemap, parse_rfc822_datetime, parse_w3c_datetime, xml_encoding
+
+
+def utc(*fields):
+    return datetime(*fields, tzinfo=timezone.utc).timestamp()
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2024-05-01", utc(2024, 5, 1)),
+    ("2024-05", utc(2024, 5, 1)),
+    ("2024", utc(2024, 1, 1)),
+    ("2024-05-01T10:00Z", utc(2024, 5, 1, 10)),
+    ("2024-05-01T10:00:00Z", utc(2024, 5, 1, 10)),
+    ("2024-05-01T10:00:00z", utc(2024, 5, 1, 10)),
+    ("2024-05-01T10:00:00", utc(2024, 5, 1, 10)),
+    ("2024-05-01T10:00:00.5+02:00", utc(2024, 5, 1, 8)),
+    ("2024-05-01T10:00:00.123456789+0200", utc(2024, 5, 1, 8)),
+    ("2024-05-01T10:00:00-05:30", utc(2024, 5, 1, 15, 30)),
+    ("  2024-05-01 10:00:00 ", utc(2024, 5, 1, 10)),
+])
+def test_w3c_datetime(value, expected):
+    assert parse_w3c_datetime(value) == expected
+
+
+@pytest.mark.parametrize("value", [None, "", "yesterday", "2024-13-01", "2024-05-01T25:00:00Z", "2024-05-01T10:00:00+2500"])
+def test_w3c_datetime_rejects_garbage(value):
+    assert parse_w3c_datetime(value) is None
+
+
+def test_rfc822_datetime():
+    assert parse_rfc822_datetime("Wed, 01 May 2024 10:00:00 +0200") == utc(2024, 5, 1, 8)
+    assert parse_rfc822_datetime("not a date") is None
+
+
+SITEMAP = """<?xml version="1.0" encoding="ISO-8859-1"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <url><loc>https://example.com/blog/café/</loc><lastmod>2024-05-01T10:00:00.5+0200</lastmod></url>
+  <url><loc> https://example.com/blog/second/ </loc></url>
+</urlset>"""
+
+
+def test_sitemap_honors_the_declared_encoding():
+    expected = [FeedEntry("https://example.com/blog/café/", utc(2024, 5, 1, 8)),
+                FeedEntry("https://example.com/blog/second/", None)]
+    assert xml_encoding(SITEMAP.encode("latin-1")) == "iso8859-1"
+    assert list(iter_sitemap(SITEMAP.encode("latin-1"))) == expected
+    assert list(iter_sitemap(SITEMAP)) == expected  # Already decoded text ignores the declaration
+
+
+def test_sitemap_index():
+    xml = b"""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>https://example.com/post-sitemap.xml</loc><lastmod>2024-05-01</lastmod></sitemap>
+    </sitemapindex>"""
+    assert list(iter_sitemap(xml)) == [SitemapRef("https://example.com/post-sitemap.xml", utc(2024, 5, 1))]
+
+
+def test_rss_and_atom_feeds():
+    rss = """<rss version="2.0"><channel><item><link>https://example.com/blog/a/</link>
+      <pubDate>Wed, 01 May 2024 10:00:00 GMT</pubDate></item></channel></rss>"""
+    atom = """<feed xmlns="http://www.w3.org/2005/Atom"><entry>
+      <link rel="self" href="https://example.com/feed/b"/><link href="https://example.com/blog/b/"/>
+      <published>2024-04-01T00:00:00Z</published><updated>2024-05-01T10:00:00Z</updated></entry></feed>"""
+    assert list(iter_feed(rss)) == [FeedEntry("https://example.com/blog/a/", utc(2024, 5, 1, 10))]
+    assert list(iter_feed(atom)) == [FeedEntry("https://example.com/blog/b/", utc(2024, 5, 1, 10))]
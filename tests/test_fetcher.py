@@ -0,0 +1,113 @@
+import threading
+import time
+
+import pytest
+
+from core.fetcher import ConcurrentFetcher, HostRateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_then_paces_at_the_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.03  # The burst is banked
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - started >= 4 / 20 * 0.9
+
+
+def test_token_bucket_never_banks_more_than_its_capacity():
+    bucket = TokenBucket(rate=1000, capacity=2)
+    time.sleep(0.02)
+    with bucket.lock:
+        bucket._refill(time.monotonic())
+        assert bucket.tokens == 2
+
+
+def test_hosts_get_separate_buckets():
+    limiter = HostRateLimiter(rate=5, burst=1)
+    a = limiter.bucket_for("https://a.example.com/blog/")
+    assert limiter.bucket_for("https://A.example.com/other") is a
+    assert limiter.bucket_for("https://b.example.com/") is not a
+    started = time.monotonic()
+    limiter.acquire("https://a.example.com/")
+    limiter.acquire("https://b.example.com/")  # Its own burst, no waiting on a's bucket
+    assert time.monotonic() - started < 0.05
+
+
+def test_sites_sharing_a_host_get_the_strictest_limit():
+    limiter = HostRateLimiter(rate=10, burst=10)
+    limiter.set_host_limit("https://example.com/blog/", 2, 5)
+    limiter.set_host_limit("https://example.com/docs/", 4, 3)
+    bucket = limiter.bucket_for("https://example.com/")
+    assert (bucket.rate, bucket.capacity) == (2, 3)
+
+
+def test_imap_ordered_yields_in_input_order_while_running_concurrently():
+    fetcher = ConcurrentFetcher(max_workers=4)
+    running = peak = 0
+    lock = threading.Lock()
+
+    def work(n):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02 * (5 - n % 5))  # Later items finish first
+        with lock:
+            running -= 1
+        return n * n
+
+    assert list(fetcher.imap_ordered(work, range(10))) == [(n, n * n) for n in range(10)]
+    assert 1 < peak <= 4
+    fetcher.shutdown()
+
+
+def test_imap_ordered_consumes_items_lazily_and_stops_with_the_consumer():
+    fetcher = ConcurrentFetcher(max_workers=2)
+    pulled = []
+
+    def items():
+        for n in range(100):
+            pulled.append(n)
+            yield n
+
+    results = fetcher.imap_ordered(lambda n: n, items(), window=2)
+    assert next(results) == (0, 0)
+    results.close()
+    assert len(pulled) <= 3  # Only the window (plus the refill after the first result) was ever requested
+    fetcher.shutdown()
+
+
+def test_imap_ordered_propagates_worker_errors():
+    fetcher = ConcurrentFetcher(max_workers=2)
+
+    def work(n):
+        if n == 1:
+            raise ValueError("boom")
+        return n
+
+    results = fetcher.imap_ordered(work, range(3))
+    assert next(results) == (0, 0)
+    with pytest.raises(ValueError, match="boom"):
+        next(results)
+    fetcher.shutdown()
+
+
+def test_imap_ordered_hands_abandoned_results_to_discard():
+    fetcher = ConcurrentFetcher(max_workers=2)
+    unblock = threading.Event()
+    discarded = []
+
+    def work(n):
+        if n > 0:
+            unblock.wait(1)
+        return n * 10
+
+    results = fetcher.imap_ordered(work, range(4), window=3, discard=lambda n, result: discarded.append((n, result)))
+    assert next(results) == (0, 0)
+    results.close()  # 1 and 2 are running, 3 is still queued
+    unblock.set()
+    fetcher.executor.shutdown(wait=True)
+    assert sorted(discarded) == [(1, 10), (2, 20)]  # The queued call was cancelled, never run
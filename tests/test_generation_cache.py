@@ -0,0 +1,107 @@
+import pytest
+
+from config.config import Config
+from core.comment_generator import CommentGenerator, GenerationResult
+from core.generation_cache import GenerationCache, request_key
+from core.post_record import BodyStore, PostRecord
+
+
+class CountingGenerator(CommentGenerator):
+    """Real caching; the API call is replaced by a canned comment per call."""
+
+    def __init__(self, cache_path):
+        super().__init__()  # GENERATION_CACHE_ENABLED is off (see no_default_cache), so nothing opens the real cache
+        self.cache = GenerationCache(cache_path)
+        self.calls = 0
+
+    def generate_result(self, post):
+        self.calls += 1
+        return GenerationResult(url=post.url, comment=f"Comment {self.calls} on {post.title}", attempts=1)
+
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    monkeypatch.setattr(Config, "GENERATION_CACHE_ENABLED", False)
+
+
+@pytest.fixture
+def bodies(tmp_path):
+    store = BodyStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def make_post(bodies, content="Some post content. " * 50, title="A post"):
+    return PostRecord.create("https://example.com/blog/a/", title, "a", content, bodies)
+
+
+def make_cache(tmp_path, **kwargs):
+    return GenerationCache(str(tmp_path / "generation.sqlite3"), **kwargs)
+
+
+def test_request_key_ignores_dict_order_but_not_content():
+    assert request_key({"model": "m", "temperature": 0.7}) == request_key({"temperature": 0.7, "model": "m"})
+    assert request_key({"model": "m", "temperature": 0.7}) != request_key({"model": "m", "temperature": 0.8})
+
+
+def test_get_put_and_hit_rate(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("k1") is None
+    cache.put("k1", "https://example.com/blog/a/", "A comment")
+    assert cache.get("k1") == "A comment"
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1 and cache.hit_rate() == 0.5
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_over_the_cap(tmp_path):
+    cache = make_cache(tmp_path, max_entries=2)
+    cache.put("k1", "https://example.com/blog/1/", "one")
+    cache.put("k2", "https://example.com/blog/2/", "two")
+    cache.conn.execute("UPDATE generated_comments SET accessed_at = accessed_at - 10 WHERE key = 'k2'")
+    cache.put("k3", "https://example.com/blog/3/", "three")
+    assert cache.get("k2") is None and cache.get("k1") == "one" and cache.get("k3") == "three"
+    assert cache.stats["evictions"] == 1
+    cache.close()
+
+
+def test_invalidate_url_keeps_only_the_current_version(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("old", "https://example.com/blog/a/", "For the old text")
+    cache.put("new", "https://example.com/blog/a/", "For the new text")
+    cache.put("other", "https://example.com/blog/b/", "Another post")
+    assert cache.invalidate_url("https://example.com/blog/a/", keep_key="new") == 1
+    assert cache.get("old") is None and cache.get("new") and cache.get("other")
+    cache.close()
+
+
+def test_forgetting_a_posted_comment_is_not_an_invalidation(tmp_path, bodies):
+    generator = CountingGenerator(str(tmp_path / "generation.sqlite3"))
+    post = make_post(bodies)
+    generator.cached_or_generate(post)
+    generator.forget_comment(post.url)
+    assert generator.cached_comment(make_post(bodies)) is None
+    assert generator.cache.stats["invalidated"] == 0
+    generator.cache.close()
+
+
+def test_pending_comments_survive_a_restart(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.put("k1", "https://example.com/blog/a/", "A comment")
+    cache.close()
+    reopened = make_cache(tmp_path)
+    assert reopened.get("k1") == "A comment"
+    reopened.close()
+
+
+def test_generated_comment_is_reused_until_the_post_changes(tmp_path, bodies):
+    generator = CountingGenerator(str(tmp_path / "generation.sqlite3"))
+    post = make_post(bodies)
+    first = generator.cached_or_generate(post)
+    assert generator.cached_or_generate(make_post(bodies)).comment == first.comment
+    assert generator.calls == 1
+
+    edited = make_post(bodies, content="The post was rewritten. " * 50)
+    assert generator.cached_or_generate(edited).comment != first.comment
+    assert generator.calls == 2
+    assert generator.cached_comment(make_post(bodies)) is None  # The comment for the old text was dropped
+    generator.cache.close()
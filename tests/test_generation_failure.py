@@ -0,0 +1,67 @@
+import pytest
+
+from config.config import Config
+from core.comment_generator import CommentGenerator, GenerationResult
+from core.generation_cache import GenerationCache
+from core.pipeline import Pipeline
+from core.post_record import BodyStore, PostRecord
+from core.work_queue import WorkQueue
+
+
+class FailingGenerator(CommentGenerator):
+    """Real caching and bookkeeping; the API call always fails like an exhausted rate limit."""
+
+    def __init__(self, cache_path):
+        super().__init__()  # GENERATION_CACHE_ENABLED is off (see no_default_cache), so nothing opens the real cache
+        self.cache = GenerationCache(cache_path)
+        self.calls = 0
+
+    def generate_result(self, post):
+        self.calls += 1
+        return GenerationResult(url=post.url, attempts=3, error="RateLimitError: slow down")
+
+
+@pytest.fixture(autouse=True)
+def no_default_cache(monkeypatch):
+    monkeypatch.setattr(Config, "GENERATION_CACHE_ENABLED", False)
+
+
+@pytest.fixture
+def bodies(tmp_path):
+    store = BodyStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def post(bodies):
+    return PostRecord.create("https://example.com/blog/a/", "A post", "a", "Some post content. " * 50, bodies)
+
+
+def test_failed_generation_has_no_comment(tmp_path, post):
+    generator = FailingGenerator(str(tmp_path / "generation.sqlite3"))
+    result = generator.cached_or_generate(post)
+    assert not result.ok and result.comment is None
+    assert result.error == "RateLimitError: slow down"
+    assert generator.generate_comment(post) is None
+    assert generator.cached_comment(post) is None  # Nothing was cached to be posted later
+    assert generator.calls == 2
+
+
+def test_failed_generation_never_reaches_posting(tmp_path, post):
+    pytest.importorskip("requests")  # core.agent imports the scraper
+    from core.agent import CommentAgent
+    agent = CommentAgent.__new__(CommentAgent)  # Only the generation stage's collaborators are needed
+    agent.config = Config
+    agent.comment_generator = FailingGenerator(str(tmp_path / "generation.sqlite3"))
+    agent.work_queue = WorkQueue(str(tmp_path / "memory.sqlite3"), max_attempts=3, base_delay=0, max_delay=0)
+
+    posted = []
+    pipeline = Pipeline(iter([post]))
+    pipeline.add_stage("generate", agent._generate_stage).add_stage("post", posted.append)
+    pipeline.run()
+
+    assert posted == []
+    [queued] = agent.work_queue.eligible()
+    assert (queued.status, queued.attempts) == ("failed", 1)
+    agent.work_queue.close()
@@ -0,0 +1,87 @@
+import sqlite3
+import time
+
+import pytest
+
+from core.http_cache import CachedResponse, ResponseCache
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs = {"max_bytes": 1024 * 1024, "ttl": 60, **kwargs}
+    return ResponseCache(str(tmp_path / "http_cache.sqlite3"), **kwargs)
+
+
+def test_store_and_get_keep_the_body_and_validators(tmp_path):
+    cache = make_cache(tmp_path)
+    assert cache.get("https://example.com/a") is None
+    cache.store("https://example.com/a", "<html>café</html>", etag='"v1"', last_modified="Wed, 01 May 2024 10:00:00 GMT")
+    entry = cache.get("https://example.com/a")
+    assert (entry.body, entry.etag, entry.last_modified) == ("<html>café</html>", '"v1"', "Wed, 01 May 2024 10:00:00 GMT")
+    assert entry.is_fresh(60) and not entry.is_fresh(0)
+    assert entry.conditional_headers() == {"If-None-Match": '"v1"', "If-Modified-Since": "Wed, 01 May 2024 10:00:00 GMT"}
+    cache.close()
+
+
+def test_conditional_headers_only_include_known_validators():
+    assert CachedResponse("u", "body", None, None, time.time()).conditional_headers() == {}
+    assert CachedResponse("u", "body", '"v1"', None, time.time()).conditional_headers() == {"If-None-Match": '"v1"'}
+
+
+def test_mark_revalidated_restarts_the_ttl_and_keeps_old_validators(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store("https://example.com/a", "body", etag='"v1"', last_modified="Wed, 01 May 2024 10:00:00 GMT")
+    cache.conn.execute("UPDATE responses SET fetched_at = 0")
+    assert not cache.get("https://example.com/a").is_fresh(60)
+
+    cache.mark_revalidated("https://example.com/a", etag='"v2"')
+    entry = cache.get("https://example.com/a")
+    assert entry.is_fresh(60)
+    assert (entry.etag, entry.last_modified) == ('"v2"', "Wed, 01 May 2024 10:00:00 GMT")
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted_over_the_size_cap(tmp_path):
+    cache = make_cache(tmp_path, max_bytes=250)
+    for name in "abc":
+        cache.store(f"https://example.com/{name}", name * 100)
+        time.sleep(0.01)  # Distinct access times
+    assert cache.get("https://example.com/a") is None  # Oldest one goes first
+    assert cache.get("https://example.com/b") and cache.get("https://example.com/c")
+    assert cache.stats["evictions"] == 1
+
+    time.sleep(0.01)
+    cache.get("https://example.com/b")  # Now more recently used than c
+    cache.store("https://example.com/d", "d" * 100)
+    assert cache.get("https://example.com/c") is None and cache.get("https://example.com/b")
+    cache.close()
+
+
+def test_entries_survive_a_restart(tmp_path):
+    cache = make_cache(tmp_path)
+    cache.store("https://example.com/a", "body", etag='"v1"')
+    cache.close()
+    reopened = make_cache(tmp_path)
+    assert reopened.get("https://example.com/a").etag == '"v1"'
+    reopened.close()
+
+
+def test_record_counts_outcomes_for_the_summary(tmp_path):
+    cache = make_cache(tmp_path)
+    for outcome in ["hits", "hits", "misses", "revalidated"]:
+        cache.record(outcome)
+    assert cache.summary() == "HTTP cache: 2 fresh hits, 1 revalidated (304), 0 changed, 1 misses, 0 evictions"
+    cache.close()
+
+
+def test_the_scraper_that_opened_the_cache_closes_it(tmp_path, monkeypatch):
+    pytest.importorskip("requests")
+    from config.config import Config
+    from core.scraper import WebScraper
+    monkeypatch.setattr(Config, "HTTP_CACHE_ENABLED", False)
+    owner = WebScraper()
+    owner.cache = make_cache(tmp_path)
+    site = WebScraper(config=Config.for_site("other", SITE_URL="https://other.example.com"), shared=owner)
+    assert site.cache is owner.cache and not site.owns_cache
+    owner.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        owner.cache.get("https://example.com/")
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from core.memory_store import JSONMemoryStore, SQLiteMemoryStore, create_memory_store, fingerprint, migrate_json_memory
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def store(request, tmp_path):
+    store = (JSONMemoryStore(str(tmp_path / "memory.json")) if request.param == "json"
+             else SQLiteMemoryStore(str(tmp_path / "memory.sqlite3")))
+    yield store
+    store.close()
+
+
+def test_record_and_lookup(store):
+    assert not store.contains("https://example.com/blog/a/") and store.get("https://example.com/blog/a/") is None
+    store.record("https://example.com/blog/a/", outcome="pending_moderation", comment_text="Nice post", content="Body")
+    record = store.get("https://example.com/blog/a/")
+    assert store.contains("https://example.com/blog/a/") and store.urls() == ["https://example.com/blog/a/"]
+    assert record["outcome"] == "pending_moderation"
+    assert record["comment_hash"] == fingerprint("Nice post")
+    assert record["content_fingerprint"] == fingerprint("Body")
+
+
+def test_precomputed_content_hash_wins(store):
+    store.record("https://example.com/blog/a/", content="Body", content_hash="abc")
+    assert store.get("https://example.com/blog/a/")["content_fingerprint"] == "abc"
+
+
+def test_seen_lastmod(store):
+    assert store.get_seen_lastmod("https://example.com/blog/a/") is None
+    store.mark_seen("https://example.com/blog/a/", 1714557600.0)
+    assert store.get_seen_lastmod("https://example.com/blog/a/") == 1714557600.0
+
+
+@pytest.mark.parametrize("backend, filename", [("json", "memory.json"), ("sqlite", "memory.sqlite3")])
+def test_stores_survive_a_restart(tmp_path, backend, filename):
+    cls = JSONMemoryStore if backend == "json" else SQLiteMemoryStore
+    store = cls(str(tmp_path / filename))
+    store.record("https://example.com/blog/a/", comment_text="Nice post")
+    store.close()
+    reopened = cls(str(tmp_path / filename))
+    assert reopened.contains("https://example.com/blog/a/")
+    assert reopened.get("https://example.com/blog/a/")["comment_hash"] == fingerprint("Nice post")
+    reopened.close()
+
+
+def test_corrupted_json_memory_starts_empty(tmp_path):
+    path = tmp_path / "memory.json"
+    path.write_text("{not json")
+    assert JSONMemoryStore(str(path)).urls() == []
+
+
+def write_legacy(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def test_json_memory_is_migrated_into_sqlite_once(tmp_path):
+    json_path = str(tmp_path / "memory.json")
+    # The oldest format only listed URLs; later ones added per-post metadata
+    write_legacy(json_path, {
+        "commented_posts": ["https://example.com/blog/old/", "https://example.com/blog/new/"],
+        "post_metadata": {"https://example.com/blog/new/": {
+            "url": "https://example.com/blog/new/", "commented_at": 1700000000.0, "outcome": "submitted",
+            "comment_hash": "h", "content_fingerprint": "f"}}})
+    store = SQLiteMemoryStore(str(tmp_path / "memory.sqlite3"))
+    assert migrate_json_memory(store, json_path) == 2
+    assert store.contains("https://example.com/blog/old/") and store.get("https://example.com/blog/old/")["outcome"] == "posted"
+    assert store.get("https://example.com/blog/new/") == {
+        "url": "https://example.com/blog/new/", "commented_at": 1700000000.0, "outcome": "submitted",
+        "comment_hash": "h", "content_fingerprint": "f"}
+
+    write_legacy(json_path, {"commented_posts": ["https://example.com/blog/later/"]})
+    assert migrate_json_memory(store, json_path) == 0  # Already migrated: the JSON file is not read again
+    assert not store.contains("https://example.com/blog/later/")
+    store.close()
+
+
+def test_migration_keeps_existing_sqlite_records(tmp_path):
+    json_path = str(tmp_path / "memory.json")
+    write_legacy(json_path, {"commented_posts": ["https://example.com/blog/a/"]})
+    store = SQLiteMemoryStore(str(tmp_path / "memory.sqlite3"))
+    store.record("https://example.com/blog/a/", outcome="pending_moderation")
+    migrate_json_memory(store, json_path)
+    assert store.get("https://example.com/blog/a/")["outcome"] == "pending_moderation"
+    store.close()
+
+
+def test_migration_without_a_json_file_does_nothing(tmp_path):
+    store = SQLiteMemoryStore(str(tmp_path / "memory.sqlite3"))
+    assert migrate_json_memory(store, str(tmp_path / "missing.json")) == 0
+    assert store.get_meta("migrated_from_json") is None
+    store.close()
+
+
+def test_create_memory_store_uses_the_site_paths(tmp_path):
+    class Site:
+        MEMORY_BACKEND = "sqlite"
+        MEMORY_DB_FILE = str(tmp_path / "sites" / "docs" / "memory.sqlite3")
+        MEMORY_FILE = str(tmp_path / "sites" / "docs" / "memory.json")
+
+    (tmp_path / "sites" / "docs").mkdir(parents=True)
+    write_legacy(Site.MEMORY_FILE, {"commented_posts": ["https://example.com/blog/a/"]})
+    store = create_memory_store(config=Site)
+    assert isinstance(store, SQLiteMemoryStore) and store.contains("https://example.com/blog/a/")
+    store.close()
+    assert isinstance(create_memory_store("json", config=Site), JSONMemoryStore)
+    with pytest.raises(ValueError, match="Unknown memory backend"):
+        create_memory_store("redis", config=Site)
+
+
+def test_migration_carries_over_skipped_posts(tmp_path):
+    json_path = str(tmp_path / "memory.json")
+    write_legacy(json_path, {"commented_posts": [], "seen_posts": {"https://example.com/blog/closed/": 1714557600.0}})
+    store = SQLiteMemoryStore(str(tmp_path / "memory.sqlite3"))
+    migrate_json_memory(store, json_path)
+    assert store.get_seen_lastmod("https://example.com/blog/closed/") == 1714557600.0
+    store.close()
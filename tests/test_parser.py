@@ -0,0 +1,60 @@
+import pytest
+
+from config.config import Config
+from core.parser import PostPage, parse_listing, parse_post
+from benchmarks import corpus
+
+
+def test_post_page_fields():
+    page = parse_post(corpus.post_html(3))
+    assert page.title == "Synthetic post number 3"
+    assert page.content.startswith(parse_post(corpus.post_html(3, with_disqus=False)).content[:200])
+    assert "def example():" in page.content
+    assert "5 min read" not in page.content  # Outside post__content
+    assert (page.has_disqus_container, page.has_disqus_button, page.has_disqus_script) == (True, True, True)
+
+
+def test_post_page_without_disqus_or_title():
+    page = parse_post(corpus.post_html(4, with_disqus=False))
+    assert (page.has_disqus_container, page.has_disqus_button, page.has_disqus_script) == (False, False, False)
+    assert parse_post("<html><body><p>No post here</p></body></html>") == PostPage("Unknown Title", "", False, False, False)
+
+
+def test_post_content_skips_inline_script_style_and_template():
+    html = ('<h1 class="post-title">Title<script>track()</script></h1>'
+            '<div class="post__content">x<script>if (a<b) {}</script>y<style>p { color: red; }</style>'
+            '<template><p>hidden</p></template>z</div><script>var disqus_shortname = "blog";</script>')
+    page = parse_post(html)
+    assert (page.title, page.content, page.has_disqus_script) == ("Title", "xyz", True)
+    with_assets = parse_post(corpus.post_html(5, inline_assets=True)).content
+    assert with_assets == parse_post(corpus.post_html(5)).content
+
+
+def test_listing_page_links():
+    page_url = f"{Config.BLOG_BASE_URL}page/2/"
+    listing = parse_listing(corpus.listing_html(2, total_posts=35), page_url)
+    assert listing.post_links == [f"{Config.SITE_URL}/blog/{corpus.post_slug(i)}" for i in range(24, 14, -1)]
+    assert listing.pagination_links == [f"{Config.BLOG_BASE_URL}page/{n}/" for n in (2, 3, 4)]
+
+
+def test_listing_page_uses_the_site_profile():
+    site = Config.for_site("docs", SITE_URL="https://docs.example.org", BLOG_BASE_URL="https://docs.example.org/posts/")
+    html = corpus.listing_html(1, total_posts=25, base_path="/posts/")
+    listing = parse_listing(html, site.BLOG_BASE_URL, site)
+    assert listing.post_links[0] == f"https://docs.example.org/blog/{corpus.post_slug(24)}"
+    assert listing.pagination_links == ["https://docs.example.org/posts/page/2/", "https://docs.example.org/posts/page/3/"]
+    assert parse_listing(html, site.BLOG_BASE_URL).pagination_links == []  # Not under the default /blog/
+
+
+@pytest.mark.parametrize("backend", ["stream", "html.parser", "lxml"])
+def test_backends_match_legacy_parser(backend):
+    pytest.importorskip("bs4")
+    if backend == "lxml":
+        pytest.importorskip("lxml")
+    from benchmarks.bench_parser import legacy_parse_listing, legacy_parse_post, synthetic_corpus
+    config = type(f"Config[{backend}]", (Config,), {"HTML_PARSER_BACKEND": backend})
+    posts, listings = synthetic_corpus(20)
+    for html in posts:
+        assert tuple(parse_post(html, config)) == legacy_parse_post(html)
+    for html in listings:
+        assert tuple(parse_listing(html, Config.BLOG_BASE_URL, config)) == legacy_parse_listing(html, Config.BLOG_BASE_URL)
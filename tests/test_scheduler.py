@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from config.config import Config
+from core.agent import CommentAgent
+from core.scheduler import SiteScheduler
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)  # Site memories go to memory/sites/<name>/ under the working directory
+    monkeypatch.setattr(Config, "HTTP_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "GENERATION_CACHE_ENABLED", False)
+    monkeypatch.setattr(Config, "OPERATOR_QUEUE_FILE", None)
+
+
+def sites(*names, **overrides):
+    return [Config.for_site(name, SITE_URL=f"https://{name}.example.com", **overrides) for name in names]
+
+
+@pytest.fixture
+def scheduler_for():
+    schedulers = []
+
+    def make(sites, **kwargs):
+        scheduler = SiteScheduler(sites, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+    yield make
+    for scheduler in schedulers:
+        scheduler.close()
+
+
+def test_sites_share_clients_but_not_memory(scheduler_for):
+    scheduler = scheduler_for(sites("alpha", "beta"))
+    alpha, beta = (scheduler.agent_for(site) for site in scheduler.sites)
+    assert scheduler.agent_for(scheduler.sites[0]) is alpha  # Kept between polls
+    assert alpha.scraper.transport is beta.scraper.transport is scheduler.scraper.transport
+    assert alpha.scraper.config.SITE_URL == "https://alpha.example.com"
+    assert alpha.comment_generator is beta.comment_generator and alpha.browser_pool is beta.browser_pool
+    assert alpha.config.MEMORY_DB_FILE == "memory/sites/alpha/agent_memory.sqlite3"
+    alpha.memory.record("https://alpha.example.com/blog/a/")
+    assert not beta.is_already_commented("https://alpha.example.com/blog/a/")
+
+
+def test_sites_on_one_host_get_its_strictest_limit(scheduler_for):
+    slow = Config.for_site("slow", SITE_URL="https://example.com", REQUESTS_PER_SECOND_PER_HOST=1, REQUEST_BURST_PER_HOST=5)
+    fast = Config.for_site("fast", SITE_URL="https://example.com", BLOG_BASE_URL="https://example.com/news/",
+                           REQUESTS_PER_SECOND_PER_HOST=10, REQUEST_BURST_PER_HOST=2)
+    scheduler = scheduler_for([slow, fast])
+    bucket = scheduler.scraper.rate_limiter.bucket_for("https://example.com/")
+    assert (bucket.rate, bucket.capacity) == (1, 2)
+
+
+def test_run_once_runs_sites_concurrently_and_isolates_failures(monkeypatch, scheduler_for):
+    running = peak = 0
+    lock = threading.Lock()
+
+    def run_pipeline(agent):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        if agent.config.SITE_NAME == "broken":
+            raise RuntimeError("site is down")
+        return len(agent.config.SITE_NAME)
+
+    monkeypatch.setattr(CommentAgent, "run_pipeline", run_pipeline)
+    scheduler = scheduler_for(sites("alpha", "broken", "gamma", "delta"), max_concurrent_sites=2)
+    results = scheduler.run_once()
+    assert peak == 2
+    assert {name: result for name, result in results.items() if name != "broken"} == {"alpha": 5, "gamma": 5, "delta": 5}
+    assert isinstance(results["broken"], RuntimeError)
@@ -0,0 +1,76 @@
+import json
+
+from core.selector_cache import SelectorCache
+
+CHAIN = [("css selector", "#first"), ("css selector", "#second"), ("xpath", "//third")]
+
+
+def probe_finding(target, calls):
+    def probe(selector):
+        calls.append(selector)
+        return f"element for {selector[1]}" if selector == target else None
+    return probe
+
+
+def test_the_last_winner_is_tried_first():
+    cache = SelectorCache(None)
+    calls = []
+    assert cache.resolve("submit button", CHAIN, probe_finding(CHAIN[2], calls)) == "element for //third"
+    assert calls == CHAIN  # Walked the whole chain once
+
+    calls.clear()
+    assert cache.resolve("submit button", CHAIN, probe_finding(CHAIN[2], calls)) == "element for //third"
+    assert calls == [CHAIN[2]]  # One round-trip now
+    assert cache.stats["submit button"] == {"hits": 1, "misses": 1, "probes": 4}
+
+
+def test_a_stale_winner_falls_back_to_the_chain_and_is_replaced():
+    cache = SelectorCache(None)
+    cache.resolve("editor", CHAIN, probe_finding(CHAIN[1], []))
+    calls = []
+    assert cache.resolve("editor", CHAIN, probe_finding(CHAIN[0], calls)) == "element for #first"
+    assert calls == [CHAIN[1], CHAIN[0]]
+    assert cache.ordered("editor", CHAIN)[0] == CHAIN[0]
+
+
+def test_nothing_found_returns_none_and_keeps_the_winner():
+    cache = SelectorCache(None)
+    cache.resolve("editor", CHAIN, probe_finding(CHAIN[1], []))
+    assert cache.resolve("editor", CHAIN, probe_finding(None, [])) is None
+    assert cache.winners["editor"] == CHAIN[1]
+    assert cache.stats["editor"]["probes"] == 2 + 3
+
+
+def test_a_winner_no_longer_in_the_chain_is_ignored():
+    cache = SelectorCache(None)
+    cache.winners["editor"] = ("css selector", "#removed")
+    assert cache.ordered("editor", CHAIN) == CHAIN
+
+
+def test_winners_and_stats_survive_a_restart(tmp_path):
+    path = str(tmp_path / "selector_cache.json")
+    cache = SelectorCache(path)
+    cache.save()  # Nothing changed yet, so nothing is written
+    assert not (tmp_path / "selector_cache.json").exists()
+    cache.resolve("comments button", CHAIN, probe_finding(CHAIN[1], []))
+    cache.save()
+
+    reopened = SelectorCache(path)
+    assert reopened.winners == {"comments button": CHAIN[1]}
+    assert reopened.stats == {"comments button": {"hits": 0, "misses": 1, "probes": 2}}
+    assert reopened.summary() == "Selector cache: comments button 0 hits/1 misses/2 probes"
+
+
+def test_a_corrupted_cache_file_starts_empty(tmp_path):
+    path = tmp_path / "selector_cache.json"
+    path.write_text("{not json")
+    cache = SelectorCache(str(path))
+    assert cache.winners == {} and cache.summary() == "Selector cache: empty"
+
+
+def test_saved_file_is_plain_json(tmp_path):
+    path = tmp_path / "selector_cache.json"
+    cache = SelectorCache(str(path))
+    cache.resolve("editor", CHAIN, probe_finding(CHAIN[0], []))
+    cache.save()
+    assert json.loads(path.read_text())["selectors"] == {"editor": ["css selector", "#first"]}
@@ -0,0 +1,161 @@
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from config.config import Config
+from core.fetcher import HostRateLimiter
+from core.transport import ResponseTooLarge, Transport, retry_after_seconds
+
+
+class FastConfig(Config):
+    HTTP_MAX_RETRIES = 2
+    HTTP_RETRY_BACKOFF = 0.01
+    HTTP_MAX_BODY_BYTES = 1000
+
+
+class Handler(BaseHTTPRequestHandler):
+    """Scripted responses; `server.hits` counts requests per path."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        hits = self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        if self.path == "/ok":
+            return self._send(200, b"hello")
+        if self.path == "/flaky":  # Two 503s (asking for a short wait), then success
+            if hits <= 2:
+                return self._send(503, headers=[("Retry-After", "0")])
+            return self._send(200, b"recovered")
+        if self.path == "/down":
+            return self._send(503)
+        if self.path == "/slow-down":
+            return self._send(429, headers=[("Retry-After", "3600")])
+        if self.path == "/missing":
+            return self._send(404, b"nope")
+        if self.path == "/big":
+            return self._send(200, b"x" * 5000)
+        if self.path == "/gzip-bomb":  # Small on the wire, over the limit once decompressed
+            return self._send(200, gzip.compress(b"x" * 5000), [("Content-Encoding", "gzip")])
+        if self.path == "/gzip":
+            return self._send(200, gzip.compress(b"compressed hello"), [("Content-Encoding", "gzip")])
+        return self._send(404)
+
+    def do_HEAD(self):
+        self.server.hits[f"HEAD {self.path}"] = self.server.hits.get(f"HEAD {self.path}", 0) + 1
+        if self.path == "/no-head":
+            return self._send(405)
+        return self._send(200)
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    server.hits = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def transport():
+    transport = Transport(pool_size=2, config=FastConfig)
+    yield transport
+    transport.close()
+
+
+def test_get_returns_the_body(server, transport):
+    _, base = server
+    response = transport.get(f"{base}/ok")
+    assert (response.status_code, response.text) == (200, "hello")
+
+
+def test_gzip_bodies_are_decompressed(server, transport):
+    _, base = server
+    assert transport.get(f"{base}/gzip").text == "compressed hello"
+
+
+def test_retries_5xx_then_succeeds(server, transport):
+    httpd, base = server
+    response = transport.get(f"{base}/flaky")
+    assert (response.status_code, response.text, httpd.hits["/flaky"]) == (200, "recovered", 3)
+
+
+def test_gives_up_after_max_retries(server, transport):
+    httpd, base = server
+    assert transport.get(f"{base}/down").status_code == 503
+    assert httpd.hits["/down"] == FastConfig.HTTP_MAX_RETRIES + 1
+
+
+def test_long_retry_after_is_returned_instead_of_waited_out(server, transport):
+    httpd, base = server
+    assert transport.get(f"{base}/slow-down").status_code == 429
+    assert httpd.hits["/slow-down"] == 1
+
+
+def test_client_errors_are_not_retried(server, transport):
+    httpd, base = server
+    assert transport.get(f"{base}/missing").status_code == 404
+    assert httpd.hits["/missing"] == 1
+
+
+@pytest.mark.parametrize("path", ["/big", "/gzip-bomb"])
+def test_oversized_bodies_are_abandoned(server, transport, path):
+    _, base = server
+    with pytest.raises(ResponseTooLarge):
+        transport.get(f"{base}{path}")
+
+
+def test_connection_errors_are_retried_then_raised(transport):
+    import requests
+    with pytest.raises(requests.ConnectionError):
+        transport.get("http://127.0.0.1:9/unreachable")  # Discard port, nothing listens
+
+
+def test_check_falls_back_to_get_when_head_is_refused(server, transport):
+    httpd, base = server
+    gets_before = httpd.hits.get("/ok", 0)
+    assert transport.check(f"{base}/ok").status_code == 200
+    assert httpd.hits["HEAD /ok"] == 1 and httpd.hits.get("/ok", 0) == gets_before  # HEAD was enough
+    response = transport.check(f"{base}/no-head")
+    assert response.status_code == 404 and httpd.hits["HEAD /no-head"] == 1  # The GET fallback answered
+
+
+def test_every_attempt_waits_for_the_rate_limiter(server):
+    _, base = server
+    acquired = []
+
+    class CountingLimiter(HostRateLimiter):
+        def acquire(self, url):
+            acquired.append(url)
+
+    transport = Transport(config=FastConfig, rate_limiter=CountingLimiter())
+    transport.get(f"{base}/down")
+    transport.close()
+    assert len(acquired) == FastConfig.HTTP_MAX_RETRIES + 1
+
+
+def test_retry_after_seconds():
+    import requests
+    response = requests.Response()
+    assert retry_after_seconds(response) is None
+    response.headers["Retry-After"] = "12"
+    assert retry_after_seconds(response) == 12.0
+    response.headers["Retry-After"] = "Wed, 21 Oct 2015 07:28:00 GMT"  # In the past
+    assert retry_after_seconds(response) == 0.0
+    response.headers["Retry-After"] = "soon"
+    assert retry_after_seconds(response) is None
@@ -0,0 +1,113 @@
+from collections import namedtuple
+
+import pytest
+
+from core.work_queue import WorkQueue
+
+Post = namedtuple("Post", "url title slug content")
+
+
+def make_queue(tmp_path, **kwargs):
+    kwargs = {"max_attempts": 3, "base_delay": 0, "max_delay": 0, **kwargs}
+    return WorkQueue(str(tmp_path / "memory.sqlite3"), **kwargs)
+
+
+def test_retry_delay_backs_off_exponentially_with_a_cap(tmp_path):
+    queue = make_queue(tmp_path, base_delay=10, max_delay=60)
+    for attempts, expected in [(1, 10), (2, 20), (3, 40), (4, 60), (10, 60)]:
+        for _ in range(20):
+            assert expected * 0.8 <= queue.retry_delay(attempts) <= expected * 1.2
+    queue.close()
+
+
+def test_failed_posts_are_retried_then_dead_lettered(tmp_path):
+    queue = make_queue(tmp_path)
+    post = Post("https://example.com/blog/a/", "A", "a", "Body of post a")
+    queue.add(post)
+    assert post.url in queue
+
+    assert queue.fail(post.url, "RateLimitError") == "failed"
+    [queued] = queue.eligible()
+    assert (queued.url, queued.content, queued.status, queued.attempts) == (post.url, post.content, "failed", 1)
+
+    assert queue.fail(post.url, "RateLimitError") == "failed"
+    assert queue.fail(post.url, "RateLimitError") == "dead"
+    assert queue.eligible() == []
+    assert queue.counts() == {"dead": 1}
+    queue.add(post)  # Rediscovered: stays dead
+    assert queue.counts() == {"dead": 1} and queue.eligible() == []
+    queue.close()
+
+
+def test_failed_posts_wait_for_their_backoff(tmp_path):
+    queue = make_queue(tmp_path, base_delay=3600, max_delay=3600)
+    queue.add(Post("https://example.com/blog/a/", "A", "a", "Body"))
+    queue.add(Post("https://example.com/blog/b/", "B", "b", "Body"))
+    queue.fail("https://example.com/blog/a/", "timeout")
+    assert [queued.url for queued in queue.eligible()] == ["https://example.com/blog/b/"]
+    assert queue.fail("https://example.com/blog/unknown/", "timeout") is None
+    queue.close()
+
+
+def test_done_posts_leave_the_queue_and_survive_a_restart(tmp_path):
+    queue = make_queue(tmp_path)
+    queue.add(Post("https://example.com/blog/a/", "A", "a", "Body"))
+    queue.add(Post("https://example.com/blog/b/", "B", "b", "Body"))
+    queue.mark_generated("https://example.com/blog/b/")
+    queue.mark_done("https://example.com/blog/a/")
+    assert "https://example.com/blog/a/" not in queue
+    queue.close()
+
+    reopened = make_queue(tmp_path)
+    assert "https://example.com/blog/a/" not in reopened and "https://example.com/blog/b/" in reopened
+    assert [(queued.url, queued.status) for queued in reopened.eligible()] == [("https://example.com/blog/b/", "generated")]
+    assert reopened.counts() == {"done": 1, "generated": 1}
+    reopened.close()
+
+
+@pytest.mark.parametrize("limit, expected", [(None, 3), (2, 2), (0, 0)])
+def test_eligible_limit(tmp_path, limit, expected):
+    queue = make_queue(tmp_path)
+    for name in "abc":
+        queue.add(Post(f"https://example.com/blog/{name}/", name, name, "Body"))
+    assert len(queue.eligible(limit)) == expected
+    queue.close()
+
+
+def test_infrastructure_failures_are_retried_without_using_up_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=2)
+    post = Post("https://example.com/blog/a/", "A", "a", "Body")
+    queue.add(post)
+    for _ in range(5):
+        assert queue.fail(post.url, "BrowserLaunchError: chromedriver missing", count_attempt=False) == "failed"
+    [queued] = queue.eligible()
+    assert (queued.status, queued.attempts) == ("failed", 0)
+    assert queue.fail(post.url, "StepFailed") == "failed"
+    assert queue.fail(post.url, "StepFailed") == "dead"
+    queue.close()
+
+
+def test_revive_gives_dead_posts_a_fresh_set_of_attempts(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    for name in "ab":
+        queue.add(Post(f"https://example.com/blog/{name}/", name, name, f"Body {name}"))
+        queue.fail(f"https://example.com/blog/{name}/", "StepFailed")
+    assert queue.counts() == {"dead": 2}
+
+    assert queue.revive(["https://example.com/blog/a/"]) == 1
+    [queued] = queue.eligible()
+    assert (queued.url, queued.content, queued.status, queued.attempts) == ("https://example.com/blog/a/", "Body a", "pending", 0)
+    assert queue.revive() == 1 and queue.counts() == {"pending": 2}
+    assert queue.revive() == 0
+    queue.close()
+
+
+def test_revive_drops_dead_posts_without_a_stored_body(tmp_path):
+    queue = make_queue(tmp_path, max_attempts=1)
+    post = Post("https://example.com/blog/a/", "A", "a", "Body")
+    queue.add(post)
+    queue.fail(post.url, "StepFailed")
+    queue.conn.execute("UPDATE work_queue SET content = NULL")  # Dead-lettered by an older version
+    assert queue.revive() == 1
+    assert post.url not in queue and queue.counts() == {}  # Discovery treats it as new again
+    queue.close()